@@ -0,0 +1,36 @@
+"""add_property_details
+
+Revision ID: 7c3e1a9d5b21
+Revises: 2f5f47de9b04
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e1a9d5b21'
+down_revision = '2f5f47de9b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('properties', sa.Column('details', sa.JSON(), nullable=True))
+    op.add_column(
+        'properties',
+        sa.Column('details_fetched_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        op.f('ix_properties_details_fetched_at'),
+        'properties',
+        ['details_fetched_at'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_properties_details_fetched_at'), table_name='properties')
+    op.drop_column('properties', 'details_fetched_at')
+    op.drop_column('properties', 'details')
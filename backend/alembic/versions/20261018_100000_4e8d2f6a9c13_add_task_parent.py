@@ -0,0 +1,35 @@
+"""add_task_parent
+
+Revision ID: 4e8d2f6a9c13
+Revises: 7c3e1a9d5b21
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8d2f6a9c13'
+down_revision = '7c3e1a9d5b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('parent_id', sa.String(length=8), nullable=True))
+    op.create_index(op.f('ix_tasks_parent_id'), 'tasks', ['parent_id'], unique=False)
+    op.create_foreign_key(
+        'fk_tasks_parent_id_tasks',
+        'tasks',
+        'tasks',
+        ['parent_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+
+
+def downgrade():
+    op.drop_constraint('fk_tasks_parent_id_tasks', 'tasks', type_='foreignkey')
+    op.drop_index(op.f('ix_tasks_parent_id'), table_name='tasks')
+    op.drop_column('tasks', 'parent_id')
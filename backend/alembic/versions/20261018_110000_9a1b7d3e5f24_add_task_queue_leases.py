@@ -0,0 +1,57 @@
+"""add_task_queue_leases
+
+Revision ID: 9a1b7d3e5f24
+Revises: 4e8d2f6a9c13
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1b7d3e5f24'
+down_revision = '4e8d2f6a9c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'tasks',
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'tasks',
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column('tasks', sa.Column('lease_owner', sa.String(length=128), nullable=True))
+    op.add_column(
+        'tasks',
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # Workers look for the next pending top-level task by priority and age
+    op.create_index(
+        'ix_tasks_queue',
+        'tasks',
+        ['status', sa.text('priority DESC'), 'start_time'],
+        unique=False,
+        postgresql_where=sa.text('parent_id IS NULL'),
+    )
+    # Expired leases are looked up among running tasks
+    op.create_index(
+        'ix_tasks_lease_expires_at',
+        'tasks',
+        ['lease_expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_tasks_lease_expires_at', table_name='tasks')
+    op.drop_index('ix_tasks_queue', table_name='tasks')
+    op.drop_column('tasks', 'lease_expires_at')
+    op.drop_column('tasks', 'lease_owner')
+    op.drop_column('tasks', 'attempts')
+    op.drop_column('tasks', 'priority')
@@ -0,0 +1,59 @@
+"""add_scrape_schedules
+
+Revision ID: 5b7d9f1a3c62
+Revises: 9a1b7d3e5f24
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7d9f1a3c62'
+down_revision = '9a1b7d3e5f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scrape_schedules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('city', sa.String(length=128), nullable=False),
+        sa.Column('region', sa.String(length=128), nullable=False),
+        sa.Column('property_types', sa.JSON(), nullable=False),
+        sa.Column('max_pages', sa.Integer(), nullable=False),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('interval_minutes', sa.Integer(), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=False, server_default='true'),
+        sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_task_id', sa.String(length=8), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index(op.f('ix_scrape_schedules_id'), 'scrape_schedules', ['id'], unique=False)
+    op.create_index(op.f('ix_scrape_schedules_next_run_at'), 'scrape_schedules', ['next_run_at'], unique=False)
+
+    op.add_column('tasks', sa.Column('dedup_key', sa.String(length=64), nullable=True))
+    # At most one in-flight task per request: concurrent identical requests conflict
+    # on this index and attach to the task that won
+    op.create_index(
+        'ux_tasks_dedup_key_in_flight',
+        'tasks',
+        ['dedup_key'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade():
+    op.drop_index('ux_tasks_dedup_key_in_flight', table_name='tasks')
+    op.drop_column('tasks', 'dedup_key')
+    op.drop_index(op.f('ix_scrape_schedules_next_run_at'), table_name='scrape_schedules')
+    op.drop_index(op.f('ix_scrape_schedules_id'), table_name='scrape_schedules')
+    op.drop_table('scrape_schedules')
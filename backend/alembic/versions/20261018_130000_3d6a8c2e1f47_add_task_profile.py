@@ -0,0 +1,24 @@
+"""add_task_profile
+
+Revision ID: 3d6a8c2e1f47
+Revises: 5b7d9f1a3c62
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d6a8c2e1f47'
+down_revision = '5b7d9f1a3c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('profile', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('tasks', 'profile')
@@ -0,0 +1,25 @@
+"""add_property_content_hash
+
+Revision ID: 8e2c4a6f0b93
+Revises: 3d6a8c2e1f47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2c4a6f0b93'
+down_revision = '3d6a8c2e1f47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows keep a NULL hash until they are scraped again, which writes it
+    op.add_column('properties', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('properties', 'content_hash')
@@ -0,0 +1,96 @@
+"""add_price_history
+
+Revision ID: 6f1b3d5a7c28
+Revises: 8e2c4a6f0b93
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1b3d5a7c28'
+down_revision = '8e2c4a6f0b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'price_history',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('property_id', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('previous_price', sa.Float(), nullable=True),
+        sa.Column('observed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_price_history_property_id_observed_at',
+        'price_history',
+        ['property_id', 'observed_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_price_history_drops_observed_at',
+        'price_history',
+        ['observed_at'],
+        unique=False,
+        postgresql_where=sa.text('price < previous_price'),
+    )
+
+    # Append a row whenever a property gets a price or its price changes, whichever
+    # statement writes it; unchanged prices add nothing
+    op.execute(
+        """
+        CREATE FUNCTION record_price_change() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO price_history (property_id, price, previous_price, observed_at)
+            VALUES (
+                NEW.id,
+                NEW.price,
+                CASE WHEN TG_OP = 'UPDATE' THEN OLD.price END,
+                now()
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER properties_price_inserted
+        AFTER INSERT ON properties
+        FOR EACH ROW WHEN (NEW.price IS NOT NULL)
+        EXECUTE FUNCTION record_price_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER properties_price_changed
+        AFTER UPDATE OF price ON properties
+        FOR EACH ROW WHEN (OLD.price IS DISTINCT FROM NEW.price)
+        EXECUTE FUNCTION record_price_change()
+        """
+    )
+
+    # Start the history of existing listings with their current price
+    op.execute(
+        """
+        INSERT INTO price_history (property_id, price, observed_at)
+        SELECT id, price, coalesce(updated_at, created_at, now())
+        FROM properties
+        WHERE price IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    op.execute('DROP TRIGGER properties_price_changed ON properties')
+    op.execute('DROP TRIGGER properties_price_inserted ON properties')
+    op.execute('DROP FUNCTION record_price_change()')
+    op.drop_index('ix_price_history_drops_observed_at', table_name='price_history')
+    op.drop_index('ix_price_history_property_id_observed_at', table_name='price_history')
+    op.drop_table('price_history')
@@ -0,0 +1,80 @@
+"""add_property_filter_indexes
+
+Revision ID: 2a9e4c7b1d58
+Revises: 6f1b3d5a7c28
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a9e4c7b1d58'
+down_revision = '6f1b3d5a7c28'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = ('city', 'region', 'property_type')
+
+
+def upgrade():
+    # Trigram operator classes, so ILIKE '%...%' filters can use GIN indexes
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Built concurrently, outside the migration transaction, so scrapes and API
+    # requests keep writing and reading properties while large tables are indexed
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_properties_{column}_trgm',
+                'properties',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            'ix_properties_created_at_price',
+            'properties',
+            ['created_at', 'price'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_properties_rooms_bathrooms_price',
+            'properties',
+            ['rooms', 'bathrooms', 'price'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+    op.execute('ANALYZE properties')
+
+
+def downgrade():
+    # pg_trgm is left installed, other objects may depend on it
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_properties_rooms_bathrooms_price',
+            table_name='properties',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_properties_created_at_price',
+            table_name='properties',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        for column in reversed(TRIGRAM_COLUMNS):
+            op.drop_index(
+                f'ix_properties_{column}_trgm',
+                table_name='properties',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
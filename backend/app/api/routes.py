@@ -1,16 +1,38 @@
-import asyncio
-from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
 
-from app.db import get_db
-from app.schemas.property import PropertyResponse, ScraperRequest
+from app.core.config import settings
+from app.db import get_async_db, get_async_sessionmaker, get_db, run_in_session_thread
+from app.db.repositories.schedule_repository import ScheduleRepository
+from app.db.repositories.task_repository import (
+    TERMINAL_STATUSES,
+    AsyncTaskRepository,
+    TaskRepository,
+)
+from app.models.task import Task
+from app.schemas.property import (
+    PriceDropResponse,
+    PriceHistoryResponse,
+    PropertyResponse,
+    ScraperRequest,
+)
+from app.schemas.schedule import ScheduleBase, ScheduleCreate, ScheduleResponse, ScheduleUpdate
 from app.schemas.task import TaskListResponse, ScrapingLogResponse
 from app.core.usecases import PropertyUseCases, ScraperUseCases
-from app.services.scraper_service import get_task_status, get_task_logs
+from app.services.scraper_service import get_task_logs
+from app.scrapers import available_scrapers
+from app.services.task_events import task_event_stream
+from app.services.worker_pool import QueueFullError, ScrapeWorkerPool, get_worker_pool
 
 router = APIRouter(prefix="/api/v1", tags=["properties"])
 
+# Properties whose price history can be requested at once
+MAX_PRICE_HISTORY_IDS = 100
+
 
 @router.get("/properties", response_model=List[PropertyResponse])
 async def get_properties(
@@ -25,13 +47,13 @@ async def get_properties(
     ),
     skip: int = Query(0, description="Skip first N results"),
     limit: int = Query(20, description="Limit to N results"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get properties with optional filtering
     """
     property_usecase = PropertyUseCases(db)
-    properties = property_usecase.get_properties(
+    properties = await property_usecase.get_properties(
         city=city,
         region=region,
         property_type=property_type,
@@ -46,17 +68,59 @@ async def get_properties(
     return properties
 
 
-import asyncio
+@router.get("/properties/price-history", response_model=List[PriceHistoryResponse])
+async def get_price_history(
+    ids: List[int] = Query(..., description="Property IDs"),
+    since: Optional[datetime] = Query(None, description="Only return changes observed since this time"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get the price history of several properties in a single query
+    """
+    if len(ids) > MAX_PRICE_HISTORY_IDS:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_PRICE_HISTORY_IDS} properties can be requested at once"
+        )
+
+    return await PropertyUseCases(db).get_price_history(ids, since=since)
 
 
-@router.post("/scrape", status_code=202)
-async def start_scraper(
-    request: ScraperRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+@router.get("/properties/price-drops", response_model=List[PriceDropResponse])
+async def get_price_drops(
+    region: Optional[str] = Query(None, description="Filter by region"),
+    city: Optional[str] = Query(None, description="Filter by city"),
+    days: int = Query(7, description="Only return drops observed in the last N days", ge=1, le=365),
+    limit: int = Query(50, description="Limit to N results", ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Start a scraping job for properties in the given city and region
+    Get the most recent price drops, newest first
+    """
+    return await PropertyUseCases(db).get_recent_price_drops(
+        region=region, city=city, days=days, limit=limit
+    )
+
+
+@router.get("/properties/{property_id}/price-history", response_model=PriceHistoryResponse)
+async def get_property_price_history(
+    property_id: int,
+    since: Optional[datetime] = Query(None, description="Only return changes observed since this time"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get the price history of a property, oldest first
+    """
+    property_usecase = PropertyUseCases(db)
+    if not await property_usecase.get_property(property_id):
+        raise HTTPException(status_code=404, detail=f"Property with id {property_id} not found")
+
+    return (await property_usecase.get_price_history([property_id], since=since))[0]
+
+
+@router.post("/scrape", status_code=202)
+async def start_scraper(request: ScraperRequest, db: Session = Depends(get_db)):
+    """
+    Queue a scraping job for properties in the given city and region
     """
     if not request.city or not request.region:
         raise HTTPException(status_code=400, detail="City and region are required")
@@ -66,33 +130,228 @@ async def start_scraper(
             status_code=400, detail="At least one property type is required"
         )
 
+    unknown_sources = set(request.sources or []) - set(available_scrapers())
+    if unknown_sources:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sources: {', '.join(sorted(unknown_sources))}. Available: {', '.join(available_scrapers())}",
+        )
+
+    task_repo = TaskRepository(db)
     scraper_usecase = ScraperUseCases(db)
+    # Database work runs in a worker thread, only the dispatch to the worker pool
+    # needs the event loop. Identical in-flight requests are attached to even when
+    # the queue is full.
+    task_id, coalesced = await run_in_session_thread(
+        db,
+        scraper_usecase.queue_scraper,
+        city=request.city,
+        region=request.region,
+        property_types=request.property_types,
+        max_pages=request.max_pages or 5,
+        priority=request.priority or 0,
+        incremental=bool(request.incremental),
+        stop_after_unchanged_pages=request.stop_after_unchanged_pages or 2,
+        enrich_details=bool(request.enrich_details),
+        sources=request.sources or None,
+        fan_out=bool(request.fan_out),
+        shard_pages=request.shard_pages,
+        profile=bool(request.profile),
+        check_capacity=lambda: _check_queue_capacity(task_repo),
+    )
 
-    def run_scraper_sync():
-        asyncio.run(
-            scraper_usecase.start_scraper(
-                city=request.city,
-                region=request.region,
-                property_types=request.property_types,
-                max_pages=request.max_pages or 5,
-            )
-        )
+    if coalesced:
+        return {
+            "message": f"An identical scraping job is already in progress for {request.property_types} in {request.city}, {request.region}",
+            "task_id": task_id,
+            "status": "coalesced",
+        }
 
-    # Añadir la tarea de fondo de manera segura
-    background_tasks.add_task(run_scraper_sync)
+    try:
+        scraper_usecase.dispatch_task(task_id, request.priority or 0)
+    except QueueFullError:
+        await run_in_session_thread(db, task_repo.delete_task, task_id)
+        raise _queue_full_error()
 
     return {
-        "message": f"Scraping job started for {request.property_types} in {request.city}, {request.region}"
+        "message": f"Scraping job queued for {request.property_types} in {request.city}, {request.region}",
+        "task_id": task_id,
+        "status": "queued",
     }
 
 
+@router.post("/scrape/{task_id}/cancel", status_code=202)
+def cancel_scraper(task_id: str, db: Session = Depends(get_db)):
+    """
+    Cancel a queued or running scraping task. A running task stops within a few
+    pages and can be resumed later.
+    """
+    task = TaskRepository(db).get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    if task.status in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=409, detail=f"Task {task_id} already {task.status}"
+        )
+
+    status = ScraperUseCases(db).cancel_scraper(task_id)
+    return {"message": f"Cancellation requested for task {task_id}", "task_id": task_id, "status": status}
+
+
+@router.post("/scrape/{task_id}/resume", status_code=202)
+async def resume_scraper(task_id: str, db: Session = Depends(get_db)):
+    """
+    Queue a failed or cancelled scraping task again, continuing from the last page
+    it saved
+    """
+    task_repo = TaskRepository(db)
+    task = await run_in_session_thread(db, task_repo.get_task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    if task.parent_id:
+        raise HTTPException(
+            status_code=409, detail=f"Task {task_id} is a sub-task, resume {task.parent_id} instead"
+        )
+    if task.status not in ("failed", "cancelled"):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only failed or cancelled tasks can be resumed, task {task_id} is {task.status}",
+        )
+
+    await run_in_session_thread(db, _check_queue_capacity, task_repo)
+    previous_status = task.status
+    priority = task.priority or 0
+    scraper_usecase = ScraperUseCases(db)
+    await run_in_session_thread(db, scraper_usecase.resume_scraper, task_id)
+
+    try:
+        scraper_usecase.dispatch_task(task_id, priority)
+    except QueueFullError:
+        await run_in_session_thread(
+            db, task_repo.update_task, task_id, {"status": previous_status}
+        )
+        raise _queue_full_error()
+
+    return {"message": f"Scraping task {task_id} queued to resume", "task_id": task_id, "status": "queued"}
+
+
+@router.get("/scrape/{task_id}/profile", response_class=PlainTextResponse)
+async def get_scraper_profile(task_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Download the collapsed stacks sampled while a profiled task ran, for flame
+    graph tools
+    """
+    task_repo = AsyncTaskRepository(db)
+    if not await task_repo.get_task(task_id):
+        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    profile = await task_repo.get_profile(task_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} was not profiled")
+
+    return PlainTextResponse(
+        profile,
+        headers={"Content-Disposition": f'attachment; filename="task-{task_id}.collapsed"'},
+    )
+
+
+def _queue_full_error() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=f"Scrape queue is full ({settings.SCRAPER_QUEUE_SIZE} jobs waiting)",
+        headers={"Retry-After": "30"},
+    )
+
+
+def _check_queue_capacity(task_repo: TaskRepository) -> Optional[ScrapeWorkerPool]:
+    """
+    Reject a new job when the queue of the configured backend is full
+
+    Returns:
+        The worker pool running jobs in memory, or None with the database backend
+    """
+    if settings.SCRAPER_QUEUE_BACKEND == "database":
+        if task_repo.count_pending_tasks() >= settings.SCRAPER_QUEUE_SIZE:
+            raise _queue_full_error()
+        return None
+
+    worker_pool = get_worker_pool()
+    if worker_pool is None:
+        raise HTTPException(status_code=503, detail="Scrape workers are not running")
+    if worker_pool.queue_depth >= worker_pool.max_queue_size:
+        raise _queue_full_error()
+    return worker_pool
+
+
+@router.get("/scrape/sources", response_model=List[str])
+async def get_scrape_sources():
+    """
+    Get the portals that can be scraped
+    """
+    return available_scrapers()
+
+
+@router.get("/schedules", response_model=List[ScheduleResponse])
+def get_schedules(db: Session = Depends(get_db)):
+    """
+    Get the recurring scrape definitions
+    """
+    return ScheduleRepository(db).get_schedules()
+
+
+@router.post("/schedules", response_model=ScheduleResponse, status_code=201)
+def create_schedule(request: ScheduleCreate, db: Session = Depends(get_db)):
+    """
+    Create a recurring scrape, queued every `interval_minutes` (plus jitter)
+    """
+    unknown_sources = set(request.sources) - set(available_scrapers())
+    if unknown_sources:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sources: {', '.join(sorted(unknown_sources))}. Available: {', '.join(available_scrapers())}",
+        )
+
+    schedule_repo = ScheduleRepository(db)
+    if any(schedule.name == request.name for schedule in schedule_repo.get_schedules()):
+        raise HTTPException(status_code=409, detail=f"Schedule {request.name} already exists")
+
+    schedule_data = request.model_dump(include=set(ScheduleBase.model_fields))
+    schedule_data["options"] = request.model_dump(exclude=set(ScheduleBase.model_fields))
+    return schedule_repo.create_schedule(
+        schedule_data, jitter_seconds=settings.SCRAPER_SCHEDULE_JITTER_SECONDS
+    )
+
+
+@router.patch("/schedules/{schedule_id}", response_model=ScheduleResponse)
+def update_schedule(
+    schedule_id: int, request: ScheduleUpdate, db: Session = Depends(get_db)
+):
+    """
+    Change the interval, size or priority of a recurring scrape, or pause it
+    """
+    schedule = ScheduleRepository(db).update_schedule(
+        schedule_id, request.model_dump(exclude_unset=True)
+    )
+    if not schedule:
+        raise HTTPException(status_code=404, detail=f"Schedule with id {schedule_id} not found")
+    return schedule
+
+
+@router.delete("/schedules/{schedule_id}", status_code=204)
+def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
+    """
+    Delete a recurring scrape
+    """
+    if not ScheduleRepository(db).delete_schedule(schedule_id):
+        raise HTTPException(status_code=404, detail=f"Schedule with id {schedule_id} not found")
+
+
 @router.get("/properties/stats")
-async def get_property_stats(db: Session = Depends(get_db)):
+async def get_property_stats(db: AsyncSession = Depends(get_async_db)):
     """
     Get statistics about properties in the database
     """
     property_usecase = PropertyUseCases(db)
-    return property_usecase.get_property_stats()
+    return await property_usecase.get_property_stats()
 
 
 @router.get("/scrape/logs", response_model=ScrapingLogResponse)
@@ -115,22 +374,74 @@ async def get_scrape_logs(
     return {"logs": log_messages}
 
 
+@router.get("/scrape/events")
+async def stream_scrape_events(
+    request: Request,
+    task_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Stream the logs and progress of a scraping task, or of every task, as
+    Server-Sent Events ("log" and "progress" events)
+    """
+    initial_events = [
+        {"type": "log", **entry} for entry in get_task_logs(task_id, limit=50)
+    ]
+    poll_progress = None
+
+    if task_id:
+        task = await AsyncTaskRepository(db).get_task(task_id)
+        if not task:
+            raise HTTPException(
+                status_code=404, detail=f"Task with id {task_id} not found"
+            )
+        initial_events.append(_progress_event(task))
+
+    if settings.SCRAPER_QUEUE_BACKEND == "database":
+        # Tasks run by worker processes only reach this process through the database
+        stream_started_at = datetime.now(timezone.utc)
+
+        async def poll_progress() -> List[Dict[str, Any]]:
+            async with get_async_sessionmaker()() as poll_db:
+                task_repo = AsyncTaskRepository(poll_db)
+                if task_id:
+                    polled = await task_repo.get_task(task_id)
+                    return [_progress_event(polled)] if polled else []
+                tasks = await task_repo.get_active_tasks(stream_started_at)
+                return [_progress_event(polled) for polled in tasks]
+
+    return StreamingResponse(
+        task_event_stream(
+            task_id, request.is_disconnected, initial_events, poll_progress
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _progress_event(task: Task) -> Dict[str, Any]:
+    return {
+        "type": "progress",
+        "task_id": task.id,
+        "status": task.status,
+        "properties_found": task.properties_found,
+    }
+
+
 @router.get("/scrape/status", response_model=TaskListResponse)
 async def check_scrape_status(
     task_id: Optional[str] = None,
     skip: int = Query(0, description="Skip first N results"),
     limit: int = Query(20, description="Limit to N results"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get the status of scraping tasks
     """
-    from app.db.repositories.task_repository import TaskRepository
-
-    task_repo = TaskRepository(db)
+    task_repo = AsyncTaskRepository(db)
 
     if task_id:
-        task = get_task_status(task_id, db)
+        task = await task_repo.get_task(task_id)
         if not task:
             raise HTTPException(
                 status_code=404, detail=f"Task with id {task_id} not found"
@@ -138,7 +449,7 @@ async def check_scrape_status(
         tasks = [task]
         total = 1
     else:
-        tasks = task_repo.get_tasks(skip=skip, limit=limit)
-        total = task_repo.get_task_count()
+        tasks = await task_repo.get_tasks(skip=skip, limit=limit)
+        total = await task_repo.get_task_count()
 
     return {"tasks": tasks, "total": total}
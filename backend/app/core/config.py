@@ -29,10 +29,112 @@ class Settings(BaseSettings):
         
         # Manually construct the connection string to avoid issues with PostgresDsn
         return f"postgresql://{user}:{password}@{server}:{port}/{db}"
+
+    # Database of the async engine used by API routes (asyncpg driver); derived from
+    # DATABASE_URL when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connections kept open by the async engine, and extra connections it opens under load
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+
+    @field_validator("ASYNC_DATABASE_URL", mode="before")
+    def assemble_async_db_connection(cls, v: Optional[str], info) -> str:
+        if isinstance(v, str):
+            return v
+
+        url = info.data.get("DATABASE_URL") or ""
+        scheme, separator, rest = url.partition("://")
+        if separator and scheme.split("+")[0] in ("postgres", "postgresql"):
+            return f"postgresql+asyncpg://{rest}"
+        return url
     
     # API settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Scooby In The House"
 
+    # Scraper settings
+    SCRAPER_USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
+    # Number of result pages fetched in parallel by a single scraper
+    SCRAPER_CONCURRENCY: int = 1
+    # Average requests per second allowed towards a single host (shared by all scrapers)
+    SCRAPER_REQUESTS_PER_SECOND: float = 1 / 3.5
+    # Maximum number of requests that can be sent in a burst after an idle period
+    SCRAPER_BURST: int = 1
+    # Backend used to parse result pages: "bs4" (BeautifulSoup) or "lxml" (faster, same output)
+    SCRAPER_PARSER: str = "bs4"
+    # Where pages are parsed: "process" pool, "thread" pool or "inline" in the event loop
+    SCRAPER_PARSE_EXECUTOR: str = "thread"
+    SCRAPER_PARSE_WORKERS: int = 2
+    # Directory of the conditional-request (ETag / Last-Modified) page cache; disabled when empty
+    SCRAPER_HTTP_CACHE_DIR: Optional[str] = None
+    SCRAPER_HTTP_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Connection pool of the application-wide HTTP client
+    SCRAPER_HTTP_MAX_CONNECTIONS: int = 100
+    SCRAPER_HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    SCRAPER_HTTP_DNS_CACHE_TTL: int = 300
+    SCRAPER_HTTP_KEEPALIVE_TIMEOUT: float = 30
+    SCRAPER_HTTP_TIMEOUT: float = 60
+    SCRAPER_HTTP_CONNECT_TIMEOUT: float = 10
+    # Retries of failed page requests (exponential backoff with jitter, Retry-After honored)
+    SCRAPER_MAX_RETRIES: int = 3
+    SCRAPER_RETRY_BASE_DELAY: float = 2
+    SCRAPER_RETRY_MAX_DELAY: float = 120
+    # Per-host circuit breaker: requests per evaluation window, error rate that opens the
+    # circuit, average latency that lowers the rate, and how long an open circuit holds requests
+    SCRAPER_BREAKER_WINDOW: int = 10
+    SCRAPER_BREAKER_ERROR_RATE: float = 0.5
+    SCRAPER_BREAKER_LATENCY_SECONDS: float = 5
+    SCRAPER_BREAKER_COOLDOWN_SECONDS: float = 60
+    # Detail-page enrichment: concurrent detail requests, rows stored per batch, and
+    # listings left pending by earlier runs picked up by each task
+    SCRAPER_DETAIL_CONCURRENCY: int = 2
+    SCRAPER_DETAIL_BATCH_SIZE: int = 20
+    SCRAPER_DETAIL_BACKLOG_LIMIT: int = 200
+    # Sub-tasks of fanned-out requests (one per property type or page range) running at once
+    # in a process, shared by every request it runs
+    SCRAPER_MAX_CONCURRENT_SUBTASKS: int = 3
+    # Scrape jobs run at the same time by the in-process worker pool, and jobs that can
+    # wait in its queue before new requests are rejected with 429
+    SCRAPER_WORKERS: int = 2
+    SCRAPER_QUEUE_SIZE: int = 50
+    # Where queued scrape jobs wait: "memory" (worker pool of the API process) or
+    # "database" (durable queue on the tasks table, run by `python -m app.worker`)
+    SCRAPER_QUEUE_BACKEND: str = "memory"
+    # Identifies an API process in the tasks its worker pool runs, so that on startup
+    # it fails only the tasks it left unfinished (defaults to the host name). API
+    # processes sharing a host need distinct values, or the database backend
+    SCRAPER_INSTANCE_ID: str = ""
+    # Durable queue: lease held by a worker on a running task, how often it is renewed,
+    # how often idle workers poll, and attempts before a task whose lease keeps
+    # expiring is failed
+    SCRAPER_LEASE_SECONDS: float = 120
+    SCRAPER_HEARTBEAT_SECONDS: float = 30
+    SCRAPER_QUEUE_POLL_SECONDS: float = 2
+    SCRAPER_TASK_MAX_ATTEMPTS: int = 3
+    # Port on which `python -m app.worker` serves its metrics (0 disables it); give each
+    # worker process on a node its own port
+    WORKER_METRICS_PORT: int = 9100
+    # Progress of a running task is written once this many pages were scraped or this
+    # many seconds passed since the last write (cancel requests are noticed on writes)
+    SCRAPER_PROGRESS_FLUSH_PAGES: int = 5
+    SCRAPER_PROGRESS_FLUSH_SECONDS: float = 5
+    # In-memory task logs: entries kept per task, tasks kept, entries of the all-tasks
+    # view, and how often event streams send a keep-alive (and, with the database
+    # queue backend, poll the status of the tasks they follow)
+    SCRAPER_LOG_ENTRIES_PER_TASK: int = 200
+    SCRAPER_LOG_MAX_TASKS: int = 100
+    SCRAPER_LOG_RECENT_ENTRIES: int = 100
+    SCRAPER_EVENTS_KEEPALIVE_SECONDS: float = 15
+    # Recurring scrapes: whether the API process runs the scheduler, how often it looks
+    # for due schedules, and the random delay added to each run so schedules sharing an
+    # interval do not all start at once
+    SCRAPER_SCHEDULER_ENABLED: bool = True
+    SCRAPER_SCHEDULE_POLL_SECONDS: float = 30
+    SCRAPER_SCHEDULE_JITTER_SECONDS: float = 60
+    # Profiled scrapes: time between stack samples, and distinct stacks kept (the
+    # least sampled ones are dropped)
+    SCRAPER_PROFILE_INTERVAL_SECONDS: float = 0.01
+    SCRAPER_PROFILE_MAX_STACKS: int = 5000
+
 
 settings = Settings() 
\ No newline at end of file
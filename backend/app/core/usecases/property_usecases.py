@@ -1,16 +1,18 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
 
 from app.models.property import Property
 from app.schemas.property import PropertyResponse
-from app.db.repositories import PropertyRepository
+from app.db.repositories import AsyncPriceHistoryRepository, AsyncPropertyRepository
 
 class PropertyUseCases:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.property_repo = PropertyRepository(db)
+        self.property_repo = AsyncPropertyRepository(db)
+        self.price_history_repo = AsyncPriceHistoryRepository(db)
         
-    def get_properties(
+    async def get_properties(
         self,
         city: Optional[str] = None,
         region: Optional[str] = None,
@@ -25,7 +27,7 @@ class PropertyUseCases:
         """
         Get properties with optional filtering
         """
-        return self.property_repo.get_properties_with_filters(
+        return await self.property_repo.get_properties_with_filters(
             city=city,
             region=region,
             property_type=property_type,
@@ -37,16 +39,63 @@ class PropertyUseCases:
             limit=limit
         )
         
-    def get_property_stats(self):
+    async def get_property_stats(self):
         """
         Get statistics about properties in the database
         """
-        total_count = self.property_repo.get_property_count()
-        city_stats = self.property_repo.get_property_count_by_city()
-        price_stats = self.property_repo.get_avg_price_by_city()
+        total_count = await self.property_repo.get_property_count()
+        city_stats = await self.property_repo.get_property_count_by_city()
+        price_stats = await self.property_repo.get_avg_price_by_city()
         
         return {
             "total_properties": total_count,
             "by_city": city_stats,
             "avg_prices": price_stats
-        } 
\ No newline at end of file
+        }
+
+    async def get_property(self, property_id: int) -> Optional[Property]:
+        """
+        Get a property by ID
+        """
+        return await self.property_repo.get_property(property_id)
+
+    async def get_price_history(
+        self, property_ids: List[int], since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the price changes of each requested property, oldest first
+        """
+        history = await self.price_history_repo.get_price_history(property_ids, since=since)
+        return [
+            {"property_id": property_id, "prices": history.get(property_id, [])}
+            for property_id in dict.fromkeys(property_ids)
+        ]
+
+    async def get_recent_price_drops(
+        self,
+        region: Optional[str] = None,
+        city: Optional[str] = None,
+        days: int = 7,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the price drops observed in the last `days` days, newest first
+        """
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        drops = await self.price_history_repo.get_recent_price_drops(
+            since, region=region, city=city, limit=limit
+        )
+        return [
+            {
+                "property": property_obj,
+                "price": change.price,
+                "previous_price": change.previous_price,
+                "drop_percent": (
+                    round((change.previous_price - change.price) / change.previous_price * 100, 2)
+                    if change.previous_price
+                    else 0.0
+                ),
+                "observed_at": change.observed_at,
+            }
+            for property_obj, change in drops
+        ]
@@ -1,25 +1,346 @@
+from contextlib import asynccontextmanager, nullcontext
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, AsyncIterator, Callable, List, NamedTuple, Optional
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import logging
 import uuid
 
-from app.services.scraper_service import scrape_properties
+from app.core.config import settings
+from app.db import SessionLocal, run_in_session_thread
+from app.db.repositories.schedule_repository import ScheduleRepository
+from app.db.repositories.task_repository import TERMINAL_STATUSES, TaskRepository
+from app.models.scrape_schedule import ScrapeSchedule
+from app.models.task import Task
+from app.services.profiler import SamplingProfiler
+from app.services.scraper_service import (
+    DEFAULT_SOURCE,
+    scrape_properties,
+    scrape_properties_fan_out,
+)
+from app.services.worker_pool import QueueFullError, get_worker_pool, worker_pool_owner_id
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedTask(NamedTuple):
+    task_id: str
+    # Whether the request attached to an identical pending or running task
+    coalesced: bool = False
+
+
+def request_dedup_key(city: str, region: str, property_types: List[str], **options) -> str:
+    """Hash a scrape request, so identical requests get the same key"""
+    request = {
+        "city": city.strip().lower(),
+        "region": region.strip().lower(),
+        "property_types": sorted(property_types),
+        **options,
+    }
+    if request.get("sources"):
+        request["sources"] = sorted(request["sources"])
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+def _worker_pool_owner() -> Optional[str]:
+    """
+    Owner recorded on queued tasks when the worker pool of this process runs them, so
+    only this process fails them if it restarts before they finish
+    """
+    if settings.SCRAPER_QUEUE_BACKEND == "memory":
+        return worker_pool_owner_id()
+    return None
+
 
 class ScraperUseCases:
     def __init__(self, db: Session):
         self.db = db
         
+    def queue_scraper(
+        self,
+        city: str,
+        region: str,
+        property_types: List[str],
+        max_pages: int,
+        priority: int = 0,
+        incremental: bool = False,
+        stop_after_unchanged_pages: int = 2,
+        enrich_details: bool = False,
+        sources: Optional[List[str]] = None,
+        fan_out: bool = False,
+        shard_pages: Optional[int] = None,
+        profile: bool = False,
+        check_capacity: Optional[Callable[[], Any]] = None
+    ) -> QueuedTask:
+        """
+        Store a scraping job as a pending task, to be run by a worker. A request
+        identical to a pending or running one attaches to it instead.
+
+        Args:
+            check_capacity: Called before a new task is created, and not when the
+                            request attaches to an in-flight task; raises to reject it
+
+        Returns:
+            The task ID, and whether it is the task of an identical request
+        """
+        task_id = str(uuid.uuid4())[:8]
+        sources = sources or [DEFAULT_SOURCE]
+        dedup_key = request_dedup_key(
+            city,
+            region,
+            property_types,
+            max_pages=max_pages,
+            incremental=incremental,
+            stop_after_unchanged_pages=stop_after_unchanged_pages,
+            enrich_details=enrich_details,
+            sources=sources,
+            fan_out=fan_out,
+            shard_pages=shard_pages,
+            profile=profile,
+        )
+
+        task_repo = TaskRepository(self.db)
+        if check_capacity is not None:
+            in_flight = task_repo.get_in_flight_task(dedup_key)
+            if in_flight is not None:
+                logger.info(f"Scrape request attached to in-flight task {in_flight.id}")
+                return QueuedTask(in_flight.id, True)
+            check_capacity()
+
+        task, coalesced = task_repo.create_or_attach_task(
+            {
+                "id": task_id,
+                "city": city,
+                "region": region,
+                "property_type": "-y-".join(property_types),
+                "max_pages": max_pages,
+                "status": "pending",
+                "priority": priority,
+                "dedup_key": dedup_key,
+                "start_time": datetime.now(),
+                "lease_owner": _worker_pool_owner(),
+                "cmetadata": {
+                    "sources": sources,
+                    "request": {
+                        "property_types": property_types,
+                        "incremental": incremental,
+                        "stop_after_unchanged_pages": stop_after_unchanged_pages,
+                        "enrich_details": enrich_details,
+                        "fan_out": fan_out,
+                        "shard_pages": shard_pages,
+                        "profile": profile,
+                    },
+                },
+            }
+        )
+        if coalesced:
+            logger.info(f"Scrape request attached to in-flight task {task.id}")
+        return QueuedTask(task.id, coalesced)
+
+    def dispatch_task(self, task_id: str, priority: int = 0) -> None:
+        """
+        Hand a queued task to the in-process worker pool; with the database queue
+        backend, workers claim it from the tasks table instead
+
+        Raises:
+            QueueFullError: If the worker pool queue is full
+            RuntimeError: If the worker pool is not running
+        """
+        if settings.SCRAPER_QUEUE_BACKEND == "database":
+            return
+
+        worker_pool = get_worker_pool()
+        if worker_pool is None:
+            raise RuntimeError("The scrape worker pool is not running")
+
+        async def run_scraper_job():
+            # Jobs outlive the request, so they use a session of their own
+            job_db = SessionLocal()
+            try:
+                await ScraperUseCases(job_db).run_queued_task(task_id)
+            finally:
+                job_db.close()
+
+        worker_pool.submit(run_scraper_job, priority=priority, name=task_id)
+
+    def queue_scheduled_scrape(self, schedule: ScrapeSchedule) -> QueuedTask:
+        """
+        Queue a run of a recurring scrape, or attach it to an identical run still
+        in flight
+        """
+        options = schedule.options or {}
+        queued = self.queue_scraper(
+            city=schedule.city,
+            region=schedule.region,
+            property_types=schedule.property_types,
+            max_pages=schedule.max_pages,
+            priority=schedule.priority,
+            incremental=options.get("incremental", False),
+            stop_after_unchanged_pages=options.get("stop_after_unchanged_pages", 2),
+            enrich_details=options.get("enrich_details", False),
+            sources=options.get("sources"),
+            fan_out=options.get("fan_out", False),
+            shard_pages=options.get("shard_pages"),
+        )
+        if not queued.coalesced:
+            try:
+                self.dispatch_task(queued.task_id, schedule.priority)
+            except (QueueFullError, RuntimeError):
+                # Skip this run rather than leave a task nobody will run
+                TaskRepository(self.db).delete_task(queued.task_id)
+                raise
+
+        ScheduleRepository(self.db).update_schedule(
+            schedule.id, {"last_task_id": queued.task_id}
+        )
+        return queued
+
+    async def run_queued_task(self, task_id: str) -> None:
+        """
+        Run a task stored by queue_scraper, continuing from its checkpoint when it
+        was resumed. Tasks cancelled while queued are skipped.
+        """
+        task = await run_in_session_thread(self.db, TaskRepository(self.db).get_task, task_id)
+        if task is None or task.status in TERMINAL_STATUSES + ("cancelling",):
+            return
+
+        metadata = task.cmetadata or {}
+        request = metadata.get("request", {})
+        await self.start_scraper(
+            city=task.city,
+            region=task.region,
+            property_types=request.get("property_types") or task.property_type.split("-y-"),
+            max_pages=task.max_pages,
+            incremental=request.get("incremental", False),
+            stop_after_unchanged_pages=request.get("stop_after_unchanged_pages", 2),
+            enrich_details=request.get("enrich_details", False),
+            sources=metadata.get("sources"),
+            fan_out=request.get("fan_out", False),
+            shard_pages=request.get("shard_pages"),
+            profile=request.get("profile", False),
+            task_id=task.id
+        )
+
+    def cancel_scraper(self, task_id: str) -> Optional[str]:
+        """
+        Cancel a queued or running task and its sub-tasks. A running scraper stops
+        at its next progress write, keeping its checkpoint.
+
+        Returns:
+            The task's new status, or None if the task does not exist
+        """
+        return TaskRepository(self.db).request_cancel(task_id)
+
+    def resume_scraper(self, task_id: str) -> Optional[Task]:
+        """
+        Queue a failed or cancelled task again; it continues from its last saved page
+
+        Returns:
+            The queued task, or None if the task does not exist
+        """
+        return TaskRepository(self.db).requeue_task(task_id, owner=_worker_pool_owner())
+
     async def start_scraper(
         self,
         city: str,
         region: str,
         property_types: List[str],
-        max_pages: int
+        max_pages: int,
+        incremental: bool = False,
+        stop_after_unchanged_pages: int = 2,
+        enrich_details: bool = False,
+        sources: Optional[List[str]] = None,
+        fan_out: bool = False,
+        shard_pages: Optional[int] = None,
+        profile: bool = False,
+        task_id: Optional[str] = None
     ):
         """
         Prepare and start a scraping job
+
+        With `fan_out`, each property type (and each range of `shard_pages` pages)
+        is scraped by its own concurrent sub-task instead of a single sequential crawl
+
+        With `profile`, the job runs under a sampling profiler and its collapsed
+        stacks are stored with the task
         """
         # Generate a task ID
-        task_id = str(uuid.uuid4())[:8]
+        task_id = task_id or str(uuid.uuid4())[:8]
+
+        async with self._profiled(task_id) if profile else nullcontext():
+            return await self._run_scraper_job(
+                city=city,
+                region=region,
+                property_types=property_types,
+                max_pages=max_pages,
+                incremental=incremental,
+                stop_after_unchanged_pages=stop_after_unchanged_pages,
+                enrich_details=enrich_details,
+                sources=sources,
+                fan_out=fan_out,
+                shard_pages=shard_pages,
+                task_id=task_id
+            )
+
+    @asynccontextmanager
+    async def _profiled(self, task_id: str) -> AsyncIterator[None]:
+        """Sample the stacks of the process while a task runs and store them with it"""
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            # Waiting for the sampler thread and saving the profile block, so both
+            # run in worker threads like the other writes of a task
+            await asyncio.to_thread(profiler.stop)
+            await run_in_session_thread(
+                self.db,
+                TaskRepository(self.db).save_profile,
+                task_id,
+                profiler.collapsed(),
+                {
+                    "profile": {
+                        "samples": profiler.samples,
+                        "interval_seconds": profiler.interval_seconds,
+                    }
+                },
+            )
+            logger.info(f"Stored {profiler.samples} profile samples of task {task_id}")
+
+    async def _run_scraper_job(
+        self,
+        city: str,
+        region: str,
+        property_types: List[str],
+        max_pages: int,
+        incremental: bool,
+        stop_after_unchanged_pages: int,
+        enrich_details: bool,
+        sources: Optional[List[str]],
+        fan_out: bool,
+        shard_pages: Optional[int],
+        task_id: str
+    ):
+        if fan_out and (len(property_types) > 1 or (shard_pages and shard_pages < max_pages)):
+            task_id = await scrape_properties_fan_out(
+                city=city,
+                region=region,
+                property_types=property_types,
+                max_pages=max_pages,
+                db=self.db,
+                task_id=task_id,
+                incremental=incremental,
+                stop_after_unchanged_pages=stop_after_unchanged_pages,
+                enrich_details=enrich_details,
+                sources=sources,
+                shard_pages=shard_pages
+            )
+            return {
+                "task_id": task_id,
+                "message": f"Scraping job started for {', '.join(property_types)} in {city}, {region} as parallel sub-tasks"
+            }
         
         # Convert list of property types to FincaRaiz format (joined with "-y-")
         fincaraiz_property_type = "-y-".join(property_types)
@@ -31,7 +352,11 @@ class ScraperUseCases:
             property_type=fincaraiz_property_type,
             max_pages=max_pages,
             db=self.db,
-            task_id=task_id
+            task_id=task_id,
+            incremental=incremental,
+            stop_after_unchanged_pages=stop_after_unchanged_pages,
+            enrich_details=enrich_details,
+            sources=sources
         )
         
         return {
@@ -1,5 +1,10 @@
+import asyncio
+import weakref
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
 
@@ -8,6 +13,16 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Engine of the API routes, created on first use so workers and scripts, which only
+# use the sync engine, do not need the async driver
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+# Serializes the calls run_in_session_thread makes on each sync session
+_session_locks: "weakref.WeakKeyDictionary[Session, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+T = TypeVar("T")
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -15,3 +30,54 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def session_lock(db: Session) -> asyncio.Lock:
+    """Lock held while a worker thread uses a sync session"""
+    lock = _session_locks.get(db)
+    if lock is None:
+        lock = _session_locks[db] = asyncio.Lock()
+    return lock
+
+
+async def run_in_session_thread(db: Session, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking work on a sync session in a worker thread, so coroutines running on
+    the event loop (scrape jobs of the API process) do not stall it. Calls on the
+    same session wait for each other, since a session is not thread-safe.
+    """
+    async with session_lock(db):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get the factory of async sessions, creating the async engine on first use"""
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        _async_engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+        # Objects stay readable after a commit, since expired attributes cannot be
+        # loaded implicitly from an async session
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency of routes that query the database without blocking the event loop"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close the connections of the async engine, if it was created"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
@@ -1,4 +1,13 @@
-from app.db.repositories.property_repository import PropertyRepository
-from app.db.repositories.task_repository import TaskRepository
+from app.db.repositories.price_history_repository import AsyncPriceHistoryRepository
+from app.db.repositories.property_repository import AsyncPropertyRepository, PropertyRepository
+from app.db.repositories.schedule_repository import ScheduleRepository
+from app.db.repositories.task_repository import AsyncTaskRepository, TaskRepository
 
-__all__ = ["PropertyRepository", "TaskRepository"] 
\ No newline at end of file
+__all__ = [
+    "AsyncPriceHistoryRepository",
+    "AsyncPropertyRepository",
+    "AsyncTaskRepository",
+    "PropertyRepository",
+    "ScheduleRepository",
+    "TaskRepository",
+]
@@ -0,0 +1,89 @@
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import logging
+
+from app.models.price_history import PriceHistory
+from app.models.property import Property
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPriceHistoryRepository:
+    """Price history queries on an async session, for API routes"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_price_history(
+        self, property_ids: List[int], since: Optional[datetime] = None
+    ) -> Dict[int, List[PriceHistory]]:
+        """
+        Get the price changes of one or several properties in a single query,
+        oldest first
+
+        Returns:
+            The price changes of each property, keyed by property ID (properties
+            without history are left out)
+        """
+        if not property_ids:
+            return {}
+
+        return _group_by_property(
+            await self.db.scalars(_price_history_query(property_ids, since))
+        )
+
+    async def get_recent_price_drops(
+        self,
+        since: datetime,
+        region: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Tuple[Property, PriceHistory]]:
+        """
+        Get the latest price drops observed since a date, newest first
+
+        The filter on drops matches the partial index on their observation time, so
+        only recent drops are read, whatever the size of the history.
+
+        Returns:
+            (property, price change) pairs
+        """
+        result = await self.db.execute(
+            _recent_price_drops_query(since, region=region, city=city, limit=limit)
+        )
+        return [tuple(row) for row in result]
+
+
+def _price_history_query(property_ids: List[int], since: Optional[datetime]) -> Select:
+    query = select(PriceHistory).where(PriceHistory.property_id.in_(property_ids))
+    if since:
+        query = query.where(PriceHistory.observed_at >= since)
+    return query.order_by(PriceHistory.property_id, PriceHistory.observed_at)
+
+
+def _recent_price_drops_query(
+    since: datetime, region: Optional[str], city: Optional[str], limit: int
+) -> Select:
+    query = (
+        select(Property, PriceHistory)
+        .join(Property, Property.id == PriceHistory.property_id)
+        .where(
+            PriceHistory.price < PriceHistory.previous_price,
+            PriceHistory.observed_at >= since,
+        )
+    )
+    if region:
+        query = query.where(Property.region.ilike(region))
+    if city:
+        query = query.where(Property.city.ilike(city))
+
+    return query.order_by(PriceHistory.observed_at.desc()).limit(limit)
+
+
+def _group_by_property(changes: Iterable[PriceHistory]) -> Dict[int, List[PriceHistory]]:
+    history: Dict[int, List[PriceHistory]] = {}
+    for change in changes:
+        history.setdefault(change.property_id, []).append(change)
+    return history
@@ -1,13 +1,78 @@
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    MetaData,
+    Select,
+    Table,
+    case,
+    cast,
+    func,
+    literal_column,
+    null,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, NamedTuple, Optional
+from datetime import datetime, timezone
+import hashlib
+import json
 import logging
 
+from app.core.metrics import (
+    PERSIST_SECONDS,
+    PROPERTIES_INSERTED_TOTAL,
+    PROPERTIES_UNCHANGED_TOTAL,
+    PROPERTIES_UPDATED_TOTAL,
+)
 from app.models.property import Property
 from app.schemas.property import PropertyCreate
+from app.scrapers.listing_fields import DetailFields
 
 logger = logging.getLogger(__name__)
 
+# Fields filled from search-result cards, compared to detect changed listings
+SCRAPED_FIELDS = (
+    "title",
+    "price",
+    "rooms",
+    "bathrooms",
+    "surface",
+    "surface_unit",
+    "city",
+    "region",
+    "property_type",
+    "image_urls",
+)
+
+# Maximum lengths of the string columns filled from scraped values
+TRUNCATED_FIELDS = {
+    "title": 256,
+    "property_type": 128,
+    "city": 128,
+    "region": 128,
+    "surface_unit": 10,
+}
+
+# Columns of the staging table used by bulk loads
+STAGED_COLUMNS = ("url", *SCRAPED_FIELDS, "content_hash")
+
+# Rows written by a single upsert statement (PostgreSQL takes up to 65535 bind
+# parameters per statement)
+UPSERT_CHUNK_ROWS = 1000
+
+
+class UpsertResult(NamedTuple):
+    inserted: int
+    # Stored properties whose scraped values changed
+    updated: int
+    # Stored properties left untouched since nothing changed
+    unchanged: int = 0
+
 
 class PropertyRepository:
     def __init__(self, db: Session):
@@ -28,57 +93,42 @@ class PropertyRepository:
         """
         Get properties from the database with optional filtering
         """
-        query = self.db.query(Property)
-
-        if city:
-            query = query.filter(Property.city.ilike(f"%{city}%"))
-        if region:
-            query = query.filter(Property.region.ilike(f"%{region}%"))
-        if property_type:
-            query = query.filter(Property.property_type.ilike(f"%{property_type}%"))
-        if min_price:
-            query = query.filter(Property.price >= min_price)
-        if max_price:
-            query = query.filter(Property.price <= max_price)
-        if min_rooms:
-            query = query.filter(Property.rooms >= min_rooms)
-        if min_bathrooms:
-            query = query.filter(Property.bathrooms >= min_bathrooms)
-
-        # Order by creation date descending
-        query = query.order_by(Property.created_at.desc())
-
-        # Paginate results
-        properties = query.offset(skip).limit(limit).all()
+        return list(
+            self.db.scalars(
+                _filtered_properties_query(
+                    city=city,
+                    region=region,
+                    property_type=property_type,
+                    min_price=min_price,
+                    max_price=max_price,
+                    min_rooms=min_rooms,
+                    min_bathrooms=min_bathrooms,
+                    skip=skip,
+                    limit=limit,
+                )
+            )
+        )
 
-        return properties
+    def get_property(self, property_id: int) -> Optional[Property]:
+        """Get a property by ID"""
+        return self.db.get(Property, property_id)
 
     def get_property_count(self) -> int:
         """Get total count of properties"""
-        return self.db.query(Property).count()
+        return self.db.scalar(select(func.count(Property.id)))
 
     def get_property_count_by_city(self) -> List[Dict[str, Any]]:
         """Get property counts grouped by city"""
-        city_stats = (
-            self.db.query(Property.city, self.db.func.count(Property.id).label("count"))
-            .group_by(Property.city)
-            .all()
-        )
-
-        return [{"city": city, "count": count} for city, count in city_stats]
+        return [
+            {"city": city, "count": count}
+            for city, count in self.db.execute(_COUNT_BY_CITY_QUERY)
+        ]
 
     def get_avg_price_by_city(self) -> List[Dict[str, Any]]:
         """Get average prices by city"""
-        price_stats = (
-            self.db.query(
-                Property.city, self.db.func.avg(Property.price).label("avg_price")
-            )
-            .group_by(Property.city)
-            .all()
-        )
-
         return [
-            {"city": city, "avg_price": avg_price} for city, avg_price in price_stats
+            {"city": city, "avg_price": avg_price}
+            for city, avg_price in self.db.execute(_AVG_PRICE_BY_CITY_QUERY)
         ]
 
     def check_existing_property_urls(self, urls: List[str]) -> Dict[str, Property]:
@@ -96,114 +146,471 @@ class PropertyRepository:
 
         return existing_properties
 
-    def update_property(
-        self, property_obj: Property, property_data: Dict[str, Any]
-    ) -> None:
-        """Update an existing property with new data"""
-        for key, value in property_data.items():
-            if hasattr(property_obj, key):
-                if key == "url" and value is not None:
-                    setattr(property_obj, key, str(value))
-                elif key == "image_urls" and value is not None:
-                    setattr(property_obj, key, [str(url) for url in value])
-                else:
-                    setattr(property_obj, key, value)
-
-    def create_property(self, property_data: Dict[str, Any]) -> Property:
-        """Create a new property from data"""
-
-        new_property = Property(
-            url=str(property_data.get("url")),
-            title=property_data.get("title"),
-            price=property_data.get("price"),
-            rooms=property_data.get("rooms"),
-            bathrooms=property_data.get("bathrooms"),
-            surface=property_data.get("surface"),
-            surface_unit=property_data.get("surface_unit", "m²"),
-            city=property_data.get("city"),
-            region=property_data.get("region"),
-            property_type=property_data.get("property_type"),
-            image_urls=[str(url) for url in property_data.get("image_urls", [])],
+    @staticmethod
+    def has_changed(property_obj: Property, property_data: PropertyCreate) -> bool:
+        """Check whether scraped data differs from the stored property"""
+        for key in SCRAPED_FIELDS:
+            value = getattr(property_data, key)
+            if key == "image_urls":
+                value = [str(url) for url in value] if value is not None else None
+            if getattr(property_obj, key) != value:
+                return True
+        return False
+
+    def find_new_or_changed_properties(
+        self, properties: List[PropertyCreate]
+    ) -> List[PropertyCreate]:
+        """
+        Get the scraped properties that are not stored yet or whose values changed
+        """
+        existing_properties = self.check_existing_property_urls(
+            [str(prop.url) for prop in properties if prop.url]
         )
-        self.db.add(new_property)
-        return new_property
+
+        new_or_changed = []
+        for prop in properties:
+            existing = existing_properties.get(str(prop.url))
+            if existing is None:
+                changed = True
+            elif existing.content_hash:
+                changed = existing.content_hash != content_hash(property_row(prop))
+            else:
+                # Stored before content hashes were recorded
+                changed = self.has_changed(existing, prop)
+            if changed:
+                new_or_changed.append(prop)
+        return new_or_changed
+
+    def get_urls_pending_details(
+        self,
+        city: Optional[str] = None,
+        region: Optional[str] = None,
+        limit: Optional[int] = None,
+        url_prefix: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Get the URLs of properties whose detail page has not been fetched yet,
+        newest first
+
+        Args:
+            url_prefix: Only return listings of the portal serving this base URL
+        """
+        query = self.db.query(Property.url).filter(
+            Property.details_fetched_at.is_(None)
+        )
+        if url_prefix:
+            query = query.filter(Property.url.startswith(url_prefix))
+        if city:
+            query = query.filter(Property.city.ilike(city))
+        if region:
+            query = query.filter(Property.region.ilike(region))
+
+        query = query.order_by(Property.created_at.desc())
+        if limit:
+            query = query.limit(limit)
+
+        return [url for (url,) in query.all()]
+
+    def update_properties_details(self, details: Dict[str, DetailFields]) -> int:
+        """
+        Store the detail page data of several properties in a single transaction
+
+        Args:
+            details: Detail page data by property URL
+
+        Returns:
+            Number of properties updated
+        """
+        if not details:
+            return 0
+
+        fetched_at = datetime.now(timezone.utc)
+        properties = self.check_existing_property_urls(list(details))
+        for url, property_obj in properties.items():
+            detail = details[url]
+            # Keep the last known description of listings that were removed
+            if detail.description is not None:
+                property_obj.description = detail.description
+            property_obj.details = detail.attributes
+            property_obj.details_fetched_at = fetched_at
+
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            logger.error(f"Integrity error while saving property details: {str(e)}")
+            self.db.rollback()
+            return 0
+
+        logger.info(f"Saved detail page data of {len(properties)} properties")
+        return len(properties)
 
     def save_properties_batch(
         self, properties: List[PropertyCreate], base_url: Optional[str] = None
-    ) -> None:
+    ) -> UpsertResult:
         """
         Save a batch of properties to the database
 
         Args:
             properties: List of PropertyCreate objects to save
             base_url: Optional base URL for checking invalid URLs
+
+        Returns:
+            Number of properties inserted, updated and left unchanged
         """
-        # Collect all URLs for batch processing
-        all_urls = [str(prop.url) for prop in properties if prop.url]
+        with PERSIST_SECONDS.time():
+            result = self.upsert_properties(properties, base_url)
 
-        # Get existing property URLs in a single query
-        existing_properties = self.check_existing_property_urls(all_urls)
+        PROPERTIES_INSERTED_TOTAL.inc(result.inserted)
+        PROPERTIES_UPDATED_TOTAL.inc(result.updated)
+        PROPERTIES_UNCHANGED_TOTAL.inc(result.unchanged)
+        return result
+
+    def upsert_properties(
+        self, properties: List[PropertyCreate], base_url: Optional[str] = None
+    ) -> UpsertResult:
+        """
+        Insert new properties and update existing ones with INSERT ... ON CONFLICT
+        (url) DO UPDATE, in one statement per UPSERT_CHUNK_ROWS rows and a single
+        transaction. Concurrent scrapes saving the same listing no longer fail on
+        the unique URL index: the last write wins.
+
+        Stored listings are only rewritten when their content hash changed, so
+        re-scraping unchanged listings writes nothing. Listings whose scraped values
+        changed get their detail page fetched again.
+
+        Returns:
+            Number of properties inserted, updated and left unchanged
+        """
+        rows = property_rows(properties, base_url)
+        if not rows:
+            return UpsertResult(0, 0, 0)
+
+        upsert_stmt = _on_url_conflict_update(insert(Property))
+
+        inserted = updated = 0
+        try:
+            for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+                chunk = rows[start : start + UPSERT_CHUNK_ROWS]
+                # Unchanged rows are not written, so they are not returned either
+                for row in self.db.execute(upsert_stmt.values(chunk)):
+                    if row.inserted:
+                        inserted += 1
+                    else:
+                        updated += 1
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error upserting {len(rows)} properties: {str(e)}")
+            self.db.rollback()
+            raise
 
+        result = UpsertResult(inserted, updated, len(rows) - inserted - updated)
         logger.info(
-            f"Found {len(existing_properties)} existing properties out of {len(properties)} scraped"
+            f"Saved {len(rows)} properties to database: {result.inserted} new, "
+            f"{result.updated} changed, {result.unchanged} unchanged"
+        )
+        return result
+
+    def bulk_load_properties(
+        self, properties: Iterable[PropertyCreate], base_url: Optional[str] = None
+    ) -> UpsertResult:
+        """
+        Load a large number of properties, such as an initial load or the replay of
+        archived scrapes: rows are streamed into a temporary staging table with
+        COPY, then merged into properties with a single INSERT ... SELECT ... ON
+        CONFLICT (url) statement, all in one transaction. Like upsert_properties,
+        the last of several properties sharing a URL wins and changed listings get
+        their detail page fetched again.
+
+        Args:
+            properties: Properties to load, consumed lazily (a generator reading an
+                        archive keeps memory use flat)
+            base_url: Optional base URL for checking invalid URLs
+
+        Returns:
+            Number of properties inserted, updated and left unchanged
+        """
+        staging = Table(
+            "properties_staging",
+            MetaData(),
+            Column("seq", BigInteger, nullable=False),
+            *(
+                Column(column.name, column.type)
+                for column in Property.__table__.columns
+                if column.name in STAGED_COLUMNS
+            ),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        copy_sql = (
+            f"COPY {staging.name} (seq, {', '.join(STAGED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
         )
 
-        # Process properties in batches
-        for i, prop_data in enumerate(properties):
-            try:
-                # Skip properties without valid URLs or that match the base URL only
-                if not prop_data.url or (base_url and prop_data.url == f"{base_url}/"):
-                    logger.warning(
-                        f"Skipping property with invalid URL: {prop_data.url}"
-                    )
-                    continue
-
-                # Ensure all string fields are truncated to their max lengths
-                if prop_data.title and len(prop_data.title) > 256:
-                    prop_data.title = prop_data.title[:252] + "..."
-
-                if prop_data.property_type and len(prop_data.property_type) > 128:
-                    prop_data.property_type = prop_data.property_type[:124] + "..."
-
-                if prop_data.city and len(prop_data.city) > 128:
-                    prop_data.city = prop_data.city[:124] + "..."
-
-                if prop_data.region and len(prop_data.region) > 128:
-                    prop_data.region = prop_data.region[:124] + "..."
-
-                if prop_data.surface_unit and len(prop_data.surface_unit) > 10:
-                    prop_data.surface_unit = prop_data.surface_unit[:10]
-
-                if str(prop_data.url) in existing_properties:
-                    # Update existing property
-                    self.update_property(
-                        existing_properties[str(prop_data.url)], prop_data.model_dump()
-                    )
-                    logger.debug(f"Updated existing property: {prop_data.url}")
-                else:
-                    # Create new property
-                    self.create_property(prop_data.model_dump())
-                    logger.debug(f"Added new property: {prop_data.url}")
-
-                # Commit in smaller batches to avoid large transactions
-                if i > 0 and i % 50 == 0:
-                    try:
-                        self.db.commit()
-                        logger.info(
-                            f"Committed batch of properties: {i}/{len(properties)}"
-                        )
-                    except IntegrityError as e:
-                        logger.error(f"Integrity error during batch commit: {str(e)}")
-                        self.db.rollback()
-
-            except Exception as e:
-                logger.error(f"Error saving property to database: {str(e)}")
-                continue
-
-        # Final commit for remaining properties
         try:
+            connection = self.db.connection()
+            staging.create(connection)
+            cursor = connection.connection.cursor()
+            try:
+                cursor.copy_expert(copy_sql, _CopyStream(_staged_lines(properties, base_url)))
+            finally:
+                cursor.close()
+
+            latest = (
+                select(*(staging.c[name] for name in STAGED_COLUMNS))
+                .distinct(staging.c.url)
+                .order_by(staging.c.url, staging.c.seq.desc())
+            )
+            merged = _on_url_conflict_update(
+                insert(Property).from_select(list(STAGED_COLUMNS), latest)
+            ).cte("merged")
+            inserted, updated, loaded = self.db.execute(
+                select(
+                    func.count().filter(merged.c.inserted),
+                    func.count().filter(~merged.c.inserted),
+                    select(func.count(staging.c.url.distinct())).scalar_subquery(),
+                ).select_from(merged)
+            ).one()
             self.db.commit()
-            logger.info(f"Successfully saved {len(properties)} properties to database")
-        except IntegrityError as e:
-            logger.error(f"Integrity error during final commit: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error bulk loading properties: {str(e)}")
             self.db.rollback()
+            raise
+
+        result = UpsertResult(inserted, updated, loaded - inserted - updated)
+        logger.info(
+            f"Bulk loaded properties: {result.inserted} new, {result.updated} changed, "
+            f"{result.unchanged} unchanged"
+        )
+        return result
+
+
+class AsyncPropertyRepository:
+    """
+    Read queries of PropertyRepository on an async session, used by API routes so
+    that waiting on the database does not block the event loop
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_properties_with_filters(
+        self,
+        city: Optional[str] = None,
+        region: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rooms: Optional[int] = None,
+        min_bathrooms: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[Property]:
+        """
+        Get properties from the database with optional filtering
+        """
+        result = await self.db.scalars(
+            _filtered_properties_query(
+                city=city,
+                region=region,
+                property_type=property_type,
+                min_price=min_price,
+                max_price=max_price,
+                min_rooms=min_rooms,
+                min_bathrooms=min_bathrooms,
+                skip=skip,
+                limit=limit,
+            )
+        )
+        return list(result)
+
+    async def get_property(self, property_id: int) -> Optional[Property]:
+        """Get a property by ID"""
+        return await self.db.get(Property, property_id)
+
+    async def get_property_count(self) -> int:
+        """Get total count of properties"""
+        return await self.db.scalar(select(func.count(Property.id)))
+
+    async def get_property_count_by_city(self) -> List[Dict[str, Any]]:
+        """Get property counts grouped by city"""
+        result = await self.db.execute(_COUNT_BY_CITY_QUERY)
+        return [{"city": city, "count": count} for city, count in result]
+
+    async def get_avg_price_by_city(self) -> List[Dict[str, Any]]:
+        """Get average prices by city"""
+        result = await self.db.execute(_AVG_PRICE_BY_CITY_QUERY)
+        return [
+            {"city": city, "avg_price": avg_price} for city, avg_price in result
+        ]
+
+
+def _filtered_properties_query(
+    city: Optional[str] = None,
+    region: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rooms: Optional[int] = None,
+    min_bathrooms: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> Select:
+    """Statement selecting a page of properties matching the filters, newest first"""
+    query = select(Property)
+
+    if city:
+        query = query.where(Property.city.ilike(f"%{city}%"))
+    if region:
+        query = query.where(Property.region.ilike(f"%{region}%"))
+    if property_type:
+        query = query.where(Property.property_type.ilike(f"%{property_type}%"))
+    if min_price:
+        query = query.where(Property.price >= min_price)
+    if max_price:
+        query = query.where(Property.price <= max_price)
+    if min_rooms:
+        query = query.where(Property.rooms >= min_rooms)
+    if min_bathrooms:
+        query = query.where(Property.bathrooms >= min_bathrooms)
+
+    return query.order_by(Property.created_at.desc()).offset(skip).limit(limit)
+
+
+_COUNT_BY_CITY_QUERY = select(
+    Property.city, func.count(Property.id).label("count")
+).group_by(Property.city)
+
+_AVG_PRICE_BY_CITY_QUERY = select(
+    Property.city, func.avg(Property.price).label("avg_price")
+).group_by(Property.city)
+
+
+def _on_url_conflict_update(insert_stmt):
+    """
+    Make an INSERT into properties update the scraped fields of listings already
+    stored whose content hash changed, clearing details_fetched_at when their
+    values changed, and return whether each written row was inserted
+    """
+    excluded = insert_stmt.excluded
+    changed = or_(
+        *(
+            _comparable(getattr(Property, field)).is_distinct_from(
+                _comparable(getattr(excluded, field))
+            )
+            for field in SCRAPED_FIELDS
+        )
+    )
+    return insert_stmt.on_conflict_do_update(
+        index_elements=[Property.url],
+        set_={
+            **{field: getattr(excluded, field) for field in SCRAPED_FIELDS},
+            "details_fetched_at": case(
+                (changed, null()), else_=Property.details_fetched_at
+            ),
+            "content_hash": excluded.content_hash,
+            "updated_at": func.now(),
+        },
+        where=Property.content_hash.is_distinct_from(excluded.content_hash),
+    ).returning(
+        # xmax is only set on rows updated by the statement
+        literal_column("(xmax = 0)").label("inserted")
+    )
+
+def _comparable(column):
+    """JSON has no equality operator, so JSON columns are compared as JSONB"""
+    if isinstance(column.type, JSON):
+        return cast(column, JSONB)
+    return column
+
+
+def property_row(
+    prop: PropertyCreate, base_url: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Turn a scraped property into a row of the properties table, truncating strings
+    to their column lengths
+
+    Returns:
+        The row, or None when the property has no usable URL
+    """
+    if not prop.url or (base_url and str(prop.url) == f"{base_url}/"):
+        logger.warning(f"Skipping property with invalid URL: {prop.url}")
+        return None
+
+    row = prop.model_dump(include={"url", *SCRAPED_FIELDS})
+    row["url"] = str(prop.url)
+    if prop.image_urls is not None:
+        row["image_urls"] = [str(url) for url in prop.image_urls]
+    for field, max_length in TRUNCATED_FIELDS.items():
+        value = row.get(field)
+        if value and len(value) > max_length:
+            row[field] = value[:max_length] if field == "surface_unit" else value[: max_length - 4] + "..."
+    row["content_hash"] = content_hash(row)
+    return row
+
+
+def content_hash(values: Dict[str, Any]) -> str:
+    """Fingerprint of the scraped fields of a listing, used to skip no-op updates"""
+    content = json.dumps([values.get(field) for field in SCRAPED_FIELDS], default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def property_rows(
+    properties: List[PropertyCreate], base_url: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Turn scraped properties into rows of the properties table. Properties without a
+    usable URL are skipped, and only the last of several properties sharing a URL is
+    kept, since a single upsert statement cannot update a row twice. Rows are sorted
+    by URL, so concurrent upserts lock the rows they share in the same order and
+    cannot deadlock.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for prop in properties:
+        row = property_row(prop, base_url)
+        if row is not None:
+            rows[row["url"]] = row
+
+    return [rows[url] for url in sorted(rows)]
+
+
+def _csv_value(value: Any) -> str:
+    """Format a value for COPY ... (FORMAT csv), where an unquoted empty value is NULL"""
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, list):
+        value = json.dumps(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _staged_lines(
+    properties: Iterable[PropertyCreate], base_url: Optional[str]
+) -> Iterator[str]:
+    """CSV lines of the staging table, numbered so the last duplicate URL wins"""
+    for seq, prop in enumerate(properties):
+        row = property_row(prop, base_url)
+        if row is None:
+            continue
+        values = [seq, *(row.get(name) for name in STAGED_COLUMNS)]
+        yield ",".join(_csv_value(value) for value in values) + "\n"
+
+
+class _CopyStream:
+    """File-like object feeding lines to COPY ... FROM STDIN as they are produced"""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
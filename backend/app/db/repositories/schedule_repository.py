@@ -0,0 +1,99 @@
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+import logging
+import random
+
+from app.models.scrape_schedule import ScrapeSchedule
+
+logger = logging.getLogger(__name__)
+
+
+def next_run_time(
+    after: datetime, interval_minutes: float, jitter_seconds: float
+) -> datetime:
+    """Time of a schedule's next run: one interval later, plus a random delay"""
+    return after + timedelta(
+        minutes=interval_minutes, seconds=random.uniform(0, max(0.0, jitter_seconds))
+    )
+
+
+class ScheduleRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_schedule(self, schedule_id: int) -> Optional[ScrapeSchedule]:
+        """Get a schedule by ID"""
+        return self.db.query(ScrapeSchedule).filter(ScrapeSchedule.id == schedule_id).first()
+
+    def get_schedules(self) -> List[ScrapeSchedule]:
+        """Get every schedule"""
+        return self.db.query(ScrapeSchedule).order_by(ScrapeSchedule.name).all()
+
+    def create_schedule(
+        self, schedule_data: Dict[str, Any], jitter_seconds: float = 0
+    ) -> ScrapeSchedule:
+        """Create a schedule; its first run is due right away, plus jitter"""
+        schedule = ScrapeSchedule(**schedule_data)
+        schedule.next_run_at = next_run_time(
+            datetime.now(timezone.utc), 0, jitter_seconds
+        )
+        self.db.add(schedule)
+        self.db.commit()
+        self.db.refresh(schedule)
+        return schedule
+
+    def update_schedule(
+        self, schedule_id: int, update_data: Dict[str, Any]
+    ) -> Optional[ScrapeSchedule]:
+        """Update a schedule with new data"""
+        schedule = self.get_schedule(schedule_id)
+        if not schedule:
+            return None
+
+        for key, value in update_data.items():
+            if hasattr(schedule, key):
+                setattr(schedule, key, value)
+
+        self.db.commit()
+        self.db.refresh(schedule)
+        return schedule
+
+    def delete_schedule(self, schedule_id: int) -> bool:
+        """Delete a schedule"""
+        schedule = self.get_schedule(schedule_id)
+        if not schedule:
+            return False
+
+        self.db.delete(schedule)
+        self.db.commit()
+        return True
+
+    def claim_due_schedules(
+        self, jitter_seconds: float, limit: int = 20
+    ) -> List[ScrapeSchedule]:
+        """
+        Claim the enabled schedules whose next run is due, moving their next run one
+        interval (plus jitter) ahead
+
+        Rows are locked with FOR UPDATE SKIP LOCKED, so when several processes run the
+        scheduler each due run is claimed once.
+        """
+        now = datetime.now(timezone.utc)
+        schedules = (
+            self.db.query(ScrapeSchedule)
+            .filter(ScrapeSchedule.enabled.is_(True), ScrapeSchedule.next_run_at <= now)
+            .order_by(ScrapeSchedule.next_run_at)
+            .with_for_update(skip_locked=True)
+            .limit(limit)
+            .all()
+        )
+
+        for schedule in schedules:
+            schedule.last_run_at = now
+            schedule.next_run_at = next_run_time(
+                now, schedule.interval_minutes, jitter_seconds
+            )
+
+        self.db.commit()
+        return schedules
@@ -1,12 +1,29 @@
+from sqlalchemy import JSON, DateTime, Integer, cast, extract, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import json
 import logging
 
 from app.models.task import Task
 
 logger = logging.getLogger(__name__)
 
+# Statuses of tasks that stopped running
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Statuses of tasks that identical requests attach to
+IN_FLIGHT_STATUSES = ("pending", "running")
+
+
+def _merged_metadata(metadata: Dict[str, Any]):
+    """SQL expression merging values into a task's metadata without reading it"""
+    current = func.coalesce(cast(Task.cmetadata, JSONB), cast(literal("{}"), JSONB))
+    patch = cast(literal(json.dumps(metadata, default=str)), JSONB)
+    return cast(current.op("||")(patch), JSON)
+
 
 class TaskRepository:
     def __init__(self, db: Session):
@@ -26,6 +43,15 @@ class TaskRepository:
             .all()
         )
 
+    def get_child_tasks(self, parent_id: str) -> List[Task]:
+        """Get the sub-tasks of a task"""
+        return (
+            self.db.query(Task)
+            .filter(Task.parent_id == parent_id)
+            .order_by(Task.id)
+            .all()
+        )
+
     def get_task_count(self) -> int:
         """Get total count of tasks"""
         return self.db.query(Task).count()
@@ -44,12 +70,48 @@ class TaskRepository:
             max_pages=task_data.get("max_pages"),
             status=task_data.get("status", "pending"),
             start_time=task_data.get("start_time", datetime.now(timezone.utc)),
+            cmetadata=task_data.get("cmetadata"),
+            parent_id=task_data.get("parent_id"),
+            priority=task_data.get("priority", 0),
+            dedup_key=task_data.get("dedup_key"),
+            lease_owner=task_data.get("lease_owner"),
         )
         self.db.add(new_task)
         self.db.commit()
         self.db.refresh(new_task)
         return new_task
 
+    def get_in_flight_task(self, dedup_key: str) -> Optional[Task]:
+        """Get the pending or running task of a request"""
+        return (
+            self.db.query(Task)
+            .filter(Task.dedup_key == dedup_key, Task.status.in_(IN_FLIGHT_STATUSES))
+            .first()
+        )
+
+    def create_or_attach_task(self, task_data: Dict[str, Any]) -> Tuple[Task, bool]:
+        """
+        Create a task, unless a pending or running task has the same dedup_key
+
+        The unique index on in-flight dedup keys settles races between identical
+        requests: the losing insert attaches to the task that won.
+
+        Returns:
+            The task, and whether it is an existing in-flight task
+        """
+        dedup_key = task_data.get("dedup_key")
+        if dedup_key and (task := self.get_in_flight_task(dedup_key)):
+            return task, True
+
+        try:
+            return self.create_task(task_data), False
+        except IntegrityError:
+            self.db.rollback()
+            task = self.get_in_flight_task(dedup_key) if dedup_key else None
+            if task is None:
+                raise
+            return task, True
+
     def update_task(self, task_id: str, update_data: Dict[str, Any]) -> Optional[Task]:
         """Update a task with new data"""
         task = self.get_task(task_id)
@@ -64,41 +126,105 @@ class TaskRepository:
         self.db.refresh(task)
         return task
 
+    def write_progress(
+        self,
+        task_id: str,
+        properties_found: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """
+        Record the progress of a running task in a single UPDATE, merging `metadata`
+        into its metadata, without touching its status (which a cancel request may
+        have changed)
+
+        Returns:
+            The task's status, or None if the task does not exist
+        """
+        values: Dict[str, Any] = {"properties_found": properties_found}
+        if metadata:
+            values["cmetadata"] = _merged_metadata(metadata)
+
+        status = self.db.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+            .returning(Task.status)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        self.db.commit()
+        return status
+
     def update_task_status(
-        self, task_id: str, status: str, properties_found: Optional[int] = None, error: Optional[str] = None
-    ) -> Optional[Task]:
-        """Update task status and related fields"""
-        update_data: Dict[str, Any] = {"status": status}
+        self,
+        task_id: str,
+        status: str,
+        properties_found: Optional[int] = None,
+        error: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Update task status and related fields in a single UPDATE; the duration of
+        finished tasks is computed by the database from their start time
+
+        Returns:
+            Whether the task exists
+        """
+        values: Dict[str, Any] = {"status": status}
 
         if properties_found is not None:
-            update_data["properties_found"] = properties_found
+            values["properties_found"] = properties_found
+
+        if error:
+            values["error"] = error
+
+        if status in TERMINAL_STATUSES:
+            end_time = datetime.now(timezone.utc)
+            values["end_time"] = end_time
+            values["duration_seconds"] = cast(
+                extract("epoch", literal(end_time, DateTime(timezone=True)) - Task.start_time),
+                Integer,
+            )
 
-        if status == "completed":
-            update_data["end_time"] = datetime.now(timezone.utc)
+        logger.info(f"Updating task {task_id} with data: {values}")
 
-            if task := self.get_task(task_id):
-                # Calculate duration
-                if task.start_time and update_data["end_time"]:
-                    duration = (
-                        update_data["end_time"] - task.start_time
-                    ).total_seconds()
-                    update_data["duration_seconds"] = int(duration)
+        if metadata:
+            values["cmetadata"] = _merged_metadata(metadata)
 
-        elif status == "failed" and error:
-            update_data["end_time"] = datetime.now(timezone.utc)
-            update_data["error"] = error
+        result = self.db.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def save_profile(
+        self, task_id: str, profile: str, metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Store the collapsed stacks sampled while a task ran, merging `metadata`
+        (a summary of the profile) into its metadata
 
-            if task := self.get_task(task_id):
-                # Calculate duration for failed tasks too
-                if task.start_time and update_data["end_time"]:
-                    duration = (
-                        update_data["end_time"] - task.start_time
-                    ).total_seconds()
-                    update_data["duration_seconds"] = int(duration)
+        Returns:
+            Whether the task exists
+        """
+        values: Dict[str, Any] = {"profile": profile}
+        if metadata:
+            values["cmetadata"] = _merged_metadata(metadata)
 
-        logger.info(f"Updating task {task_id} with data: {update_data}")
+        result = self.db.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
 
-        return self.update_task(task_id, update_data)
+    def get_profile(self, task_id: str) -> Optional[str]:
+        """Get the collapsed stacks of a profiled task"""
+        return self.db.query(Task.profile).filter(Task.id == task_id).scalar()
 
     def delete_task(self, task_id: str) -> bool:
         """Delete a task"""
@@ -109,3 +235,251 @@ class TaskRepository:
         self.db.delete(task)
         self.db.commit()
         return True
+
+    def request_cancel(self, task_id: str) -> Optional[str]:
+        """
+        Cancel a task and its unfinished sub-tasks
+
+        Pending tasks are cancelled right away. Running tasks are marked as
+        cancelling, and their scraper stops cooperatively at its next progress write.
+
+        Returns:
+            The task's new status, or None if the task does not exist
+        """
+        task = self.get_task(task_id)
+        if not task:
+            return None
+
+        now = datetime.now(timezone.utc)
+        for ids in ([task_id], [child.id for child in self.get_child_tasks(task_id)]):
+            if not ids:
+                continue
+            self.db.execute(
+                update(Task)
+                .where(Task.id.in_(ids), Task.status == "pending")
+                .values(status="cancelled", end_time=now)
+            )
+            self.db.execute(
+                update(Task)
+                .where(Task.id.in_(ids), Task.status == "running")
+                .values(status="cancelling")
+            )
+        self.db.commit()
+        self.db.refresh(task)
+        return task.status
+
+    def requeue_task(self, task_id: str, owner: Optional[str] = None) -> Optional[Task]:
+        """
+        Put a stopped task back in the queue, keeping its checkpoint
+
+        Args:
+            owner: API process running the task, with the memory queue backend
+        """
+        return self.update_task(
+            task_id,
+            {
+                "status": "pending",
+                # An identical request may be in flight by now
+                "dedup_key": None,
+                "error": None,
+                "end_time": None,
+                "duration_seconds": None,
+                "attempts": 0,
+                "lease_owner": owner,
+                "lease_expires_at": None,
+            },
+        )
+
+    def fail_owned_tasks(self, owner: str, error: str) -> int:
+        """
+        Fail the unfinished tasks of an API process, and their sub-tasks; run on its
+        startup when jobs run in the API process, since its previous jobs died with
+        it while those of other processes are still running
+
+        Args:
+            owner: Identifier the process recorded as lease owner of its tasks
+
+        Returns:
+            Number of tasks failed
+        """
+        owned_ids = select(Task.id).where(Task.lease_owner == owner).scalar_subquery()
+        failed = self.db.execute(
+            update(Task)
+            .where(
+                Task.status.in_(IN_FLIGHT_STATUSES + ("cancelling",)),
+                (Task.lease_owner == owner) | Task.parent_id.in_(owned_ids),
+            )
+            .values(status="failed", error=error, end_time=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return failed
+
+    def count_pending_tasks(self) -> int:
+        """Get the number of queued top-level tasks"""
+        return (
+            self.db.query(Task)
+            .filter(Task.status == "pending", Task.parent_id.is_(None))
+            .count()
+        )
+
+    def claim_next_task(self, owner: str, lease_seconds: float) -> Optional[Task]:
+        """
+        Claim the next queued task for a worker
+
+        The row is locked with FOR UPDATE SKIP LOCKED, so concurrent workers on any
+        node never claim the same task and do not wait for each other.
+
+        Args:
+            owner: Identifier of the claiming worker
+            lease_seconds: How long the claim holds without a heartbeat
+
+        Returns:
+            The claimed task, now running, or None when the queue is empty
+        """
+        task = (
+            self.db.query(Task)
+            .filter(Task.status == "pending", Task.parent_id.is_(None))
+            .order_by(Task.priority.desc(), Task.start_time)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+            .first()
+        )
+        if task is None:
+            self.db.rollback()
+            return None
+
+        task.status = "running"
+        task.lease_owner = owner
+        task.lease_expires_at = datetime.now(timezone.utc) + timedelta(
+            seconds=lease_seconds
+        )
+        task.attempts = (task.attempts or 0) + 1
+
+        self.db.commit()
+        self.db.refresh(task)
+        return task
+
+    def renew_lease(self, task_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Extend a worker's lease on a running task
+
+        Returns:
+            False when the worker lost the lease (it expired and was reclaimed, or
+            the task is not running anymore)
+        """
+        result = self.db.execute(
+            update(Task)
+            .where(
+                Task.id == task_id,
+                Task.lease_owner == owner,
+                Task.status.in_(("running", "cancelling")),
+            )
+            .values(
+                lease_expires_at=datetime.now(timezone.utc)
+                + timedelta(seconds=lease_seconds)
+            )
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def release_lease(self, task_id: str, owner: str) -> None:
+        """Drop a worker's lease once it stopped working on a task"""
+        self.db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.lease_owner == owner)
+            .values(lease_owner=None, lease_expires_at=None)
+        )
+        self.db.commit()
+
+    def reclaim_expired_tasks(self, max_attempts: int) -> int:
+        """
+        Put running tasks whose lease expired back in the queue; tasks that already
+        used `max_attempts` attempts are failed instead, and tasks being cancelled
+        are cancelled
+
+        Returns:
+            Number of tasks reclaimed, failed or cancelled
+        """
+        now = datetime.now(timezone.utc)
+        expired = (
+            Task.lease_expires_at.is_not(None),
+            Task.lease_expires_at < now,
+        )
+        released = dict(lease_owner=None, lease_expires_at=None)
+
+        cancelled = self.db.execute(
+            update(Task)
+            .where(*expired, Task.status == "cancelling")
+            .values(status="cancelled", end_time=now, **released)
+        ).rowcount
+
+        failed = self.db.execute(
+            update(Task)
+            .where(*expired, Task.status == "running", Task.attempts >= max_attempts)
+            .values(
+                status="failed",
+                error=f"Worker lease expired after {max_attempts} attempts",
+                end_time=now,
+                **released,
+            )
+        ).rowcount
+        requeued = self.db.execute(
+            update(Task)
+            .where(*expired, Task.status == "running")
+            .values(status="pending", **released)
+        ).rowcount
+        self.db.commit()
+
+        if failed or requeued or cancelled:
+            logger.warning(
+                f"Reclaimed expired task leases: {requeued} queued again, {failed} failed, {cancelled} cancelled"
+            )
+        return failed + requeued + cancelled
+
+
+class AsyncTaskRepository:
+    """
+    Read queries of TaskRepository on an async session, used by API routes so that
+    waiting on the database does not block the event loop
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_task(self, task_id: str) -> Optional[Task]:
+        """Get a task by ID"""
+        return await self.db.get(Task, task_id)
+
+    async def get_tasks(self, skip: int = 0, limit: int = 20) -> List[Task]:
+        """Get all tasks with pagination"""
+        result = await self.db.scalars(
+            select(Task).order_by(Task.start_time.desc()).offset(skip).limit(limit)
+        )
+        return list(result)
+
+    async def get_task_count(self) -> int:
+        """Get total count of tasks"""
+        return await self.db.scalar(select(func.count(Task.id)))
+
+    async def count_pending_tasks(self) -> int:
+        """Get the number of queued top-level tasks"""
+        return await self.db.scalar(
+            select(func.count(Task.id)).where(
+                Task.status == "pending", Task.parent_id.is_(None)
+            )
+        )
+
+    async def get_profile(self, task_id: str) -> Optional[str]:
+        """Get the collapsed stacks of a profiled task"""
+        return await self.db.scalar(select(Task.profile).where(Task.id == task_id))
+
+    async def get_active_tasks(self, finished_since: datetime) -> List[Task]:
+        """Get the unfinished tasks and those that finished after `finished_since`"""
+        result = await self.db.scalars(
+            select(Task).where(
+                Task.status.in_(IN_FLIGHT_STATUSES + ("cancelling",))
+                | (Task.end_time >= finished_since)
+            )
+        )
+        return list(result)
@@ -1,10 +1,26 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
 import sys
+import time
 
 from app.api.routes import router as api_router
 from app.core.config import settings
+from app.core.metrics import HTTP_REQUEST_SECONDS, QUEUE_DEPTH, get_metrics_registry
+from app.core.usecases import ScraperUseCases
+from app.db import SessionLocal, dispose_async_engine
+from app.db.repositories.task_repository import TaskRepository
+from app.scrapers.http_client import close_http_client, start_http_client
+from app.scrapers.parse_pool import shutdown_parse_executor
+from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.worker_pool import (
+    get_worker_pool,
+    start_worker_pool,
+    stop_worker_pool,
+    worker_pool_owner_id,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -17,10 +33,69 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+def fail_interrupted_tasks() -> None:
+    """
+    Fail the tasks left unfinished by a previous run of the API process, so they can
+    be resumed and identical requests do not attach to them
+    """
+    db = SessionLocal()
+    try:
+        failed = TaskRepository(db).fail_owned_tasks(
+            worker_pool_owner_id(), "Interrupted by an application restart"
+        )
+        if failed:
+            logger.warning(f"Failed {failed} tasks interrupted by the last shutdown")
+    except Exception as e:
+        logger.error(f"Could not fail interrupted tasks: {str(e)}")
+    finally:
+        db.close()
+
+
+def collect_queue_depth() -> None:
+    """Read the number of waiting scrape jobs when metrics are scraped"""
+    worker_pool = get_worker_pool()
+    if worker_pool is not None:
+        QUEUE_DEPTH.set(worker_pool.queue_depth)
+        return
+
+    db = SessionLocal()
+    try:
+        QUEUE_DEPTH.set(TaskRepository(db).count_pending_tasks())
+    except Exception as e:
+        logger.warning(f"Could not count pending tasks: {str(e)}")
+    finally:
+        db.close()
+
+
+get_metrics_registry().add_collector(collect_queue_depth)
+
+
+def run_schedule(schedule, db):
+    return ScraperUseCases(db).queue_scheduled_scrape(schedule)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SCRAPER_QUEUE_BACKEND == "memory":
+        fail_interrupted_tasks()
+    await start_http_client()
+    await start_worker_pool()
+    if settings.SCRAPER_SCHEDULER_ENABLED:
+        await start_scheduler(SessionLocal, run_schedule)
+    yield
+    await stop_scheduler()
+    await stop_worker_pool()
+    await close_http_client()
+    await dispose_async_engine()
+    shutdown_parse_executor()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Real estate scraper for Colombian properties",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -35,6 +110,32 @@ app.add_middleware(
 # Include routers
 app.include_router(api_router)
 
+# Requests whose latency is recorded, per route
+TIMED_PATH_PREFIX = f"{settings.API_V1_STR}/properties"
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    if not request.url.path.startswith(TIMED_PATH_PREFIX):
+        return await call_next(request)
+
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label with the route template rather than the raw path, so path
+        # parameters do not create a series per value
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            route=getattr(route, "path", request.url.path),
+            status=str(status),
+        )
+
 @app.get("/")
 async def root():
     return {
@@ -46,6 +147,13 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        get_metrics_registry().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
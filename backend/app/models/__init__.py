@@ -1,4 +1,6 @@
+from app.models.price_history import PriceHistory
 from app.models.property import Property
+from app.models.scrape_schedule import ScrapeSchedule
 from app.models.task import Task
 
-__all__ = ["Property", "Task"]
+__all__ = ["PriceHistory", "Property", "ScrapeSchedule", "Task"]
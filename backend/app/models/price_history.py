@@ -0,0 +1,33 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, text
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class PriceHistory(Base):
+    """
+    Price of a listing over time. A row is appended by a database trigger when a
+    property is inserted with a price or its price changes, whichever code path
+    writes it (upserts, bulk loads, the ORM).
+    """
+
+    __tablename__ = "price_history"
+
+    id = Column(BigInteger, primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    price = Column(Float, nullable=True)
+    # Price before the change (NULL for the first observation), so drops are found
+    # without comparing consecutive rows
+    previous_price = Column(Float, nullable=True)
+    observed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_price_history_property_id_observed_at", "property_id", "observed_at"),
+        # Price drops are a small share of the history; indexing only them keeps
+        # "recent drops" queries to a short range scan as the history grows
+        Index(
+            "ix_price_history_drops_observed_at",
+            "observed_at",
+            postgresql_where=text("price < previous_price"),
+        ),
+    )
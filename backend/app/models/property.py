@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Index, Integer, String, Float, DateTime, Text, JSON
 from sqlalchemy.sql import func
 
 from app.db import Base
@@ -20,5 +20,28 @@ class Property(Base):
     description = Column(Text, nullable=True)
     property_type = Column(String(128), nullable=True)
     image_urls = Column(JSON, nullable=True, default=list)
+    # Extended attributes parsed from the detail page, and when it was last fetched
+    # (NULL while the listing is new or changed and waiting for enrichment)
+    details = Column(JSON, nullable=True)
+    details_fetched_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # Hash of the scraped fields; re-scraped listings are only rewritten when it changes
+    content_hash = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now()) 
+
+    __table_args__ = (
+        # Trigram indexes serve the substring (ILIKE '%...%') filters of the listing API
+        *(
+            Index(
+                f"ix_properties_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("city", "region", "property_type")
+        ),
+        # Newest listings first, with price filters checked in the index
+        Index("ix_properties_created_at_price", "created_at", "price"),
+        # Minimum rooms and bathrooms, with price filters checked in the index
+        Index("ix_properties_rooms_bathrooms_price", "rooms", "bathrooms", "price"),
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, JSON, String
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class ScrapeSchedule(Base):
+    __tablename__ = "scrape_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(128), unique=True, nullable=False)
+    city = Column(String(128), nullable=False)
+    region = Column(String(128), nullable=False)
+    property_types = Column(JSON, nullable=False)
+    max_pages = Column(Integer, nullable=False, default=5)
+    # Options of the scrape request (incremental, sources, fan_out, ...)
+    options = Column(JSON, nullable=True)
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    interval_minutes = Column(Integer, nullable=False)
+    enabled = Column(Boolean, nullable=False, default=True, server_default="true")
+    # When the scheduler queues the next run, jitter included
+    next_run_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_task_id = Column(String(8), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
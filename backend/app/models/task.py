@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index, text
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db import Base
@@ -12,10 +13,46 @@ class Task(Base):
     region = Column(String(128), nullable=False)
     property_type = Column(String(256), nullable=False)
     max_pages = Column(Integer, nullable=False, default=5)
-    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, cancelling, completed, failed, cancelled
     properties_found = Column(Integer, nullable=True)
     error = Column(Text, nullable=True)
     start_time = Column(DateTime(timezone=True), server_default=func.now())
     end_time = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
-    cmetadata = Column(JSON, nullable=True)
\ No newline at end of file
+    cmetadata = Column(JSON, nullable=True)
+    # Set on the sub-tasks of a request split by property type or page range
+    parent_id = Column(String(8), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True, index=True)
+    # Durable queue: pending tasks are claimed by workers, which hold a lease on them
+    # while running and renew it with heartbeats
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    lease_owner = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    # Hash of the request options; identical requests attach to the pending or running
+    # task holding the same key instead of starting a duplicate crawl
+    dedup_key = Column(String(64), nullable=True)
+    # Collapsed stacks sampled while a profiled task ran; only loaded when accessed
+    profile = deferred(Column(Text, nullable=True))
+
+    __table_args__ = (
+        # Workers look for the next pending top-level task by priority and age
+        Index(
+            "ix_tasks_queue",
+            status,
+            priority.desc(),
+            start_time,
+            postgresql_where=text("parent_id IS NULL"),
+        ),
+        # Expired leases are looked up among running tasks
+        Index(
+            "ix_tasks_lease_expires_at",
+            lease_expires_at,
+            postgresql_where=text("status = 'running'"),
+        ),
+        Index(
+            "ux_tasks_dedup_key_in_flight",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
@@ -1,7 +1,9 @@
 from app.schemas.property import PropertyBase, PropertyCreate, PropertyResponse, ScraperRequest
+from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse
 from app.schemas.task import TaskBase, TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, ScrapingLogResponse
 
 __all__ = [
     "PropertyBase", "PropertyCreate", "PropertyResponse", "ScraperRequest",
+    "ScheduleCreate", "ScheduleUpdate", "ScheduleResponse",
     "TaskBase", "TaskCreate", "TaskUpdate", "TaskResponse", "TaskListResponse", "ScrapingLogResponse"
 ]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, Field, ConfigDict
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 
@@ -23,14 +23,45 @@ class PropertyCreate(PropertyBase):
 
 class PropertyResponse(PropertyBase):
     id: int
+    description: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class PricePoint(BaseModel):
+    price: Optional[float] = None
+    previous_price: Optional[float] = None
+    observed_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PriceHistoryResponse(BaseModel):
+    property_id: int
+    prices: List[PricePoint]
+
+
+class PriceDropResponse(BaseModel):
+    property: PropertyResponse
+    price: float
+    previous_price: float
+    drop_percent: float
+    observed_at: datetime
+
+
 class ScraperRequest(BaseModel):
     city: str
     region: str
     property_types: Optional[List[str]] = Field(["casas"], description="List of property types to search for (e.g., 'casas', 'apartamentos', 'fincas', etc.)")
-    max_pages: Optional[int] = Field(5, description="Maximum number of pages to scrape", ge=1, le=100) 
\ No newline at end of file
+    max_pages: Optional[int] = Field(5, description="Maximum number of pages to scrape", ge=1, le=100)
+    incremental: Optional[bool] = Field(False, description="Only save new or changed listings and stop once pages contain only known ones")
+    stop_after_unchanged_pages: Optional[int] = Field(2, description="Consecutive pages without new or changed listings that stop an incremental scrape", ge=1)
+    sources: Optional[List[str]] = Field(["fincaraiz"], description="Portals to scrape concurrently (see GET /scrape/sources)")
+    fan_out: Optional[bool] = Field(False, description="Scrape each property type (and page range, see shard_pages) as its own concurrent sub-task")
+    shard_pages: Optional[int] = Field(None, description="With fan_out, pages scraped by each sub-task of a property type", ge=1)
+    priority: Optional[int] = Field(0, description="Queued jobs with higher priorities start first", ge=-10, le=10)
+    enrich_details: Optional[bool] = Field(False, description="Fetch the detail pages of new or changed listings to fill their description and extended attributes")
+    profile: Optional[bool] = Field(False, description="Run the job under a sampling profiler; its collapsed stacks are downloaded from GET /scrape/{task_id}/profile") 
\ No newline at end of file
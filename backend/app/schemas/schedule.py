@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+
+
+class ScheduleBase(BaseModel):
+    name: str = Field(..., description="Unique name of the schedule", max_length=128)
+    city: str
+    region: str
+    property_types: List[str] = Field(["casas"], description="Property types to search for")
+    max_pages: int = Field(5, description="Maximum number of pages to scrape", ge=1, le=100)
+    interval_minutes: int = Field(..., description="Minutes between runs, before jitter", ge=1)
+    priority: int = Field(0, description="Priority of the queued runs", ge=-10, le=10)
+    enabled: bool = True
+
+
+class ScheduleCreate(ScheduleBase):
+    incremental: bool = Field(False, description="Run incremental scrapes")
+    stop_after_unchanged_pages: int = Field(2, ge=1)
+    sources: List[str] = Field(["fincaraiz"], description="Portals to scrape concurrently")
+    fan_out: bool = False
+    shard_pages: Optional[int] = Field(None, ge=1)
+    enrich_details: bool = False
+
+
+class ScheduleUpdate(BaseModel):
+    interval_minutes: Optional[int] = Field(None, ge=1)
+    max_pages: Optional[int] = Field(None, ge=1, le=100)
+    priority: Optional[int] = Field(None, ge=-10, le=10)
+    enabled: Optional[bool] = None
+
+
+class ScheduleResponse(ScheduleBase):
+    id: int
+    options: Optional[Dict[str, Any]] = None
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    last_task_id: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -33,6 +33,7 @@ class TaskResponse(TaskBase):
     end_time: Optional[datetime] = None
     duration_seconds: Optional[int] = None
     cmetadata: Optional[Dict[str, Any]] = None
+    parent_id: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
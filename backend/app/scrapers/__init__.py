@@ -1,3 +1,17 @@
+from app.scrapers.base import BaseScraper
 from app.scrapers.fincaraiz import FincaRaizScraper
+from app.scrapers.registry import (
+    available_scrapers,
+    create_scraper,
+    get_scraper_class,
+    register_scraper,
+)
 
-__all__ = ["FincaRaizScraper"] 
\ No newline at end of file
+__all__ = [
+    "BaseScraper",
+    "FincaRaizScraper",
+    "available_scrapers",
+    "create_scraper",
+    "get_scraper_class",
+    "register_scraper",
+]
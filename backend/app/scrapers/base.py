@@ -0,0 +1,282 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import AsyncGenerator, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.metrics import FETCH_SECONDS, PAGES_TOTAL
+from app.schemas.property import PropertyCreate
+from app.scrapers.http_cache import ResponseCache, get_response_cache
+from app.scrapers.http_client import create_client_session, get_shared_session
+from app.scrapers.listing_fields import DetailFields
+from app.scrapers.rate_limiter import TokenBucket, get_host_limiter
+from app.scrapers.retry import (
+    RETRYABLE_STATUSES,
+    HostCircuitBreaker,
+    RetryPolicy,
+    get_host_breaker,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FetchedPage(NamedTuple):
+    # HTTP status, or 0 when no response was received
+    status: int
+    html: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class BaseScraper(ABC):
+    """
+    Base class of property portal scrapers.
+
+    Subclasses set NAME (the source name used in scrape requests) and BASE_URL, and
+    implement get_property_listings. Requests sent through `_fetch` are paced by the
+    rate limiter and circuit breaker of the portal's host, so every source keeps its
+    own pace when several run at the same time.
+    """
+
+    NAME: str = ""
+    BASE_URL: str = ""
+    # Whether get_property_details is implemented (used for detail-page enrichment)
+    SUPPORTS_DETAILS: bool = False
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        response_cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[HostCircuitBreaker] = None,
+    ):
+        """
+        Args:
+            concurrency: Maximum number of result pages fetched at the same time
+            rate_limiter: Token bucket to use instead of the shared per-host limiter
+            response_cache: Cache used for conditional requests instead of the shared one
+            retry_policy: Retry policy for failed page requests
+            circuit_breaker: Circuit breaker to use instead of the shared per-host one
+        """
+        self.session = None
+        self._owns_session = False
+        self.concurrency = max(1, concurrency or settings.SCRAPER_CONCURRENCY)
+        host = urlparse(self.BASE_URL).netloc
+        self.rate_limiter = rate_limiter or get_host_limiter(
+            host,
+            rate=settings.SCRAPER_REQUESTS_PER_SECOND,
+            capacity=settings.SCRAPER_BURST,
+        )
+        if circuit_breaker is None:
+            circuit_breaker = (
+                get_host_breaker(host, self.rate_limiter)
+                if rate_limiter is None
+                else HostCircuitBreaker.from_settings(self.rate_limiter)
+            )
+        self.circuit_breaker = circuit_breaker
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        self.response_cache = response_cache or get_response_cache()
+        # Results page whose listings were yielded last, used to checkpoint tasks
+        self.current_page: Optional[int] = None
+        # Request counters of this scraper, reported in the task metadata
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "errors": 0,
+            "failed_pages": 0,
+            "bytes_downloaded": 0,
+            "cards": 0,
+        }
+        # Seconds spent in each phase of the scrape, summed over concurrent requests:
+        # waiting for the rate limiter, circuit breaker or a retry ("sleep"), sending
+        # requests, extracting listings and validating them
+        self.timings: Dict[str, float] = {
+            "fetch": 0.0,
+            "sleep": 0.0,
+            "parse": 0.0,
+            "validate": 0.0,
+        }
+
+    async def __aenter__(self):
+        # Borrow the application-wide session so connections and DNS lookups are
+        # reused across tasks; only open a session of our own when there is none
+        self.session = get_shared_session()
+        self._owns_session = self.session is None
+        if self._owns_session:
+            self.session = create_client_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session and self._owns_session:
+            await self.session.close()
+        self.session = None
+
+    @abstractmethod
+    def get_property_listings(
+        self,
+        city: str,
+        region: str,
+        property_type: str,
+        max_pages: int = 5,
+        start_page: int = 1,
+    ) -> AsyncGenerator[List[PropertyCreate], None]:
+        """
+        Scrape the portal's result pages, yielding the listings of each page in order
+        and setting `current_page` to the page being yielded. An empty list stands
+        for a page not modified since the last scrape.
+
+        Args:
+            city: The city to search in
+            region: The region/area within the city
+            property_type: Property types to search for, joined with "-y-"
+                           (e.g. "fincas-y-casas-campestres")
+            max_pages: Maximum number of pages to scrape
+            start_page: First results page to scrape
+        """
+
+    async def get_property_details(self, url: str) -> Optional[DetailFields]:
+        """
+        Fetch and parse a property's detail page
+
+        Returns:
+            The page's description and extended attributes, with an "unavailable"
+            attribute when the listing was removed, or None when the page could not
+            be fetched
+        """
+        raise NotImplementedError(f"{self.NAME} does not support detail pages")
+
+    @contextmanager
+    def _timed(self, phase: str) -> Iterator[None]:
+        """Add the time spent in a block to a phase of `timings`"""
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.monotonic() - started_at
+
+    async def _request(
+        self, label: str, url: str, headers: Dict[str, str]
+    ) -> Tuple[FetchedPage, Optional[float]]:
+        """
+        Send a single request once the circuit breaker and host rate limiter allow it
+
+        Returns:
+            The fetched page and the delay requested by the server through Retry-After
+        """
+        with self._timed("sleep"):
+            await self.circuit_breaker.before_request()
+            await self.rate_limiter.acquire()
+        logger.info(f"Scraping {label}: {url}")
+
+        self.stats["requests"] += 1
+        started_at = time.monotonic()
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    fetched = FetchedPage(status=304)
+                elif response.status != 200:
+                    fetched = FetchedPage(status=response.status)
+                else:
+                    body = await response.read()
+                    # Content-Length is the size on the wire, before the body is
+                    # decompressed; chunked responses only have the decoded size
+                    content_length = response.headers.get("Content-Length")
+                    self.stats["bytes_downloaded"] += (
+                        int(content_length) if content_length else len(body)
+                    )
+                    fetched = FetchedPage(
+                        status=200,
+                        html=body.decode(response.get_encoding()),
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+                retry_after = RetryPolicy.parse_retry_after(
+                    response.headers.get("Retry-After")
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Request for {label} failed: {e!r}")
+            fetched = FetchedPage(status=0)
+            retry_after = None
+
+        latency = time.monotonic() - started_at
+        self.timings["fetch"] += latency
+        FETCH_SECONDS.observe(latency, source=self.NAME)
+        failed = fetched.status == 0 or fetched.status in RETRYABLE_STATUSES
+        self.circuit_breaker.record(success=not failed, latency=latency)
+        if failed:
+            self.stats["errors"] += 1
+        if fetched.status == 429:
+            self.stats["throttled"] += 1
+
+        return fetched, retry_after
+
+    async def _fetch(
+        self, label: str, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> FetchedPage:
+        """
+        Fetch a URL, retrying timeouts, connection errors and retryable statuses
+        with backoff
+
+        Returns:
+            The response status, with the page HTML and validators on a 200
+        """
+        headers = headers or {}
+        for retry in range(self.retry_policy.max_retries + 1):
+            fetched, retry_after = await self._request(label, url, headers)
+            if fetched.status != 0 and fetched.status not in RETRYABLE_STATUSES:
+                break
+
+            if retry == self.retry_policy.max_retries:
+                break
+
+            delay = self.retry_policy.backoff(retry, retry_after)
+            self.stats["retries"] += 1
+            logger.warning(
+                f"Retrying {label} in {delay:.2f} seconds "
+                f"(status {fetched.status or 'no response'}, retry {retry + 1}/{self.retry_policy.max_retries})"
+            )
+            with self._timed("sleep"):
+                await asyncio.sleep(delay)
+
+        if fetched.status not in (200, 304):
+            self.stats["failed_pages"] += 1
+            logger.error(f"Failed to fetch {label}: {fetched.status or 'no response'}")
+
+        return fetched
+
+    async def _fetch_page(self, page: int, page_url: str) -> FetchedPage:
+        """
+        Fetch a results page. When the page is cached, the request is conditional on
+        its validators.
+        """
+        headers = {}
+        if self.response_cache:
+            headers = await asyncio.to_thread(
+                self.response_cache.conditional_headers, page_url
+            )
+
+        fetched = await self._fetch(f"page {page}", page_url, headers)
+        PAGES_TOTAL.inc(source=self.NAME, status=str(fetched.status or "error"))
+        return fetched
+
+    async def _cache_page(self, page_url: str, fetched: FetchedPage) -> None:
+        """Store the validators of a processed page so it is requested conditionally next time"""
+        if not self.response_cache or not fetched.html:
+            return
+
+        try:
+            await asyncio.to_thread(
+                self.response_cache.put,
+                page_url,
+                fetched.etag,
+                fetched.last_modified,
+            )
+        except OSError as e:
+            logger.warning(f"Could not cache page {page_url}: {str(e)}")
@@ -1,37 +1,72 @@
-import re
 import logging
 import asyncio
-import random
-from typing import List, Optional, AsyncGenerator
-import aiohttp
-from bs4 import BeautifulSoup
+from typing import Any, Dict, List, Optional, AsyncGenerator, Tuple
+from app.core.config import settings
+from app.core.metrics import CARDS_TOTAL, PARSE_ERRORS_TOTAL, PARSE_SECONDS
 from app.schemas.property import PropertyCreate
+from app.scrapers.base import BaseScraper
+from app.scrapers.fincaraiz_parsers import (
+    PARSER_BACKENDS,
+    CardFields,
+    extract_detail_fields,
+)
+from app.scrapers.http_cache import ResponseCache
+from app.scrapers.listing_fields import DetailFields, parse_price, parse_typology
+from app.scrapers.parse_pool import run_parse_job
+from app.scrapers.rate_limiter import TokenBucket
+from app.scrapers.registry import register_scraper
+from app.scrapers.retry import HostCircuitBreaker, RetryPolicy
 
 
 logger = logging.getLogger(__name__)
 
-
-class FincaRaizScraper:
+@register_scraper
+class FincaRaizScraper(BaseScraper):
     """
     Scraper for FincaRaiz.com.co website
     """
 
+    NAME = "fincaraiz"
     BASE_URL = "https://www.fincaraiz.com.co"
+    SUPPORTS_DETAILS = True
 
-    def __init__(self):
-        self.session = None
-
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
-            }
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        parser: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[HostCircuitBreaker] = None,
+    ):
+        """
+        Args:
+            concurrency: Maximum number of result pages fetched at the same time
+            rate_limiter: Token bucket to use instead of the shared per-host limiter
+            parser: Parser backend used for result pages ("bs4" or "lxml")
+            response_cache: Cache used for conditional requests instead of the shared one
+            retry_policy: Retry policy for failed page requests
+            circuit_breaker: Circuit breaker to use instead of the shared per-host one
+        """
+        super().__init__(
+            concurrency=concurrency,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
         )
-        return self
+        self.parser = parser or settings.SCRAPER_PARSER
+        if self.parser not in PARSER_BACKENDS:
+            raise ValueError(
+                f"Unknown parser backend '{self.parser}'. Available: {', '.join(PARSER_BACKENDS)}"
+            )
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+    @staticmethod
+    def _build_page_url(url_template: str, page: int) -> str:
+        """Build the URL of a results page"""
+        if page > 1:
+            return f"{url_template}/pagina-{page}"
+        return url_template
 
     async def get_property_listings(
         self,
@@ -39,65 +74,106 @@ class FincaRaizScraper:
         region: str,
         property_type: str = "casas-y-apartamentos",
         max_pages: int = 5,
+        start_page: int = 1,
     ) -> AsyncGenerator[List[PropertyCreate], None]:
         """
         Scrape properties from FincaRaiz based on city, region and property type.
         Yields each page's results for partial processing.
 
+        Up to `concurrency` pages are requested ahead of the one being processed,
+        all of them paced by the host rate limiter. Pages are always yielded in order.
+        Pages the server reports as not modified since the last scrape are not parsed;
+        an empty list is yielded for them, so callers count them as unchanged pages.
+
         Args:
             city: The city to search in
             region: The region/area within the city
             property_type: Type of properties to search for (e.g., "casas-y-apartamentos", "fincas", "casas-campestres", "cabanas")
                            Multiple types can be combined with "-y-" (e.g., "fincas-y-casas-campestres")
             max_pages: Maximum number of pages to scrape
+            start_page: First results page to scrape
         """
         url_template = (
             f"{self.BASE_URL}/venta/{property_type}/{city.lower()}/{region.lower()}"
         )
 
-        for page in range(1, max_pages + 1):
-            page_url = url_template
-            if page > 1:
-                page_url = f"{url_template}/pagina-{page}"
-
-            logger.info(f"Scraping page {page}: {page_url}")
+        in_flight: Dict[int, asyncio.Task] = {}
+        last_page = start_page + max_pages - 1
+        next_page = start_page
 
-            try:
-                async with self.session.get(page_url) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch page {page}: {response.status}")
+        def schedule_fetches() -> None:
+            nonlocal next_page
+            while next_page <= last_page and len(in_flight) < self.concurrency:
+                page_url = self._build_page_url(url_template, next_page)
+                in_flight[next_page] = asyncio.ensure_future(
+                    self._fetch_page(next_page, page_url)
+                )
+                next_page += 1
+
+        try:
+            for page in range(start_page, last_page + 1):
+                schedule_fetches()
+
+                try:
+                    fetched = await in_flight.pop(page)
+                    if fetched.status == 304:
+                        logger.info(f"Page {page} not modified since last scrape")
+                        listings = []
+                    elif fetched.html is None:
                         continue
+                    else:
+                        # Find all property listings on the page
+                        listings = await self._parse_page(fetched.html, city, region)
+                        if not listings:
+                            logger.info(f"No more listings found on page {page}")
+                            break
+
+                except Exception as e:
+                    logger.error(f"Error scraping page {page}: {str(e)}")
+                    break
+
+                self.current_page = page
+                yield listings
+
+                # Only cache the page once its listings have been processed, so a
+                # failed run does not make the next one skip unsaved listings
+                await self._cache_page(
+                    self._build_page_url(url_template, page), fetched
+                )
 
-                    html = await response.text()
-                    soup = BeautifulSoup(html, "lxml")
-
-                    # Find all property listings on the page
-                    listings = self._extract_listings(soup, city, region)
-                    if not listings:
-                        logger.info(f"No more listings found on page {page}")
-                        break
+        finally:
+            # Pages requested ahead of a stop condition are not needed anymore
+            for task in in_flight.values():
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
 
-                    yield listings
+    async def get_property_details(self, url: str) -> Optional[DetailFields]:
+        """
+        Fetch and parse a property's detail page, paced by the same host rate limiter
+        and circuit breaker as result pages
 
-                    # Add a random delay between 2-5 seconds between requests
-                    delay = random.uniform(2, 5)
-                    logger.debug(f"Waiting {delay:.2f} seconds before next request")
-                    await asyncio.sleep(delay)
+        Returns:
+            The page's description and extended attributes, with an "unavailable"
+            attribute when the listing was removed, or None when the page could not
+            be fetched
+        """
+        fetched = await self._fetch("detail page", url)
+        if fetched.status in (404, 410):
+            return DetailFields(None, {"unavailable": True})
+        if fetched.html is None:
+            return None
 
-            except Exception as e:
-                logger.error(f"Error scraping page {page}: {str(e)}")
-                break
+        return await run_parse_job(extract_detail_fields, fetched.html)
 
     @staticmethod
-    def _extract_property_type(card: BeautifulSoup) -> Optional[str]:
-        """Extract property type from card"""
-        title_element = card.find("span", class_="lc-title")
-        if not title_element:
+    def _extract_property_type(title_text: Optional[str]) -> Optional[str]:
+        """Extract property type from the card title"""
+        if not title_text:
             return None
 
-        text = title_element.get_text(strip=True)
-        if " en " in text:
-            return text.split(" en ")[0]
+        if " en " in title_text:
+            return title_text.split(" en ")[0]
         return None
 
     @staticmethod
@@ -115,186 +191,173 @@ class FincaRaizScraper:
         
         return " - ".join(parts) if parts else ""
 
-    def _extract_listings(
-        self, soup: BeautifulSoup, city: str, region: str
+    async def _parse_page(
+        self, html: str, city: str, region: str
     ) -> List[PropertyCreate]:
         """
-        Extract property listings from a page
+        Extract property listings from a page's HTML in the parse executor, so the
+        event loop keeps serving other fetches and tasks while the page is parsed
+        """
+        with PARSE_SECONDS.time(source=self.NAME):
+            with self._timed("parse"):
+                listing_dicts, cards = await run_parse_job(
+                    parse_listing_page, html, city, region, self.parser
+                )
+            with self._timed("validate"):
+                listings = self._validate_listings(listing_dicts)
+
+        self.stats["cards"] += cards
+        CARDS_TOTAL.inc(cards, source=self.NAME)
+        PARSE_ERRORS_TOTAL.inc(cards - len(listings), source=self.NAME)
+        return listings
+
+    def _parse_page_sync(
+        self, html: str, city: str, region: str
+    ) -> List[PropertyCreate]:
+        """
+        Extract property listings from a page's HTML in the calling thread
+        """
+        return self._validate_listings(
+            parse_listing_dicts(html, city, region, self.parser)
+        )
+
+    @staticmethod
+    def _validate_listings(listing_dicts: List[Dict[str, Any]]) -> List[PropertyCreate]:
+        """
+        Validate plain listing dicts into PropertyCreate objects, skipping invalid ones
         """
         listings = []
+        for listing_data in listing_dicts:
+            try:
+                listings.append(PropertyCreate(**listing_data))
+            except Exception as e:
+                logger.error(f"Error extracting listing data: {str(e)}")
+                continue
+
+        return listings
+
+    @classmethod
+    def _build_listing_dicts(
+        cls, cards: List[CardFields], city: str, region: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Build plain listing dicts from the raw fields of a page's cards
+        """
+        listing_dicts = []
         city = city[0].upper() + city[1:]
         region = region[0].upper() + region[1:]
 
-        # Find all property cards with the listingCard class
-        property_cards = soup.find_all("div", class_="listingCard")
-
-        if not property_cards:
+        if not cards:
             logger.warning(
                 "No property cards found. The website structure might have changed."
             )
             return []
 
-        for card in property_cards:
+        for card in cards:
             try:
-                # Extract property URL
-                url_tag = card.find("a", class_="lc-data")
-                url = url_tag.get("href") if url_tag else None
-                if url and not url.startswith("http"):
-                    url = f"{self.BASE_URL}{url}"
-
-                # Skip the base URL or empty URLs
-                if not url or url == self.BASE_URL or url == f"{self.BASE_URL}/":
-                    logger.warning(f"Skipping invalid URL: {url}")
-                    continue
-
-                # Extract image URLs using the new method
-                image_urls = self._extract_image_urls(card)
-
-                # Extract price
-                price_text = card.find(text=re.compile(r"\$\s*[\d.,]+"))
-                price = self._extract_price(price_text if price_text else "")
-
-                # Extract rooms, bathrooms and surface from typology tag
-                typology_tag = card.find("div", class_="lc-typologyTag")
-                rooms = None
-                bathrooms = None
-                surface = None
-                surface_unit = None
-
-                if typology_tag:
-                    typology_text = typology_tag.get_text(strip=True)
-                    rooms = self._extract_rooms(typology_text)
-                    bathrooms = self._extract_bathrooms(typology_text)
-                    surface, surface_unit = self._extract_surface(typology_text)
-
-                # Extract property type
-                property_type = self._extract_property_type(card)
-
-                # Generate title
-                title = self._generate_title(property_type, city, surface, surface_unit)
-
-                # Truncate title to fit the database column (max 256 chars)
-                if title and len(title) > 256:
-                    title = title[:252] + "..."
-
-                listings.append(
-                    PropertyCreate(
-                        url=url,
-                        price=price,
-                        rooms=rooms,
-                        bathrooms=bathrooms,
-                        surface=surface,
-                        surface_unit=surface_unit,
-                        property_type=property_type,
-                        title=title,
-                        city=city,
-                        region=region,
-                        image_urls=image_urls,
-                    )
-                )
+                listing_data = cls._build_listing(card, city, region)
+                if listing_data:
+                    listing_dicts.append(listing_data)
 
             except Exception as e:
                 logger.error(f"Error extracting listing data: {str(e)}")
                 continue
 
-        return listings
-
-    @staticmethod
-    def _extract_price(price_text: str) -> Optional[float]:
-        """Extract price value from text"""
-        if not price_text:
-            return None
+        return listing_dicts
 
-        # Extract price values (handle formats like "$ 350.000.000")
-        match = re.search(r"\$\s*([\d.,]+)", price_text)
-        if match:
-            # Remove dots (thousand separators in Spanish) but keep decimal points
-            price_str = match.group(1).replace(".", "")
-            try:
-                return float(price_str)
-            except (ValueError, TypeError):
-                return None
-        return None
+    @classmethod
+    def _build_listing(
+        cls, card: CardFields, city: str, region: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build the data of a property listing from the raw fields of a card
 
-    @staticmethod
-    def _extract_number(text: str) -> Optional[int]:
-        """Extract numeric value from text"""
-        if not text:
+        Returns:
+            The PropertyCreate fields, or None when the card has no usable URL
+        """
+        # Extract property URL
+        url = card.href
+        if url and not url.startswith("http"):
+            url = f"{cls.BASE_URL}{url}"
+
+        # Skip the base URL or empty URLs
+        if not url or url == cls.BASE_URL or url == f"{cls.BASE_URL}/":
+            logger.warning(f"Skipping invalid URL: {url}")
             return None
 
-        # Find all numbers in the text
-        match = re.search(r"(\d+)", text)
-        if match:
-            try:
-                return int(match.group(1))
-            except (ValueError, TypeError):
-                return None
-        return None
+        image_urls = cls._extract_image_urls(card.image_srcs)
 
-    @staticmethod
-    def _extract_surface(text: str) -> tuple[Optional[float], Optional[str]]:
-        """Extract surface area and unit from text"""
-        if not text:
-            return None, None
-
-        # Find the numeric part and the unit
-        match = re.search(r"(\d+)\s*m²", text)
-        if match:
-            try:
-                value = float(match.group(1))
-                return value, "m²"
-            except (ValueError, TypeError):
-                pass
-        return None, None
+        # Extract price
+        price = parse_price(card.price_text)
 
-    @staticmethod
-    def _extract_rooms(text: str) -> Optional[int]:
-        """Extract number of rooms from text"""
-        if not text:
-            return None
+        # Extract rooms, bathrooms and surface from typology tag in a single pass
+        rooms, bathrooms, surface, surface_unit = parse_typology(card.typology_text)
 
-        match = re.search(r"(\d+)\s*Habs?", text)
-        if match:
-            try:
-                return int(match.group(1))
-            except (ValueError, TypeError):
-                pass
-        return None
+        # Extract property type
+        property_type = cls._extract_property_type(card.title_text)
 
-    @staticmethod
-    def _extract_bathrooms(text: str) -> Optional[int]:
-        """Extract number of bathrooms from text"""
-        if not text:
-            return None
+        # Generate title
+        title = cls._generate_title(property_type, city, surface, surface_unit)
 
-        match = re.search(r"(\d+)\s*Baños", text)
-        if match:
-            try:
-                return int(match.group(1))
-            except (ValueError, TypeError):
-                pass
-        return None
+        # Truncate title to fit the database column (max 256 chars)
+        if title and len(title) > 256:
+            title = title[:252] + "..."
+
+        return {
+            "url": url,
+            "price": price,
+            "rooms": rooms,
+            "bathrooms": bathrooms,
+            "surface": surface,
+            "surface_unit": surface_unit,
+            "property_type": property_type,
+            "title": title,
+            "city": city,
+            "region": region,
+            "image_urls": image_urls,
+        }
 
-    def _extract_image_urls(self, card: BeautifulSoup) -> List[str]:
+    @classmethod
+    def _extract_image_urls(cls, image_srcs: List[str]) -> List[str]:
         """
-        Extract image URLs from a property card by finding images with card-image-gallery--img class
+        Build absolute image URLs from the sources of a card's gallery images
 
         Args:
-            card: BeautifulSoup object representing a property card
+            image_srcs: src attributes of the card's card-image-gallery--img images
 
         Returns:
             List of image URLs
         """
         image_urls = []
-        
-        # Find all images with the specific class
-        img_tags = card.find_all("img", class_="card-image-gallery--img")
-        
-        for img in img_tags:
-            img_url = img.get("src")
+
+        for img_url in image_srcs:
             if img_url and not img_url.startswith("data:"):  # Skip data URLs
                 if not img_url.startswith("http"):
-                    img_url = f"{self.BASE_URL}{img_url}"
+                    img_url = f"{cls.BASE_URL}{img_url}"
                 image_urls.append(img_url)
 
         return image_urls
+
+
+def parse_listing_dicts(
+    html: str, city: str, region: str, parser: str = "bs4"
+) -> List[Dict[str, Any]]:
+    """
+    Parse a FincaRaiz results page into plain listing dicts, without the card count
+    of parse_listing_page
+    """
+    return parse_listing_page(html, city, region, parser)[0]
+
+
+def parse_listing_page(
+    html: str, city: str, region: str, parser: str = "bs4"
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Parse a FincaRaiz results page into plain listing dicts, along with the number
+    of cards found on the page (cards that could not be parsed have no dict)
+
+    Runs in the parse executor, which may be a separate process: it only takes and
+    returns picklable values.
+    """
+    cards = PARSER_BACKENDS[parser](html)
+    return FincaRaizScraper._build_listing_dicts(cards, city, region), len(cards)
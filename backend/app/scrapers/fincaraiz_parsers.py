@@ -0,0 +1,259 @@
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from app.scrapers.listing_fields import DetailFields
+
+
+# Text containing a price (e.g. "$ 350.000.000")
+PRICE_TEXT_PATTERN = re.compile(r"\$\s*[\d.,]+")
+
+
+class CardFields(NamedTuple):
+    """
+    Raw values extracted from a property card.
+
+    Parser backends only locate these strings; turning them into listings is shared
+    (see FincaRaizScraper._build_listing) so every backend yields the same data.
+    """
+
+    href: Optional[str]
+    image_srcs: List[str]
+    price_text: Optional[str]
+    typology_text: Optional[str]
+    title_text: Optional[str]
+
+
+def extract_cards_from_soup(soup: BeautifulSoup) -> List[CardFields]:
+    """Extract the raw fields of every property card in a BeautifulSoup tree"""
+    cards = []
+
+    for card in soup.find_all("div", class_="listingCard"):
+        url_tag = card.find("a", class_="lc-data")
+        price_text = card.find(string=PRICE_TEXT_PATTERN)
+        typology_tag = card.find("div", class_="lc-typologyTag")
+        title_tag = card.find("span", class_="lc-title")
+
+        cards.append(
+            CardFields(
+                href=url_tag.get("href") if url_tag else None,
+                image_srcs=[
+                    img.get("src")
+                    for img in card.find_all("img", class_="card-image-gallery--img")
+                    if img.get("src")
+                ],
+                price_text=str(price_text) if price_text else None,
+                typology_text=(
+                    typology_tag.get_text(strip=True) if typology_tag else None
+                ),
+                title_text=title_tag.get_text(strip=True) if title_tag else None,
+            )
+        )
+
+    return cards
+
+
+def extract_cards_bs4(html: str) -> List[CardFields]:
+    """Parse a results page with BeautifulSoup and extract its property cards"""
+    return extract_cards_from_soup(BeautifulSoup(html, "lxml"))
+
+
+def _has_class(class_name: str) -> str:
+    """XPath predicate matching elements that have the given CSS class"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# Selectors are compiled once; everything but the card lookup runs on a card subtree
+_CARDS_XPATH = etree.XPath(f"//div[{_has_class('listingCard')}]")
+_URL_XPATH = etree.XPath(
+    f"(.//a[{_has_class('lc-data')}])[1]/@href", smart_strings=False
+)
+_IMAGE_SRCS_XPATH = etree.XPath(
+    f".//img[{_has_class('card-image-gallery--img')}]/@src", smart_strings=False
+)
+_TYPOLOGY_XPATH = etree.XPath(f"(.//div[{_has_class('lc-typologyTag')}])[1]")
+_TITLE_XPATH = etree.XPath(f"(.//span[{_has_class('lc-title')}])[1]")
+# BeautifulSoup's find(string=...) also looks at comments and script contents
+_ALL_STRINGS_XPATH = etree.XPath(
+    "descendant::text() | descendant::comment()", smart_strings=False
+)
+# ...while get_text() skips the strings BeautifulSoup keeps in special containers
+_VISIBLE_TEXT_XPATH = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template"
+    " or ancestor::rt or ancestor::rp)]",
+    smart_strings=False,
+)
+
+
+def _get_text(element: Optional[etree._Element]) -> Optional[str]:
+    """Equivalent of BeautifulSoup's get_text(strip=True)"""
+    if element is None:
+        return None
+
+    return "".join(
+        stripped
+        for text in _VISIBLE_TEXT_XPATH(element)
+        if (stripped := text.strip())
+    )
+
+
+def _find_price_text(card: etree._Element) -> Optional[str]:
+    """Return the first string in the card that contains a price"""
+    for node in _ALL_STRINGS_XPATH(card):
+        text = node.text if isinstance(node, etree._Comment) else node
+        if text and PRICE_TEXT_PATTERN.search(text):
+            return text
+    return None
+
+
+def extract_cards_lxml(html: str) -> List[CardFields]:
+    """Parse a results page with lxml and extract its property cards"""
+    try:
+        root = etree.HTML(html)
+    except ValueError:
+        # lxml refuses str input carrying an XML encoding declaration
+        root = etree.HTML(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+
+    if root is None:
+        return []
+
+    cards = []
+    for card in _CARDS_XPATH(root):
+        hrefs = _URL_XPATH(card)
+        typology_tags = _TYPOLOGY_XPATH(card)
+        title_tags = _TITLE_XPATH(card)
+
+        cards.append(
+            CardFields(
+                href=hrefs[0] if hrefs else None,
+                image_srcs=[src for src in _IMAGE_SRCS_XPATH(card) if src],
+                price_text=_find_price_text(card),
+                typology_text=_get_text(typology_tags[0] if typology_tags else None),
+                title_text=_get_text(title_tags[0] if title_tags else None),
+            )
+        )
+
+    return cards
+
+
+PARSER_BACKENDS: Dict[str, Callable[[str], List[CardFields]]] = {
+    "bs4": extract_cards_bs4,
+    "lxml": extract_cards_lxml,
+}
+
+
+_JSON_LD_XPATH = etree.XPath(
+    "//script[@type='application/ld+json']/text()", smart_strings=False
+)
+_META_DESCRIPTION_XPATH = etree.XPath(
+    "//meta[@property='og:description' or @name='description']/@content",
+    smart_strings=False,
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _iter_json_ld_objects(data: Any) -> Iterator[Dict[str, Any]]:
+    """Walk JSON-LD data, yielding every object (including those in @graph lists)"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _iter_json_ld_objects(data.get("@graph"))
+
+
+def _clean_text(text: Any) -> Optional[str]:
+    if not isinstance(text, str):
+        return None
+    text = _WHITESPACE_PATTERN.sub(" ", text).strip()
+    return text or None
+
+
+def _extract_json_ld_attributes(listing: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the extended attributes of a JSON-LD listing object"""
+    attributes: Dict[str, Any] = {}
+
+    address = listing.get("address")
+    if isinstance(address, dict):
+        parts = [
+            _clean_text(address.get(key))
+            for key in ("streetAddress", "addressLocality", "addressRegion")
+        ]
+        if any(parts):
+            attributes["address"] = ", ".join(part for part in parts if part)
+    elif _clean_text(address):
+        attributes["address"] = _clean_text(address)
+
+    geo = listing.get("geo")
+    if isinstance(geo, dict):
+        for key in ("latitude", "longitude"):
+            try:
+                attributes[key] = float(geo[key])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    if listing.get("yearBuilt"):
+        attributes["year_built"] = listing["yearBuilt"]
+
+    features = {}
+    for feature in listing.get("additionalProperty") or []:
+        if isinstance(feature, dict) and _clean_text(feature.get("name")):
+            features[_clean_text(feature["name"])] = feature.get("value")
+    if features:
+        attributes["features"] = features
+
+    amenities = [
+        _clean_text(amenity.get("name"))
+        for amenity in listing.get("amenityFeature") or []
+        if isinstance(amenity, dict)
+        and _clean_text(amenity.get("name"))
+        and amenity.get("value", True) is not False
+    ]
+    if amenities:
+        attributes["amenities"] = amenities
+
+    return attributes
+
+
+def extract_detail_fields(html: str) -> DetailFields:
+    """
+    Parse a property detail page.
+
+    The description and extended attributes come from the page's JSON-LD listing
+    data; when there is none, the description falls back to the page's meta
+    description.
+    """
+    try:
+        root = etree.HTML(html)
+    except ValueError:
+        root = etree.HTML(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+
+    if root is None:
+        return DetailFields(None, {})
+
+    description = None
+    attributes: Dict[str, Any] = {}
+    for script in _JSON_LD_XPATH(root):
+        try:
+            data = json.loads(script)
+        except ValueError:
+            continue
+
+        for listing in _iter_json_ld_objects(data):
+            listing_description = _clean_text(listing.get("description"))
+            listing_attributes = _extract_json_ld_attributes(listing)
+            if description is None and listing_description:
+                description = listing_description
+            for key, value in listing_attributes.items():
+                attributes.setdefault(key, value)
+
+    if description is None:
+        for content in _META_DESCRIPTION_XPATH(root):
+            description = _clean_text(content)
+            if description:
+                break
+
+    return DetailFields(description, attributes)
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class ResponseCache:
+    """
+    On-disk cache of result page validators keyed by URL, used for conditional
+    requests.
+
+    Each entry is a single file with a JSON line holding the ETag and Last-Modified
+    of a page. Bodies are not kept: a page answered with 304 Not Modified was
+    already processed, so it is neither parsed nor saved again. When the cache
+    grows over `max_bytes`, the least recently used entries are removed.
+    """
+
+    SUFFIX = ".page"
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = sum(
+            path.stat().st_size for path in self.directory.glob(f"*{self.SUFFIX}")
+        )
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}{self.SUFFIX}"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Get the validators stored for a URL"""
+        path = self._path(url)
+        try:
+            with path.open("rb") as cache_file:
+                metadata = json.loads(cache_file.readline())
+            # Reading an entry marks it as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return CacheEntry(
+            url=metadata["url"],
+            etag=metadata.get("etag"),
+            last_modified=metadata.get("last_modified"),
+            stored_at=metadata["stored_at"],
+        )
+
+    def put(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store the validators of a page; pages without validators are not cached"""
+        if not etag and not last_modified:
+            return
+
+        metadata = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        data = json.dumps(metadata).encode("utf-8") + b"\n"
+
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+
+        with self._lock:
+            previous_size = path.stat().st_size if path.exists() else 0
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+            self._total_bytes += len(data) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size limit"""
+        entries = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        self._total_bytes = sum(size for _, size, _ in entries)
+        # Keep some headroom so every new entry does not trigger an eviction
+        target = self.max_bytes * 0.9
+
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if self._total_bytes <= target:
+                break
+            try:
+                path.unlink()
+                self._total_bytes -= size
+            except OSError:
+                continue
+
+        logger.info(f"Evicted cached pages, cache size is now {self._total_bytes} bytes")
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build the If-None-Match / If-Modified-Since headers for a URL"""
+        entry = self.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get the process-wide response cache
+
+    Returns:
+        The cache, or None when SCRAPER_HTTP_CACHE_DIR is not configured
+    """
+    global _response_cache
+
+    if not settings.SCRAPER_HTTP_CACHE_DIR:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                settings.SCRAPER_HTTP_CACHE_DIR, settings.SCRAPER_HTTP_CACHE_MAX_BYTES
+            )
+        return _response_cache
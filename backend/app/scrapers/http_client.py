@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def create_client_session() -> aiohttp.ClientSession:
+    """
+    Create a client session with the configured connector and timeouts.
+    Must be called from the event loop that will use the session.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.SCRAPER_HTTP_MAX_CONNECTIONS,
+        limit_per_host=settings.SCRAPER_HTTP_MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=settings.SCRAPER_HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=settings.SCRAPER_HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.SCRAPER_HTTP_TIMEOUT,
+        connect=settings.SCRAPER_HTTP_CONNECT_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": settings.SCRAPER_USER_AGENT},
+    )
+
+
+async def start_http_client() -> None:
+    """Create the application-wide client session (called on app startup)"""
+    global _shared_session, _shared_session_loop
+
+    if _shared_session is not None and not _shared_session.closed:
+        return
+
+    _shared_session = create_client_session()
+    _shared_session_loop = asyncio.get_running_loop()
+    logger.info("Started shared HTTP client session")
+
+
+async def close_http_client() -> None:
+    """Close the application-wide client session (called on app shutdown)"""
+    global _shared_session, _shared_session_loop
+
+    if _shared_session is not None:
+        await _shared_session.close()
+        logger.info("Closed shared HTTP client session")
+
+    _shared_session = None
+    _shared_session_loop = None
+
+
+def get_shared_session() -> Optional[aiohttp.ClientSession]:
+    """
+    Get the application-wide client session
+
+    Returns:
+        The shared session, or None when it was not started or belongs to another
+        event loop (aiohttp sessions cannot be used across loops)
+    """
+    if _shared_session is None or _shared_session.closed:
+        return None
+
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+    if running_loop is not _shared_session_loop:
+        return None
+
+    return _shared_session
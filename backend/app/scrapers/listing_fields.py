@@ -0,0 +1,145 @@
+import re
+from typing import Any, Dict, NamedTuple, Optional
+
+
+# A number as written on listing cards: "3", "1.200", "85,5", "1.250.000,50", "350,000,000"
+_NUMBER = r"\d+(?:[.,]\d+)*"
+_ROOMS_UNIT = r"[Hh]ab[a-z]*\.?"
+_BATHROOMS_UNIT = r"[Bb]años?"
+_SQUARE_METERS_UNIT = r"m(?:ts?)?[²2]"
+_HECTARES_UNIT = r"[Hh]ect[áa]reas?|[Hh]a(?![a-z])"
+
+# Typology tags list their fields in a fixed order ("3 Habs.2 Baños120 m²"), so a
+# single anchored match extracts all of them at once
+TYPOLOGY_PATTERN = re.compile(
+    rf"\s*(?:(\d+)\s*{_ROOMS_UNIT})?"
+    rf"\s*(?:(\d+)\s*{_BATHROOMS_UNIT})?"
+    rf"\s*(?:({_NUMBER})\s*(?:({_SQUARE_METERS_UNIT})|{_HECTARES_UNIT}))?"
+    r"\s*$"
+)
+
+# Fallback for tags in any other order: one scan finding every "<number> <unit>"
+TYPOLOGY_FIELD_PATTERN = re.compile(
+    rf"({_NUMBER})\s*(?:"
+    rf"(?P<rooms>{_ROOMS_UNIT})"
+    rf"|(?P<bathrooms>{_BATHROOMS_UNIT})"
+    rf"|(?P<square_meters>{_SQUARE_METERS_UNIT})"
+    rf"|(?P<hectares>{_HECTARES_UNIT})"
+    r")"
+)
+
+# A price or the lower bound of a price range ("$ 210.000.000 - $ 250.000.000").
+# The usual "$ 350.000.000" format gets its own group so it skips parse_number
+PRICE_PATTERN = re.compile(
+    rf"\$\s*(?:(\d{{1,3}}(?:\.\d{{3}})+)(?![.,]?\d)|({_NUMBER}))"
+)
+
+
+class TypologyValues(NamedTuple):
+    rooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    surface: Optional[float] = None
+    surface_unit: Optional[str] = None
+
+
+class DetailFields(NamedTuple):
+    """Values extracted from a property's detail page"""
+
+    description: Optional[str]
+    # Extended attributes not shown on result cards (address, coordinates, features...)
+    attributes: Dict[str, Any]
+
+
+def parse_number(text: str) -> Optional[float]:
+    """
+    Parse a number using either "." or "," as thousands separator.
+
+    A separator followed by exactly three digits groups thousands; the last separator
+    followed by one or two digits is the decimal mark ("85,5", "85.5", "1.200,75").
+    """
+    if text.isdigit():
+        return float(text)
+
+    groups = text.replace(",", ".").split(".")
+    decimals = groups.pop() if len(groups) > 1 and len(groups[-1]) != 3 else ""
+
+    for group in groups[1:]:
+        if len(group) != 3:
+            return None
+
+    try:
+        integer = "".join(groups)
+        return float(f"{integer}.{decimals}") if decimals else float(integer)
+    except ValueError:
+        return None
+
+
+def _parse_typology_fields(text: str) -> TypologyValues:
+    """Scan typology text whose fields are not in the usual order"""
+    rooms = None
+    bathrooms = None
+    surface = None
+    surface_unit = None
+
+    for match in TYPOLOGY_FIELD_PATTERN.finditer(text):
+        # The unit group closes after the number, so it is the last matched group
+        field = match.lastgroup
+        number = match.group(1)
+
+        if field == "rooms":
+            if rooms is None and number.isdigit():
+                rooms = int(number)
+        elif field == "bathrooms":
+            if bathrooms is None and number.isdigit():
+                bathrooms = int(number)
+        elif surface is None:
+            surface = parse_number(number)
+            if surface is not None:
+                surface_unit = "m²" if field == "square_meters" else "ha"
+
+    return TypologyValues(rooms, bathrooms, surface, surface_unit)
+
+
+def parse_typology(text: Optional[str]) -> TypologyValues:
+    """
+    Extract rooms, bathrooms and surface from a card's typology text in one pass.
+
+    Surfaces keep their unit: "m²" or "ha". When a field appears more than once, the
+    first value wins.
+    """
+    if not text:
+        return TypologyValues()
+
+    match = TYPOLOGY_PATTERN.match(text)
+    if not match:
+        return _parse_typology_fields(text)
+
+    rooms, bathrooms, surface, square_meters = match.groups()
+    surface_value = parse_number(surface) if surface else None
+
+    return TypologyValues(
+        int(rooms) if rooms else None,
+        int(bathrooms) if bathrooms else None,
+        surface_value,
+        ("m²" if square_meters else "ha") if surface_value is not None else None,
+    )
+
+
+def parse_price(text: Optional[str]) -> Optional[float]:
+    """
+    Extract a price from text such as "$ 350.000.000".
+
+    For ranges ("$ 210.000.000 - $ 250.000.000", "Desde $ 210.000.000") the lower
+    bound is returned.
+    """
+    if not text:
+        return None
+
+    match = PRICE_PATTERN.search(text)
+    if not match:
+        return None
+
+    thousands, number = match.groups()
+    if thousands:
+        return float(thousands.replace(".", ""))
+    return parse_number(number)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PARSE_EXECUTOR_KINDS = ("process", "thread", "inline")
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _create_executor(kind: str, workers: int) -> Optional[Executor]:
+    if kind == "process":
+        # Spawned workers do not inherit the API's threads, sockets or DB connections
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parser")
+    if kind == "inline":
+        return None
+
+    raise ValueError(
+        f"Unknown parse executor '{kind}'. Available: {', '.join(PARSE_EXECUTOR_KINDS)}"
+    )
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """
+    Get the process-wide executor used to parse pages, creating it on first use
+
+    Returns:
+        The configured executor, or None when pages are parsed inline
+    """
+    global _executor
+
+    if settings.SCRAPER_PARSE_EXECUTOR == "inline":
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = _create_executor(
+                settings.SCRAPER_PARSE_EXECUTOR, settings.SCRAPER_PARSE_WORKERS
+            )
+            logger.info(
+                f"Started {settings.SCRAPER_PARSE_EXECUTOR} parse executor with "
+                f"{settings.SCRAPER_PARSE_WORKERS} workers"
+            )
+        return _executor
+
+
+def shutdown_parse_executor() -> None:
+    """Shut down the parse executor, if it was started"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+async def run_parse_job(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a parse function without blocking the event loop
+
+    With a process executor, the function and its arguments must be picklable
+    (module-level function, plain values).
+    """
+    executor = get_parse_executor()
+    if executor is None:
+        return func(*args)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
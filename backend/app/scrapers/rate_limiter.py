@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by every request sent to a host.
+
+    Tokens are reserved under a thread lock and callers sleep for the time their
+    reservation needs to become available, so a bucket can be used from several
+    event loops (e.g. background tasks running their own loop) at the same time.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+        if capacity < 1:
+            raise ValueError("capacity must be at least one token")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Reserve tokens and return how many seconds the caller has to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until the requested number of tokens is available"""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limited, waiting {delay:.2f} seconds")
+            await asyncio.sleep(delay)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate, keeping the tokens accumulated so far"""
+        if rate <= 0:
+            raise ValueError("rate must be greater than zero")
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self.rate = rate
+
+
+_HOST_LIMITERS: Dict[str, TokenBucket] = {}
+_HOST_LIMITERS_LOCK = threading.Lock()
+
+
+def get_host_limiter(host: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """
+    Get the process-wide rate limiter for a host, creating it on first use
+
+    Args:
+        host: Host name the requests are sent to
+        rate: Average number of requests per second for a new limiter
+        capacity: Burst size for a new limiter
+
+    Returns:
+        The token bucket shared by every scraper talking to the host
+    """
+    with _HOST_LIMITERS_LOCK:
+        limiter = _HOST_LIMITERS.get(host)
+        if limiter is None:
+            limiter = TokenBucket(rate=rate, capacity=capacity)
+            _HOST_LIMITERS[host] = limiter
+        return limiter
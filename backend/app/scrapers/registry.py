@@ -0,0 +1,84 @@
+import logging
+import threading
+from importlib.metadata import entry_points
+from typing import TYPE_CHECKING, Dict, List, Type
+
+if TYPE_CHECKING:
+    from app.scrapers.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+# Entry point group through which installed packages provide scraper plugins, e.g.
+# [project.entry-points."scooby_in_the_house.scrapers"]
+# metrocuadrado = "scooby_metrocuadrado:MetroCuadradoScraper"
+PLUGIN_ENTRY_POINT_GROUP = "scooby_in_the_house.scrapers"
+
+_SCRAPERS: Dict[str, Type["BaseScraper"]] = {}
+_SCRAPERS_LOCK = threading.Lock()
+_plugins_loaded = False
+
+
+def register_scraper(scraper_class: Type["BaseScraper"]) -> Type["BaseScraper"]:
+    """
+    Register a scraper under its NAME (usable as a class decorator)
+
+    Raises:
+        ValueError: If the scraper has no NAME or another scraper uses the same one
+    """
+    name = scraper_class.NAME
+    if not name:
+        raise ValueError(f"{scraper_class.__name__} must define a NAME")
+
+    with _SCRAPERS_LOCK:
+        registered = _SCRAPERS.get(name)
+        if registered is not None and registered is not scraper_class:
+            raise ValueError(
+                f"Scraper '{name}' is already registered by {registered.__name__}"
+            )
+        _SCRAPERS[name] = scraper_class
+
+    return scraper_class
+
+
+def load_scraper_plugins() -> None:
+    """Import the scrapers installed as plugins through package entry points"""
+    global _plugins_loaded
+
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+
+    for entry_point in entry_points(group=PLUGIN_ENTRY_POINT_GROUP):
+        try:
+            register_scraper(entry_point.load())
+            logger.info(f"Loaded scraper plugin '{entry_point.name}'")
+        except Exception as e:
+            logger.error(f"Could not load scraper plugin '{entry_point.name}': {str(e)}")
+
+
+def available_scrapers() -> List[str]:
+    """Get the names of every registered scraper"""
+    load_scraper_plugins()
+    return sorted(_SCRAPERS)
+
+
+def get_scraper_class(name: str) -> Type["BaseScraper"]:
+    """
+    Get a registered scraper by name
+
+    Raises:
+        ValueError: If no scraper is registered under that name
+    """
+    load_scraper_plugins()
+    scraper_class = _SCRAPERS.get(name)
+    if scraper_class is None:
+        raise ValueError(
+            f"Unknown scraper '{name}'. Available: {', '.join(available_scrapers())}"
+        )
+    return scraper_class
+
+
+def create_scraper(name: str, **kwargs) -> "BaseScraper":
+    """Create a scraper by name, passing keyword arguments to its constructor"""
+    return get_scraper_class(name)(**kwargs)
+
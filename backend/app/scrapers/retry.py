@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.scrapers.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: throttling and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honoring the server's Retry-After
+    """
+
+    def __init__(
+        self,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=settings.SCRAPER_MAX_RETRIES,
+            base_delay=settings.SCRAPER_RETRY_BASE_DELAY,
+            max_delay=settings.SCRAPER_RETRY_MAX_DELAY,
+        )
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before a retry
+
+        Args:
+            retry: Number of the retry, starting at 0
+            retry_after: Delay requested by the server, if any
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostCircuitBreaker:
+    """
+    Adapts the request rate towards a host to its health.
+
+    Requests are evaluated in windows of `window` results. When a window's error
+    rate reaches `error_rate_threshold` the circuit opens: requests are held for
+    `cooldown` seconds and the host's rate is halved. Windows with some errors or an
+    average latency over `latency_threshold` lower the rate by a quarter, and healthy
+    windows bring it back up to the configured rate in steps of 10%.
+    """
+
+    MIN_RATE_FACTOR = 0.1
+
+    def __init__(
+        self,
+        limiter: TokenBucket,
+        window: int,
+        error_rate_threshold: float,
+        latency_threshold: float,
+        cooldown: float,
+    ):
+        self.limiter = limiter
+        self.base_rate = limiter.rate
+        self.window = window
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+
+        self._results: Deque[Tuple[bool, float]] = deque()
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, limiter: TokenBucket) -> "HostCircuitBreaker":
+        return cls(
+            limiter,
+            window=settings.SCRAPER_BREAKER_WINDOW,
+            error_rate_threshold=settings.SCRAPER_BREAKER_ERROR_RATE,
+            latency_threshold=settings.SCRAPER_BREAKER_LATENCY_SECONDS,
+            cooldown=settings.SCRAPER_BREAKER_COOLDOWN_SECONDS,
+        )
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    async def before_request(self) -> None:
+        """Hold the request while the circuit is open"""
+        delay = self._open_until - time.monotonic()
+        if delay > 0:
+            logger.warning(f"Circuit open, holding request for {delay:.1f} seconds")
+            await asyncio.sleep(delay)
+
+    def record(self, success: bool, latency: float) -> None:
+        """Record the outcome of a request"""
+        with self._lock:
+            self._results.append((success, latency))
+            if len(self._results) < self.window:
+                return
+
+            errors = sum(1 for ok, _ in self._results if not ok)
+            error_rate = errors / len(self._results)
+            avg_latency = sum(latency for _, latency in self._results) / len(
+                self._results
+            )
+            self._results.clear()
+
+            min_rate = self.base_rate * self.MIN_RATE_FACTOR
+            if error_rate >= self.error_rate_threshold:
+                self._open_until = time.monotonic() + self.cooldown
+                new_rate = max(min_rate, self.limiter.rate * 0.5)
+                logger.warning(
+                    f"Error rate {error_rate:.0%}: opening circuit for {self.cooldown}s, "
+                    f"rate lowered to {new_rate:.3f} req/s"
+                )
+            elif avg_latency > self.latency_threshold or errors:
+                new_rate = max(min_rate, self.limiter.rate * 0.75)
+                logger.info(
+                    f"Degraded host (latency {avg_latency:.2f}s, error rate {error_rate:.0%}), "
+                    f"rate lowered to {new_rate:.3f} req/s"
+                )
+            else:
+                new_rate = min(self.base_rate, self.limiter.rate + self.base_rate * 0.1)
+
+            if new_rate != self.limiter.rate:
+                self.limiter.set_rate(new_rate)
+
+
+_HOST_BREAKERS: Dict[str, HostCircuitBreaker] = {}
+_HOST_BREAKERS_LOCK = threading.Lock()
+
+
+def get_host_breaker(host: str, limiter: TokenBucket) -> HostCircuitBreaker:
+    """Get the process-wide circuit breaker for a host, creating it on first use"""
+    with _HOST_BREAKERS_LOCK:
+        breaker = _HOST_BREAKERS.get(host)
+        if breaker is None:
+            breaker = HostCircuitBreaker.from_settings(limiter)
+            _HOST_BREAKERS[host] = breaker
+        return breaker
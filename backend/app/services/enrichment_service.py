@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.db.repositories import PropertyRepository
+from app.scrapers.fincaraiz import FincaRaizScraper
+from app.scrapers.listing_fields import DetailFields
+
+logger = logging.getLogger(__name__)
+
+
+class DetailEnricher:
+    """
+    Second scraping stage: fetches the detail pages of listings and stores their
+    description and extended attributes.
+
+    URLs are submitted to a deduplicated work queue consumed by `concurrency`
+    workers. Requests go through the scraper, so they share the host rate limiter and
+    circuit breaker with result pages. Results are written in batches of
+    `batch_size`; a listing is only marked as enriched once its batch is stored, so
+    an interrupted run resumes from the listings still pending in the database.
+
+    Must be used inside the scraper's context, since it borrows its session:
+
+        async with scraper, DetailEnricher(scraper, repo) as enricher:
+            enricher.submit(urls)
+            await enricher.join()
+    """
+
+    def __init__(
+        self,
+        scraper: FincaRaizScraper,
+        property_repo: PropertyRepository,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        db_lock: Optional[asyncio.Lock] = None,
+    ):
+        """
+        Args:
+            db_lock: Lock of the repository's session, held while a batch is stored
+                     from a worker thread, when other code uses the session too
+        """
+        self.scraper = scraper
+        self.property_repo = property_repo
+        self.db_lock = db_lock or asyncio.Lock()
+        self.concurrency = max(1, concurrency or settings.SCRAPER_DETAIL_CONCURRENCY)
+        self.batch_size = max(1, batch_size or settings.SCRAPER_DETAIL_BATCH_SIZE)
+
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._seen: Set[str] = set()
+        self._results: Dict[str, DetailFields] = {}
+        self._workers: List[asyncio.Task] = []
+        # Counters reported in the task metadata
+        self.stats: Dict[str, int] = {
+            "queued": 0,
+            "duplicates": 0,
+            "enriched": 0,
+            "unavailable": 0,
+            "failed": 0,
+        }
+
+    async def __aenter__(self) -> "DetailEnricher":
+        self._workers = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)
+        ]
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Keep the details fetched so far, even when the run is interrupted
+        await self._flush()
+
+    def submit(self, urls: Iterable[str]) -> int:
+        """
+        Queue detail pages to fetch, skipping URLs already submitted
+
+        Returns:
+            Number of URLs queued
+        """
+        queued = 0
+        for url in urls:
+            url = str(url)
+            if url in self._seen:
+                self.stats["duplicates"] += 1
+                continue
+
+            self._seen.add(url)
+            self._queue.put_nowait(url)
+            queued += 1
+
+        self.stats["queued"] += queued
+        return queued
+
+    async def join(self) -> None:
+        """Wait until every queued detail page is processed and stored"""
+        await self._queue.join()
+        await self._flush()
+
+    async def _worker(self) -> None:
+        while True:
+            url = await self._queue.get()
+            try:
+                details = await self.scraper.get_property_details(url)
+                if details is None:
+                    # Left pending in the database, so a later run retries it
+                    self.stats["failed"] += 1
+                    continue
+
+                if details.attributes.get("unavailable"):
+                    self.stats["unavailable"] += 1
+                self._results[url] = details
+                if len(self._results) >= self.batch_size:
+                    await self._flush()
+
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Error enriching property {url}: {str(e)}")
+
+            finally:
+                self._queue.task_done()
+
+    async def _flush(self) -> None:
+        """Store the pending batch of detail page data, from a worker thread"""
+        if not self._results:
+            return
+
+        results, self._results = self._results, {}
+        async with self.db_lock:
+            self.stats["enriched"] += await asyncio.to_thread(
+                self.property_repo.update_properties_details, results
+            )
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the call stacks of every thread of the process at a fixed interval,
+    from a thread of its own, and aggregates them as collapsed stacks: one line per
+    distinct stack, frames joined by ";" from the thread down to the innermost call,
+    followed by the number of samples. That is the input format of flame graph tools
+    (flamegraph.pl, speedscope).
+
+    The whole process is sampled, so concurrent tasks and requests show up in the
+    profile as well; pages parsed by the process executor do not.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: Optional[float] = None,
+        max_stacks: Optional[int] = None,
+    ):
+        self.interval_seconds = (
+            interval_seconds or settings.SCRAPER_PROFILE_INTERVAL_SECONDS
+        )
+        self.max_stacks = max_stacks or settings.SCRAPER_PROFILE_MAX_STACKS
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the current stack of every thread but the profiler's"""
+        own_thread = threading.get_ident()
+        thread_names: Dict[int, str] = {
+            thread.ident: thread.name for thread in threading.enumerate()
+        }
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            frames.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+            self._stacks[";".join(reversed(frames))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """The sampled stacks in the collapsed format, most sampled first"""
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in self._stacks.most_common(self.max_stacks)
+        )
@@ -0,0 +1,105 @@
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.db.repositories.task_repository import TaskRepository
+from app.services.task_events import get_task_events
+
+logger = logging.getLogger(__name__)
+
+
+class TaskProgressReporter:
+    """
+    Write-behind progress of a running task.
+
+    Progress reported after each page is kept in memory and written with a single
+    UPDATE once `flush_pages` pages were reported or `flush_seconds` passed since
+    the last write, so task tracking costs a round trip every few pages instead of
+    several per page. The same UPDATE returns the task status, which is how a
+    cancel request is noticed.
+
+    Metadata (such as the checkpoint) is only persisted on flush: after a crash, a
+    task resumes from the last flushed checkpoint and scrapes a few pages again.
+    Live streams still get every page's progress, from memory.
+    """
+
+    def __init__(
+        self,
+        task_repo: TaskRepository,
+        task_id: str,
+        flush_seconds: Optional[float] = None,
+        flush_pages: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.task_repo = task_repo
+        self.task_id = task_id
+        self.flush_seconds = (
+            settings.SCRAPER_PROGRESS_FLUSH_SECONDS
+            if flush_seconds is None
+            else flush_seconds
+        )
+        self.flush_pages = max(1, flush_pages or settings.SCRAPER_PROGRESS_FLUSH_PAGES)
+        self.clock = clock
+
+        self.properties_found = 0
+        # Whether the last write found the task asked to stop
+        self.cancel_requested = False
+        self.flushes = 0
+        self._metadata: Dict[str, Any] = {}
+        self._pages = 0
+        self._last_flush = clock()
+
+    def record(self, properties_found: int, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Record the progress after a page and publish it to live streams, leaving the
+        write to the caller (tasks on the event loop flush from a worker thread)
+
+        Returns:
+            Whether a flush is due
+        """
+        self.properties_found = properties_found
+        self.update_metadata(metadata)
+        self._pages += 1
+        self.publish("cancelling" if self.cancel_requested else "running")
+
+        return (
+            self._pages >= self.flush_pages
+            or self.clock() - self._last_flush >= self.flush_seconds
+        )
+
+    def update_metadata(self, metadata: Optional[Dict[str, Any]]) -> None:
+        """Merge values into the metadata written on the next flush"""
+        if metadata:
+            self._metadata.update(metadata)
+
+    def flush(self) -> None:
+        """Write the buffered progress"""
+        if not self._pages and not self._metadata:
+            return
+
+        metadata, self._metadata = self._metadata, {}
+        self._pages = 0
+        self._last_flush = self.clock()
+        self.flushes += 1
+
+        status = self.task_repo.write_progress(
+            self.task_id, self.properties_found, metadata or None
+        )
+        self.cancel_requested = status == "cancelling"
+
+    def write_status(self, status: str, error: Optional[str] = None) -> None:
+        """Write the final status along with the buffered progress, without publishing it"""
+        metadata, self._metadata = self._metadata, {}
+        self._pages = 0
+        self.task_repo.update_task_status(
+            self.task_id,
+            status,
+            properties_found=self.properties_found,
+            error=error,
+            metadata=metadata or None,
+        )
+
+    def publish(self, status: str) -> None:
+        """Send the current progress to live streams; must run on the event loop"""
+        get_task_events().publish_progress(self.task_id, status, self.properties_found)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import random
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.repositories.schedule_repository import ScheduleRepository
+from app.models.scrape_schedule import ScrapeSchedule
+
+logger = logging.getLogger(__name__)
+
+# Queues a run of a due schedule given a database session
+ScheduleRunner = Callable[[ScrapeSchedule, Session], object]
+
+
+class ScrapeScheduler:
+    """
+    Queues the runs of recurring scrape definitions stored in the scrape_schedules
+    table.
+
+    Each schedule runs every `interval_minutes`, plus a random delay of up to
+    `jitter_seconds` so schedules sharing an interval spread their crawls. Due
+    schedules are claimed with SKIP LOCKED, so several API processes can run the
+    scheduler without queueing a run twice; a run whose previous one is still in
+    flight attaches to it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        run_schedule: ScheduleRunner,
+        poll_seconds: Optional[float] = None,
+        jitter_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.run_schedule = run_schedule
+        self.poll_seconds = poll_seconds or settings.SCRAPER_SCHEDULE_POLL_SECONDS
+        self.jitter_seconds = (
+            settings.SCRAPER_SCHEDULE_JITTER_SECONDS
+            if jitter_seconds is None
+            else jitter_seconds
+        )
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """Queue due schedules until `stop_event` is set"""
+        logger.info("Scrape scheduler started")
+
+        while not stop_event.is_set():
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Scrape scheduler could not queue due schedules: {str(e)}")
+
+            timeout = self.poll_seconds * random.uniform(0.8, 1.2)
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        logger.info("Scrape scheduler stopped")
+
+    def run_due(self) -> int:
+        """
+        Claim the due schedules and queue their runs
+
+        Returns:
+            Number of schedules run
+        """
+        db = self.session_factory()
+        try:
+            schedules = ScheduleRepository(db).claim_due_schedules(self.jitter_seconds)
+            for schedule in schedules:
+                try:
+                    self.run_schedule(schedule, db)
+                    logger.info(
+                        f"Queued scheduled scrape '{schedule.name}', next run at {schedule.next_run_at}"
+                    )
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Could not queue scheduled scrape '{schedule.name}': {str(e)}")
+            return len(schedules)
+        finally:
+            db.close()
+
+
+_scheduler_task: Optional[asyncio.Task] = None
+_scheduler_stop: Optional[asyncio.Event] = None
+
+
+async def start_scheduler(
+    session_factory: Callable[[], Session], run_schedule: ScheduleRunner
+) -> None:
+    """Start the application-wide scheduler (called on app startup)"""
+    global _scheduler_task, _scheduler_stop
+
+    if _scheduler_task is not None:
+        return
+
+    _scheduler_stop = asyncio.Event()
+    _scheduler_task = asyncio.ensure_future(
+        ScrapeScheduler(session_factory, run_schedule).run(_scheduler_stop)
+    )
+
+
+async def stop_scheduler() -> None:
+    """Stop the application-wide scheduler (called on app shutdown)"""
+    global _scheduler_task, _scheduler_stop
+
+    if _scheduler_task is not None:
+        _scheduler_stop.set()
+        await asyncio.gather(_scheduler_task, return_exceptions=True)
+    _scheduler_task = None
+    _scheduler_stop = None
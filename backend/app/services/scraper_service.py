@@ -1,20 +1,76 @@
 import logging
 import asyncio
+import time
 import traceback
 import uuid
+from contextlib import aclosing, nullcontext
 from datetime import datetime
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-from app.scrapers.fincaraiz import FincaRaizScraper
+from app.core.config import settings
+from app.core.metrics import ACTIVE_TASKS
+from app.scrapers import create_scraper
+from app.schemas.property import PropertyCreate
 from app.db.repositories.task_repository import TaskRepository
+from app.db import run_in_session_thread, session_lock
 from app.db.repositories import PropertyRepository
+from app.db.repositories.property_repository import UpsertResult
+from app.services.enrichment_service import DetailEnricher
+from app.services.progress_reporter import TaskProgressReporter
+from app.services.task_events import get_task_events
 
 logger = logging.getLogger(__name__)
 
-# Keep a small in-memory cache of recent logs (for endpoints that need quick access)
-SCRAPER_LOGS: List[Dict[str, Any]] = []
-MAX_LOG_ENTRIES = 100
+# Source scraped when a request does not name any
+DEFAULT_SOURCE = "fincaraiz"
+
+# Limits the sub-tasks running at once across every fan-out request of the process,
+# with the event loop it was created on
+_sub_task_semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+class _SourceRun:
+    """Progress of one source within a scraping task"""
+
+    def __init__(
+        self,
+        name: str,
+        property_repo: PropertyRepository,
+        enrich_details: bool,
+        start_page: int,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        db_lock: Optional[asyncio.Lock] = None,
+    ):
+        self.name = name
+        self.scraper = create_scraper(name)
+        self.enricher = (
+            DetailEnricher(self.scraper, property_repo, db_lock=db_lock)
+            if enrich_details and self.scraper.SUPPORTS_DETAILS
+            else None
+        )
+        checkpoint = checkpoint or {}
+        self.next_page: int = checkpoint.get("next_page", start_page)
+        self.pages_scraped: int = checkpoint.get("pages_scraped", 0)
+        self.properties_found: int = checkpoint.get("properties_found", 0)
+        self.unchanged_pages: int = checkpoint.get("unchanged_pages", 0)
+        # Whether the source has no pages left to scrape
+        self.done: bool = checkpoint.get("done", False)
+        self.stopped_early = False
+        self.error: Optional[str] = None
+        # Seconds spent looking up and saving the listings of this source
+        self.db_write_seconds = 0.0
+        # Saved listings that were new, changed or unchanged
+        self.saved: Dict[str, int] = {"new": 0, "changed": 0, "unchanged": 0}
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return {
+            "next_page": self.next_page,
+            "pages_scraped": self.pages_scraped,
+            "properties_found": self.properties_found,
+            "unchanged_pages": self.unchanged_pages,
+            "done": self.done,
+        }
 
 
 async def _run_scraper(
@@ -24,44 +80,244 @@ async def _run_scraper(
     property_type: str,
     max_pages: int,
     db: Session,
+    incremental: bool = False,
+    stop_after_unchanged_pages: int = 2,
+    enrich_details: bool = False,
+    sources: Optional[List[str]] = None,
+    start_page: int = 1,
+    checkpoint: Optional[Dict[str, Any]] = None,
 ) -> None:
     """
     Internal function to run the scraper asynchronously
+
+    Every source runs concurrently, paced by the rate limiter of its own host, and
+    their pages go through the same persistence stage. The task only fails when
+    every source fails.
+
+    In incremental mode only new or changed listings are saved, and a source stops
+    once `stop_after_unchanged_pages` consecutive pages bring nothing new: results
+    are ordered newest first, so the remaining pages are already known.
+
+    With `enrich_details`, the detail pages of new or changed listings are fetched
+    while result pages are being scraped, followed by listings of the same city and
+    region left pending by earlier runs.
+
+    After each saved page, the next page of every source is checkpointed in the task
+    metadata. Given that `checkpoint`, a failed, cancelled or interrupted task
+    continues where it stopped. Progress and checkpoints are written behind, every
+    few pages, and cancellation requests are noticed on those writes.
+
+    Database work runs in worker threads, one call at a time on the session, so a
+    task running in the API process does not hold up its requests.
     """
     task_repo = TaskRepository(db)
     property_repo = PropertyRepository(db)
-    total_properties = 0
+    sources = sources or [DEFAULT_SOURCE]
+    checkpoint = checkpoint or {}
+    last_page = start_page + max_pages - 1
+    total_properties: int = checkpoint.get("properties_found", 0)
+    progress = TaskProgressReporter(task_repo, task_id)
+    progress.properties_found = total_properties
+    cancelled = False
+    runs: List[_SourceRun] = []
+
+    def checkpoint_metadata() -> Dict[str, Any]:
+        return {
+            "checkpoint": {
+                "properties_found": total_properties,
+                "sources": {run.name: run.checkpoint() for run in runs},
+            }
+        }
+
+    def final_metadata() -> Dict[str, Any]:
+        return {
+            **checkpoint_metadata(),
+            **_run_metadata(runs, time.monotonic() - started_at),
+        }
 
+    def persist_page(
+        page_listings: List[PropertyCreate], lookup: bool
+    ) -> Tuple[List[PropertyCreate], Optional[UpsertResult]]:
+        """
+        Database side of save_page, run in a worker thread
+
+        Returns:
+            The new or changed listings (every listing without `lookup`), and the
+            result of the save, if anything was saved
+        """
+        new_or_changed = (
+            property_repo.find_new_or_changed_properties(page_listings)
+            if lookup
+            else page_listings
+        )
+        to_save = new_or_changed if incremental else page_listings
+        saved = property_repo.save_properties_batch(to_save) if to_save else None
+        return new_or_changed, saved
+
+    async def save_page(run: _SourceRun, page_listings: List[PropertyCreate]) -> bool:
+        """
+        Save a page of listings from a source and checkpoint it; an empty page is
+        one not modified since the last scrape
+
+        Returns:
+            Whether the source should keep scraping
+        """
+        nonlocal total_properties
+
+        run.pages_scraped += 1
+        run.properties_found += len(page_listings)
+        total_properties += len(page_listings)
+        if page_listings:
+            log_message = f"[Task {task_id}] Found {len(page_listings)} properties on current {run.name} page. Total so far: {total_properties}"
+        else:
+            log_message = f"[Task {task_id}] Current {run.name} page not modified since the last scrape"
+        logger.info(log_message)
+        _add_log_entry(task_id, "info", log_message)
+
+        keep_scraping = True
+        new_or_changed: List[PropertyCreate] = []
+        saved: Optional[UpsertResult] = None
+        if page_listings:
+            db_started_at = time.monotonic()
+            new_or_changed, saved = await run_in_session_thread(
+                db, persist_page, page_listings, incremental or bool(run.enricher)
+            )
+            run.db_write_seconds += time.monotonic() - db_started_at
+
+        if incremental:
+            if new_or_changed:
+                run.unchanged_pages = 0
+            else:
+                run.unchanged_pages += 1
+                if run.unchanged_pages >= stop_after_unchanged_pages:
+                    log_message = f"[Task {task_id}] No new or changed {run.name} properties in the last {run.unchanged_pages} pages, stopping at page {run.pages_scraped}"
+                    logger.info(log_message)
+                    _add_log_entry(task_id, "info", log_message)
+
+                    run.stopped_early = True
+                    if len(runs) == 1:
+                        progress.update_metadata(
+                            {
+                                "incremental": {
+                                    "stopped_early": True,
+                                    "pages_scraped": run.pages_scraped,
+                                    "unchanged_pages": run.unchanged_pages,
+                                }
+                            },
+                        )
+                    keep_scraping = False
+
+        if saved is not None:
+            run.saved["new"] += saved.inserted
+            run.saved["changed"] += saved.updated
+            run.saved["unchanged"] += saved.unchanged
+            log_message = f"[Task {task_id}] Saved {run.name} page: {saved.inserted} new, {saved.updated} changed, {saved.unchanged} unchanged"
+            logger.info(log_message)
+            _add_log_entry(task_id, "info", log_message)
+
+            if run.enricher:
+                run.enricher.submit(prop.url for prop in new_or_changed)
+
+        run.next_page = (run.scraper.current_page or run.next_page) + 1
+        if progress.record(total_properties, checkpoint_metadata()):
+            await run_in_session_thread(db, progress.flush)
+        return keep_scraping
+
+    async def finish(status: str, error: Optional[str] = None) -> None:
+        progress.update_metadata(final_metadata())
+        await run_in_session_thread(db, progress.write_status, status, error)
+        progress.publish(status)
+
+    async def scrape_source(run: _SourceRun) -> None:
+        nonlocal cancelled
+
+        remaining_pages = last_page - run.next_page + 1
+        if run.done or remaining_pages <= 0:
+            run.done = True
+            return
+
+        async with run.scraper, run.enricher or nullcontext(), aclosing(
+            run.scraper.get_property_listings(
+                city, region, property_type, remaining_pages, start_page=run.next_page
+            )
+        ) as pages:
+            async for page_listings in pages:
+                if cancelled:
+                    return
+                keep_scraping = await save_page(run, page_listings)
+                cancelled = cancelled or progress.cancel_requested
+                if cancelled:
+                    return
+                if not keep_scraping:
+                    break
+
+            run.done = True
+
+            if run.enricher:
+                # Resume listings whose detail pages earlier runs did not fetch
+                run.enricher.submit(
+                    await run_in_session_thread(
+                        db,
+                        property_repo.get_urls_pending_details,
+                        city,
+                        region,
+                        limit=settings.SCRAPER_DETAIL_BACKLOG_LIMIT,
+                        url_prefix=run.scraper.BASE_URL,
+                    )
+                )
+                await run.enricher.join()
+                log_message = f"[Task {task_id}] {run.name} detail pages enriched: {run.enricher.stats['enriched']}, failed: {run.enricher.stats['failed']}"
+                logger.info(log_message)
+                _add_log_entry(task_id, "info", log_message)
+
+    started_at = time.monotonic()
+    ACTIVE_TASKS.inc()
     try:
         start_time = datetime.now()
-        log_message = f"[Task {task_id}] Starting scraping for {property_type} in {city}, {region} at {start_time}"
+        resumed = " (resuming from checkpoint)" if checkpoint else ""
+        log_message = f"[Task {task_id}] Starting scraping for {property_type} in {city}, {region} from {', '.join(sources)} at {start_time}{resumed}"
         logger.info(log_message)
         _add_log_entry(task_id, "info", log_message)
 
         # Update task status to running
-        task_repo.update_task_status(task_id, "running")
+        await run_in_session_thread(db, task_repo.update_task_status, task_id, "running")
+        get_task_events().publish_progress(task_id, "running", total_properties)
+
+        source_checkpoints = checkpoint.get("sources", {})
+        runs = [
+            _SourceRun(
+                name,
+                property_repo,
+                enrich_details,
+                start_page,
+                source_checkpoints.get(name),
+                db_lock=session_lock(db),
+            )
+            for name in sources
+        ]
+        results = await asyncio.gather(
+            *(scrape_source(run) for run in runs), return_exceptions=True
+        )
 
-        async with FincaRaizScraper() as scraper:
-            async for page_listings in scraper.get_property_listings(
-                city, region, property_type, max_pages
-            ):
-                if not page_listings:
-                    continue
+        errors = []
+        for run, result in zip(runs, results):
+            if isinstance(result, BaseException):
+                run.error = str(result)
+                errors.append(result)
+                log_message = f"[Task {task_id}] Error scraping {run.name}: {run.error}"
+                logger.error(log_message)
+                _add_log_entry(task_id, "error", log_message)
 
-                total_properties += len(page_listings)
-                log_message = f"[Task {task_id}] Found {len(page_listings)} properties on current page. Total so far: {total_properties}"
-                logger.info(log_message)
-                _add_log_entry(task_id, "info", log_message)
-                
-                # Update task status with progress
-                task_repo.update_task_status(
-                    task_id,
-                    "running",
-                    properties_found=total_properties,
-                )
+        if len(errors) == len(runs):
+            raise errors[0]
+
+        if cancelled:
+            log_message = f"[Task {task_id}] Scraping cancelled. Total properties: {total_properties}"
+            logger.info(log_message)
+            _add_log_entry(task_id, "info", log_message)
 
-                # Save current page's properties to database
-                property_repo.save_properties_batch(page_listings)
+            await finish("cancelled")
+            return
 
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -70,9 +326,7 @@ async def _run_scraper(
         _add_log_entry(task_id, "info", log_message)
 
         # Update task status with results
-        task_repo.update_task_status(
-            task_id, "completed", properties_found=total_properties
-        )
+        await finish("completed")
 
     except Exception as e:
         error_msg = str(e)
@@ -82,7 +336,67 @@ async def _run_scraper(
         _add_log_entry(task_id, "error", log_message)
 
         # Update task status with error
-        task_repo.update_task_status(task_id, "failed", error=error_msg)
+        await finish("failed", error=error_msg)
+
+    finally:
+        ACTIVE_TASKS.dec()
+
+
+def _sum_counters(counters: List[Dict[str, float]]) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for counter in counters:
+        for key, value in counter.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _phase_metadata(runs: List[_SourceRun], elapsed_seconds: float) -> Dict[str, Any]:
+    """
+    Break the run time of a task down by phase. Phases of concurrent requests and
+    sources overlap, so their sum can exceed the elapsed time.
+    """
+    timings = _sum_counters([run.scraper.timings for run in runs])
+    cards = sum(run.scraper.stats.get("cards", 0) for run in runs)
+    phases = {f"{phase}_seconds": round(seconds, 3) for phase, seconds in timings.items()}
+    phases["db_write_seconds"] = round(sum(run.db_write_seconds for run in runs), 3)
+    phases["elapsed_seconds"] = round(elapsed_seconds, 3)
+    phases["bytes_downloaded"] = sum(
+        run.scraper.stats.get("bytes_downloaded", 0) for run in runs
+    )
+    phases["cards"] = cards
+    phases["cards_per_second"] = (
+        round(cards / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0
+    )
+    return phases
+
+
+def _run_metadata(runs: List[_SourceRun], elapsed_seconds: float) -> Dict[str, Any]:
+    """Build the request counters and phase timings stored in the task metadata"""
+    metadata: Dict[str, Any] = {
+        "fetch": _sum_counters([run.scraper.stats for run in runs]),
+        "phases": _phase_metadata(runs, elapsed_seconds),
+        "saved": _sum_counters([run.saved for run in runs]),
+    }
+    enrichers = [run.enricher for run in runs if run.enricher]
+    if enrichers:
+        metadata["details"] = _sum_counters([enricher.stats for enricher in enrichers])
+
+    # Break the results down by source when several ran together; "sources" keeps
+    # the requested list, which resuming the task reads back
+    if len(runs) > 1:
+        metadata["source_results"] = {
+            run.name: {
+                "pages_scraped": run.pages_scraped,
+                "properties_found": run.properties_found,
+                "stopped_early": run.stopped_early,
+                "error": run.error,
+                "fetch": run.scraper.stats,
+                "phases": _phase_metadata([run], elapsed_seconds),
+                "saved": run.saved,
+            }
+            for run in runs
+        }
+    return metadata
 
 
 async def scrape_properties(
@@ -92,6 +406,10 @@ async def scrape_properties(
     max_pages: int,
     db: Session,
     task_id: str,
+    incremental: bool = False,
+    stop_after_unchanged_pages: int = 2,
+    enrich_details: bool = False,
+    sources: Optional[List[str]] = None,
 ) -> str:
     """
     Run the property scraper and save results to the database
@@ -105,84 +423,294 @@ async def scrape_properties(
         max_pages: Maximum number of pages to scrape
         db: Database session
         task_id: Optional task ID to use (will generate one if not provided)
+        incremental: Only save new or changed listings and stop paginating once
+                     `stop_after_unchanged_pages` consecutive pages bring nothing new
+        stop_after_unchanged_pages: Unchanged pages in a row that stop an incremental scrape
+        enrich_details: Fetch the detail pages of new or changed listings to fill their
+                        description and extended attributes
+        sources: Registered scrapers to run concurrently (defaults to FincaRaiz)
 
     Returns:
         The task ID
     """
     if task_id is None:
         task_id = str(uuid.uuid4())[:8]
+    sources = sources or [DEFAULT_SOURCE]
 
-    # Create task in database
+    # Create task in database, unless it was queued beforehand
     task_repo = TaskRepository(db)
-    task_repo.create_task(
-        {
-            "id": task_id,
-            "city": city,
-            "region": region,
-            "property_type": property_type,
-            "max_pages": max_pages,
-            "status": "pending",
-            "start_time": datetime.now(),
-        }
-    )
+    task = await run_in_session_thread(db, task_repo.get_task, task_id)
+    if task is None:
+        await run_in_session_thread(
+            db,
+            task_repo.create_task,
+            {
+                "id": task_id,
+                "city": city,
+                "region": region,
+                "property_type": property_type,
+                "max_pages": max_pages,
+                "status": "pending",
+                "start_time": datetime.now(),
+                "cmetadata": {"sources": sources},
+            },
+        )
 
-    await _run_scraper(task_id, city, region, property_type, max_pages, db)
+    await _run_scraper(
+        task_id,
+        city,
+        region,
+        property_type,
+        max_pages,
+        db,
+        incremental=incremental,
+        stop_after_unchanged_pages=stop_after_unchanged_pages,
+        enrich_details=enrich_details,
+        sources=sources,
+        # A resumed or reclaimed task continues from its last saved page
+        checkpoint=(task.cmetadata or {}).get("checkpoint") if task else None,
+    )
     return task_id
 
 
-def _add_log_entry(task_id: str, level: str, message: str) -> None:
-    """Add a log entry to the in-memory log cache"""
-    timestamp = datetime.now().isoformat()
-
-    SCRAPER_LOGS.append(
-        {"task_id": task_id, "level": level, "message": message, "timestamp": timestamp}
-    )
+def plan_sub_tasks(
+    property_types: List[str], max_pages: int, shard_pages: Optional[int] = None
+) -> List[Tuple[str, int, int]]:
+    """
+    Split a request into sub-tasks: one per property type, and optionally one per
+    range of `shard_pages` pages within each type
 
-    # Keep the log size under control
-    if len(SCRAPER_LOGS) > MAX_LOG_ENTRIES:
-        SCRAPER_LOGS.pop(0)  # Remove oldest entry
+    Returns:
+        (property_type, start_page, max_pages) of every sub-task
+    """
+    shard_pages = shard_pages or max_pages
+    return [
+        (property_type, start_page, min(shard_pages, max_pages - start_page + 1))
+        for property_type in property_types
+        for start_page in range(1, max_pages + 1, shard_pages)
+    ]
 
 
-def get_task_logs(
-    task_id: Optional[str] = None, limit: int = 50
-) -> List[Dict[str, Any]]:
+async def scrape_properties_fan_out(
+    city: str,
+    region: str,
+    property_types: List[str],
+    max_pages: int,
+    db: Session,
+    task_id: str,
+    incremental: bool = False,
+    stop_after_unchanged_pages: int = 2,
+    enrich_details: bool = False,
+    sources: Optional[List[str]] = None,
+    shard_pages: Optional[int] = None,
+) -> str:
     """
-    Get recent scraper logs from memory
+    Run a request as concurrent sub-tasks, one per property type (and page range
+    when `shard_pages` is given), linked to a parent task that aggregates their
+    properties found and status. Sub-tasks of every request of the process share
+    SCRAPER_MAX_CONCURRENT_SUBTASKS slots, so a request takes about as long as its
+    longest sub-task while few requests run, and concurrent requests do not
+    multiply the load on the sources.
 
     Args:
-        task_id: Optional task ID to filter logs
-        limit: Maximum number of logs to return
+        property_types: Property types to search for, each scraped by its own sub-task
+        max_pages: Maximum number of pages to scrape for each property type
+        shard_pages: Pages scraped by each sub-task; a property type is split into
+                     several page ranges when it is lower than `max_pages`
+        Other arguments are the same as scrape_properties
 
     Returns:
-        List of log entries
+        The ID of the parent task
     """
-    if task_id:
-        # Filter logs by task_id
-        logs = [log for log in SCRAPER_LOGS if log["task_id"] == task_id]
+    sources = sources or [DEFAULT_SOURCE]
+    sub_tasks = plan_sub_tasks(property_types, max_pages, shard_pages)
+
+    task_repo = TaskRepository(db)
+    parent = await run_in_session_thread(db, task_repo.get_task, task_id)
+    children = (
+        await run_in_session_thread(db, task_repo.get_child_tasks, task_id)
+        if parent is not None
+        else []
+    )
+    if children:
+        # A resumed task, or one run again after its worker died: completed
+        # sub-tasks are kept, the others continue from their checkpoints
+        runs = []
+        for child in children:
+            if child.status == "completed":
+                continue
+            await run_in_session_thread(db, task_repo.requeue_task, child.id)
+            child_metadata = child.cmetadata or {}
+            runs.append(
+                (
+                    child.id,
+                    child.property_type,
+                    child_metadata.get("start_page", 1),
+                    child.max_pages,
+                    child_metadata.get("checkpoint"),
+                )
+            )
+        child_ids = [child.id for child in children]
+    else:
+        child_ids = [str(uuid.uuid4())[:8] for _ in sub_tasks]
+        runs = [
+            (child_id, property_type, start_page, pages, None)
+            for child_id, (property_type, start_page, pages) in zip(child_ids, sub_tasks)
+        ]
+
+    fan_out_metadata = {
+        "sources": sources,
+        "sub_tasks": child_ids,
+        "shard_pages": shard_pages,
+    }
+    if parent is None:
+        await run_in_session_thread(
+            db,
+            task_repo.create_task,
+            {
+                "id": task_id,
+                "city": city,
+                "region": region,
+                "property_type": "-y-".join(property_types),
+                "max_pages": max_pages,
+                "status": "running",
+                "start_time": datetime.now(),
+                "cmetadata": fan_out_metadata,
+            },
+        )
     else:
-        logs = SCRAPER_LOGS.copy()
+        await run_in_session_thread(
+            db, task_repo.update_task_status, task_id, "running", metadata=fan_out_metadata
+        )
+    if not children:
+        for child_id, property_type, start_page, pages, _ in runs:
+            await run_in_session_thread(
+                db,
+                task_repo.create_task,
+                {
+                    "id": child_id,
+                    "parent_id": task_id,
+                    "city": city,
+                    "region": region,
+                    "property_type": property_type,
+                    "max_pages": pages,
+                    "status": "pending",
+                    "start_time": datetime.now(),
+                    "cmetadata": {"sources": sources, "start_page": start_page},
+                },
+            )
+
+    log_message = f"[Task {task_id}] Split into {len(child_ids)} sub-tasks, running {len(runs)}: {', '.join(run[0] for run in runs)}"
+    logger.info(log_message)
+    _add_log_entry(task_id, "info", log_message)
+
+    semaphore = _get_sub_task_semaphore()
+
+    async def run_sub_task(
+        child_id: str,
+        property_type: str,
+        start_page: int,
+        pages: int,
+        checkpoint: Optional[Dict[str, Any]],
+    ) -> None:
+        async with semaphore:
+            # Sub-tasks still waiting when the request was cancelled never start
+            child = await run_in_session_thread(db, task_repo.get_task, child_id)
+            if child is not None and child.status == "cancelled":
+                return
+
+            await _run_scraper(
+                child_id,
+                city,
+                region,
+                property_type,
+                pages,
+                db,
+                incremental=incremental,
+                stop_after_unchanged_pages=stop_after_unchanged_pages,
+                enrich_details=enrich_details,
+                sources=sources,
+                start_page=start_page,
+                checkpoint=checkpoint,
+            )
+        await _update_parent_task(db, task_repo, task_id, finished=False)
+
+    await asyncio.gather(*(run_sub_task(*run) for run in runs))
+    await _update_parent_task(db, task_repo, task_id, finished=True)
+    return task_id
 
-    # Return the most recent logs up to the limit
-    return logs[-limit:] if logs else []
 
+def _get_sub_task_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore shared by the sub-tasks of the process, creating it on first use"""
+    global _sub_task_semaphore
+    loop = asyncio.get_running_loop()
+    if _sub_task_semaphore is None or _sub_task_semaphore[0] is not loop:
+        _sub_task_semaphore = (
+            loop,
+            asyncio.Semaphore(max(1, settings.SCRAPER_MAX_CONCURRENT_SUBTASKS)),
+        )
+    return _sub_task_semaphore[1]
 
-def get_task_status(task_id: str, db: Session) -> Any:
+
+async def _update_parent_task(
+    db: Session, task_repo: TaskRepository, task_id: str, finished: bool
+) -> None:
     """
-    Get task status from database
+    Aggregate the properties found and status of a task's sub-tasks into it.
+    A finished parent is cancelled when any sub-task was cancelled, and fails when
+    every sub-task failed; otherwise it completes, naming the failed sub-tasks in
+    its error.
+    """
+    children = await run_in_session_thread(db, task_repo.get_child_tasks, task_id)
+    properties_found = sum(child.properties_found or 0 for child in children)
+
+    if not finished:
+        await run_in_session_thread(db, task_repo.write_progress, task_id, properties_found)
+        get_task_events().publish_progress(task_id, "running", properties_found)
+        return
+
+    failed = [child.id for child in children if child.status == "failed"]
+    error = None
+    if any(child.status == "cancelled" for child in children):
+        status = "cancelled"
+    elif children and len(failed) == len(children):
+        status = "failed"
+        error = f"All {len(children)} sub-tasks failed"
+    else:
+        status = "completed"
+        if failed:
+            error = f"{len(failed)} of {len(children)} sub-tasks failed: {', '.join(failed)}"
+    await run_in_session_thread(
+        db,
+        task_repo.update_task_status,
+        task_id,
+        status,
+        properties_found=properties_found,
+        error=error,
+    )
 
-    Args:
-        task_id: The ID of the task to get status for, or None to get all tasks
-        db: Database session
+    get_task_events().publish_progress(task_id, status, properties_found)
+    log_message = f"[Task {task_id}] Sub-tasks finished. Total properties: {properties_found}, failed sub-tasks: {len(failed)}"
+    logger.info(log_message)
+    _add_log_entry(task_id, "info", log_message)
 
-    Returns:
-        Task or list of tasks
-    """
-    if not db:
-        return None
 
-    task_repo = TaskRepository(db)
+def _add_log_entry(task_id: str, level: str, message: str) -> None:
+    """Add a log entry to the task's in-memory logs, pushing it to live streams"""
+    get_task_events().add_log(task_id, level, message)
+
+
+def get_task_logs(
+    task_id: Optional[str] = None, limit: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    Get recent scraper logs from memory
 
-    if task_id:
-        return task_repo.get_task(task_id)
+    Args:
+        task_id: Optional task ID to filter logs
+        limit: Maximum number of logs to return
 
-    return task_repo.get_tasks(limit=20)
+    Returns:
+        List of log entries
+    """
+    return get_task_events().get_logs(task_id, limit)
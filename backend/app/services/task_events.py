@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Subscription key of streams following every task
+ALL_TASKS = "*"
+
+
+class TaskEventBroker:
+    """
+    In-memory logs and live events of scraping tasks.
+
+    Each task keeps its last `entries_per_task` log entries in a bounded deque, so a
+    busy task cannot push out the logs of the others, and only the `max_tasks` most
+    recently active tasks are kept. Log entries and progress updates are pushed to
+    the queues of subscribed streams; a subscriber that falls behind loses events
+    rather than slowing down the scraper.
+
+    Must be used from the event loop running the tasks.
+    """
+
+    def __init__(
+        self,
+        entries_per_task: int,
+        max_tasks: int,
+        recent_entries: int,
+        subscriber_queue_size: int = 200,
+    ):
+        self.entries_per_task = max(1, entries_per_task)
+        self.max_tasks = max(1, max_tasks)
+        self.subscriber_queue_size = subscriber_queue_size
+
+        self._logs: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        # Latest entries of every task, for the all-tasks view
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=max(1, recent_entries))
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def add_log(self, task_id: str, level: str, message: str) -> Dict[str, Any]:
+        """Store a log entry of a task and push it to its subscribers"""
+        entry = {
+            "task_id": task_id,
+            "level": level,
+            "message": message,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+        task_logs = self._logs.get(task_id)
+        if task_logs is None:
+            task_logs = self._logs[task_id] = deque(maxlen=self.entries_per_task)
+            if len(self._logs) > self.max_tasks:
+                self._logs.popitem(last=False)
+        else:
+            self._logs.move_to_end(task_id)
+        task_logs.append(entry)
+        self._recent.append(entry)
+
+        self._publish(task_id, {"type": "log", **entry})
+        return entry
+
+    def get_logs(self, task_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recent log entries of a task, or of every task"""
+        logs = self._recent if task_id is None else self._logs.get(task_id, ())
+        if limit <= 0:
+            return []
+        return list(logs)[-limit:]
+
+    def publish_progress(
+        self, task_id: str, status: str, properties_found: Optional[int] = None
+    ) -> None:
+        """Push the status and properties found of a task to its subscribers"""
+        self._publish(
+            task_id,
+            {
+                "type": "progress",
+                "task_id": task_id,
+                "status": status,
+                "properties_found": properties_found,
+                "timestamp": datetime.now().isoformat(),
+            },
+        )
+
+    def subscribe(self, task_id: Optional[str] = None) -> asyncio.Queue:
+        """Get a queue receiving the events of a task, or of every task"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        self._subscribers.setdefault(task_id or ALL_TASKS, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, task_id: Optional[str] = None) -> None:
+        key = task_id or ALL_TASKS
+        subscribers = self._subscribers.get(key)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[key]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def _publish(self, task_id: str, event: Dict[str, Any]) -> None:
+        for key in (task_id, ALL_TASKS):
+            for queue in self._subscribers.get(key, ()):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    pass
+
+
+_task_events: Optional[TaskEventBroker] = None
+
+
+def get_task_events() -> TaskEventBroker:
+    """Get the process-wide task event broker"""
+    global _task_events
+
+    if _task_events is None:
+        _task_events = TaskEventBroker(
+            settings.SCRAPER_LOG_ENTRIES_PER_TASK,
+            settings.SCRAPER_LOG_MAX_TASKS,
+            settings.SCRAPER_LOG_RECENT_ENTRIES,
+        )
+    return _task_events
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Format an event as a Server-Sent Events message named after its type"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def task_event_stream(
+    task_id: Optional[str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    initial_events: List[Dict[str, Any]],
+    poll_progress: Optional[Callable[[], Awaitable[List[Dict[str, Any]]]]] = None,
+    keepalive_seconds: Optional[float] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Server-Sent Events stream of the logs and progress of a task, or of every task
+
+    Args:
+        task_id: Task to follow, or None for every task
+        is_disconnected: Tells whether the client went away
+        initial_events: Events sent first (recent logs, current status)
+        poll_progress: Called when no event arrived for `keepalive_seconds`, for tasks
+                       run by other processes; returns progress events, of which
+                       those that changed since the last one sent are streamed
+        keepalive_seconds: Idle time after which a keep-alive comment is sent
+    """
+    events = get_task_events()
+    keepalive_seconds = keepalive_seconds or settings.SCRAPER_EVENTS_KEEPALIVE_SECONDS
+    queue = events.subscribe(task_id)
+    # Last (status, properties found) sent for each task
+    last_progress: Dict[str, Tuple[str, Optional[int]]] = {}
+
+    def progress_changed(event: Dict[str, Any]) -> bool:
+        return last_progress.get(event["task_id"]) != (event["status"], event["properties_found"])
+
+    def sent(event: Dict[str, Any]) -> str:
+        if event["type"] == "progress":
+            last_progress[event["task_id"]] = (event["status"], event["properties_found"])
+        return format_sse(event)
+
+    try:
+        for event in initial_events:
+            yield sent(event)
+
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                polled = await poll_progress() if poll_progress else []
+                changed = [event for event in polled if progress_changed(event)]
+                if not changed:
+                    yield ": keep-alive\n\n"
+                for event in changed:
+                    yield sent(event)
+                continue
+
+            yield sent(event)
+    finally:
+        events.unsubscribe(queue, task_id)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import run_in_session_thread
+from app.db.repositories.task_repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+# Runs a claimed task given its ID and a database session
+TaskRunner = Callable[[str, Session], Awaitable[None]]
+
+
+def default_worker_id() -> str:
+    """Identify a worker by host, process and a random suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class TaskQueueWorker:
+    """
+    Worker of the durable task queue stored in the tasks table.
+
+    Claims pending tasks (SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers
+    on any number of nodes can poll the same table), renews its lease on the running
+    task with heartbeats, and puts tasks whose lease expired — their worker died —
+    back in the queue. When a heartbeat finds the lease lost, the task is cancelled
+    since another worker may already be running it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        run_task: TaskRunner,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None,
+        poll_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.run_task = run_task
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds or settings.SCRAPER_LEASE_SECONDS
+        self.heartbeat_seconds = heartbeat_seconds or settings.SCRAPER_HEARTBEAT_SECONDS
+        self.poll_seconds = poll_seconds or settings.SCRAPER_QUEUE_POLL_SECONDS
+        self.max_attempts = max_attempts or settings.SCRAPER_TASK_MAX_ATTEMPTS
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """Claim and run tasks until `stop_event` is set"""
+        logger.info(f"Task queue worker {self.worker_id} started")
+
+        while not stop_event.is_set():
+            try:
+                claimed = await self.run_next()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} could not poll the queue: {str(e)}")
+                claimed = False
+
+            if not claimed:
+                # Jitter keeps idle workers from polling in lockstep
+                timeout = self.poll_seconds * random.uniform(0.5, 1.5)
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+        logger.info(f"Task queue worker {self.worker_id} stopped")
+
+    async def run_next(self) -> bool:
+        """
+        Reclaim expired leases, then claim and run the next pending task
+
+        Returns:
+            Whether a task was claimed
+        """
+        db = self.session_factory()
+        try:
+            task_repo = TaskRepository(db)
+            # Queue queries run in worker threads, so they do not hold up the jobs and
+            # heartbeats of the other workers sharing the event loop
+            await run_in_session_thread(db, task_repo.reclaim_expired_tasks, self.max_attempts)
+            task = await run_in_session_thread(
+                db, task_repo.claim_next_task, self.worker_id, self.lease_seconds
+            )
+            if task is None:
+                return False
+
+            task_id = task.id
+            logger.info(
+                f"Worker {self.worker_id} claimed task {task_id} (attempt {task.attempts})"
+            )
+
+            job = asyncio.ensure_future(self.run_task(task_id, db))
+            heartbeat = asyncio.ensure_future(self._heartbeat(task_id, job))
+            try:
+                await job
+            except asyncio.CancelledError:
+                if not job.cancelled():
+                    raise
+                logger.warning(f"Task {task_id} cancelled after its lease was lost")
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+
+            await run_in_session_thread(db, task_repo.release_lease, task_id, self.worker_id)
+            return True
+        finally:
+            db.close()
+
+    async def _heartbeat(self, task_id: str, job: asyncio.Future) -> None:
+        """Renew the lease on a task while it runs, cancelling it if the lease is lost"""
+        # A session of its own: the job's session may be in the middle of a transaction
+        db = self.session_factory()
+        try:
+            task_repo = TaskRepository(db)
+            while not job.done():
+                await asyncio.sleep(self.heartbeat_seconds)
+                try:
+                    renewed = await run_in_session_thread(
+                        db, task_repo.renew_lease, task_id, self.worker_id, self.lease_seconds
+                    )
+                except Exception as e:
+                    # A transient database error must not kill the task; the lease
+                    # only expires after several missed heartbeats
+                    await run_in_session_thread(db, db.rollback)
+                    logger.warning(f"Could not renew lease on task {task_id}: {str(e)}")
+                    continue
+
+                if not renewed:
+                    logger.error(f"Worker {self.worker_id} lost its lease on task {task_id}")
+                    job.cancel()
+                    return
+        finally:
+            db.close()
@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+import logging
+import socket
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the worker pool queue is full"""
+
+
+class ScrapeWorkerPool:
+    """
+    Long-lived asyncio workers running scrape jobs on the application's event loop.
+
+    Jobs wait in a bounded priority queue: higher priorities run first, and jobs of
+    the same priority run in submission order. Submitting to a full queue raises
+    QueueFullError instead of piling up work.
+    """
+
+    def __init__(self, workers: int, max_queue_size: int):
+        self.workers = max(1, workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.active_jobs = 0
+
+        self._queue: Optional["asyncio.PriorityQueue[Tuple[int, int, str, Job]]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._counter = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the workers (must be called from the loop that runs the jobs)"""
+        if self.is_running:
+            return
+
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.ensure_future(self._worker(index)) for index in range(self.workers)
+        ]
+        logger.info(
+            f"Started {self.workers} scrape workers (queue size {self.max_queue_size})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the workers, cancelling running jobs and dropping queued ones"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        dropped = self.queue_depth
+        self._tasks = []
+        self._queue = None
+        logger.info(f"Stopped scrape workers, {dropped} queued jobs dropped")
+
+    def submit(self, job: Job, priority: int = 0, name: str = "") -> None:
+        """
+        Queue a job
+
+        Args:
+            job: Coroutine function run by a worker
+            priority: Jobs with higher priorities run first
+            name: Job name used in logs
+
+        Raises:
+            QueueFullError: If the queue already holds max_queue_size jobs
+            RuntimeError: If the pool was not started
+        """
+        if self._queue is None:
+            raise RuntimeError("The scrape worker pool is not running")
+
+        try:
+            self._queue.put_nowait((-priority, next(self._counter), name, job))
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                f"Scrape queue is full ({self.max_queue_size} jobs waiting)"
+            )
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            _, _, name, job = await self._queue.get()
+            self.active_jobs += 1
+            try:
+                logger.info(f"Worker {index} running job {name}")
+                await job()
+            except Exception as e:
+                # Jobs report their own failures; this only keeps the worker alive
+                logger.error(f"Job {name} failed in worker {index}: {str(e)}")
+            finally:
+                self.active_jobs -= 1
+                self._queue.task_done()
+
+
+_worker_pool: Optional[ScrapeWorkerPool] = None
+
+
+def worker_pool_owner_id() -> str:
+    """
+    Identify the API process as owner of the tasks its worker pool runs; the same
+    across restarts, so a restarted process finds the tasks it left unfinished
+    """
+    return settings.SCRAPER_INSTANCE_ID or socket.gethostname()
+
+
+async def start_worker_pool() -> None:
+    """Create and start the application-wide worker pool (called on app startup)"""
+    global _worker_pool
+
+    if _worker_pool is None:
+        _worker_pool = ScrapeWorkerPool(
+            settings.SCRAPER_WORKERS, settings.SCRAPER_QUEUE_SIZE
+        )
+    await _worker_pool.start()
+
+
+async def stop_worker_pool() -> None:
+    """Stop the application-wide worker pool (called on app shutdown)"""
+    global _worker_pool
+
+    if _worker_pool is not None:
+        await _worker_pool.stop()
+    _worker_pool = None
+
+
+def get_worker_pool() -> Optional[ScrapeWorkerPool]:
+    """Get the application-wide worker pool, or None when it was not started"""
+    return _worker_pool
@@ -0,0 +1,123 @@
+"""
+Scrape worker process for the durable task queue.
+
+Claims the scraping tasks queued in the database (SCRAPER_QUEUE_BACKEND=database)
+and runs them. Start as many worker processes, on as many nodes, as needed:
+
+    python -m app.worker --concurrency 4
+
+Its metrics are served in the Prometheus text format on WORKER_METRICS_PORT
+(`--metrics-port`, 0 to disable).
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import get_metrics_registry
+from app.core.usecases import ScraperUseCases
+from app.db import SessionLocal
+from app.scrapers.http_client import close_http_client, start_http_client
+from app.scrapers.parse_pool import shutdown_parse_executor
+from app.services.task_queue import TaskQueueWorker, default_worker_id
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_task(task_id: str, db) -> None:
+    await ScraperUseCases(db).run_queued_task(task_id)
+
+
+async def serve_metrics(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Answer an HTTP request with the metrics of the process, whatever its path"""
+    try:
+        # Request line and headers, which are not needed
+        while (await reader.readline()).strip():
+            pass
+        body = get_metrics_registry().render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            + f"Content-Length: {len(body)}\r\n".encode()
+            + b"Connection: close\r\n\r\n"
+            + body
+        )
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int) -> Optional[asyncio.AbstractServer]:
+    """Serve the metrics of the process on `port`, unless it is 0"""
+    if not port:
+        return None
+    server = await asyncio.start_server(serve_metrics, port=port)
+    logger.info(f"Serving metrics on port {port}")
+    return server
+
+
+async def run_workers(concurrency: int, metrics_port: int = 0) -> None:
+    """Run queue workers until the process receives SIGINT or SIGTERM"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop_event.set)
+        except NotImplementedError:
+            # Not available on Windows; Ctrl+C still interrupts the process
+            pass
+
+    worker_id = default_worker_id()
+    workers = [
+        TaskQueueWorker(SessionLocal, run_task, worker_id=f"{worker_id}/{index}")
+        for index in range(concurrency)
+    ]
+
+    metrics_server = await start_metrics_server(metrics_port)
+    await start_http_client()
+    try:
+        await asyncio.gather(*(worker.run(stop_event) for worker in workers))
+    finally:
+        await close_http_client()
+        shutdown_parse_executor()
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.SCRAPER_WORKERS,
+        help="Tasks run at the same time by this process",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.WORKER_METRICS_PORT,
+        help="Port serving the metrics of this process, 0 to disable",
+    )
+    args = parser.parse_args()
+
+    logger.info(f"Starting {args.concurrency} task queue workers")
+    asyncio.run(run_workers(max(1, args.concurrency), args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
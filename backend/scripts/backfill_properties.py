@@ -0,0 +1,60 @@
+"""
+Load archived scrapes into the properties table with the COPY-based bulk loader.
+
+Each input file holds one property per line, as a JSON object with the fields of
+PropertyCreate. Files are streamed, validated line by line and loaded in a single
+transaction; lines that are not valid properties are reported and skipped.
+
+Usage:
+    python scripts/backfill_properties.py archive.jsonl [more.jsonl ...]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Iterator, List
+
+from pydantic import ValidationError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.db import SessionLocal  # noqa: E402
+from app.db.repositories.property_repository import PropertyRepository  # noqa: E402
+from app.schemas.property import PropertyCreate  # noqa: E402
+
+logger = logging.getLogger("backfill_properties")
+
+
+def read_properties(paths: List[Path]) -> Iterator[PropertyCreate]:
+    for path in paths:
+        with path.open(encoding="utf-8") as archive:
+            for line_number, line in enumerate(archive, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield PropertyCreate(**json.loads(line))
+                except (ValueError, ValidationError) as e:
+                    logger.warning(f"Skipping {path}:{line_number}: {str(e)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("archives", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    db = SessionLocal()
+    try:
+        result = PropertyRepository(db).bulk_load_properties(read_properties(args.archives))
+    finally:
+        db.close()
+
+    print(f"{result.inserted} properties inserted, {result.updated} updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure the throughput of the property listing route under concurrent read load.
+
+Sends the same filtered `/properties` request from an increasing number of
+concurrent clients to a running API server and reports requests per second and
+latency percentiles for each level. With queries that do not block the event
+loop, throughput grows with concurrency until the database or its connection
+pool saturates; with blocking queries it stays flat.
+
+Usage:
+    python scripts/bench_concurrent_reads.py [--url http://localhost:8000] \
+        [--concurrency 1 4 16 64] [--requests 400] [--query "city=manizales&limit=50"]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import aiohttp  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+
+async def run_level(
+    url: str, concurrency: int, total_requests: int
+) -> Tuple[float, List[float], int]:
+    """
+    Returns:
+        Elapsed seconds, latency of each successful request, and failed requests
+    """
+    latencies: List[float] = []
+    failures = 0
+    remaining = iter(range(total_requests))
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        nonlocal failures
+        for _ in remaining:
+            started_at = time.perf_counter()
+            async with session.get(url) as response:
+                await response.read()
+                if response.status != 200:
+                    failures += 1
+                    continue
+            latencies.append(time.perf_counter() - started_at)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        return time.perf_counter() - started_at, latencies, failures
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--query", default="city=manizales&limit=50")
+    args = parser.parse_args()
+
+    url = f"{args.url.rstrip('/')}{settings.API_V1_STR}/properties?{args.query}"
+    for concurrency in args.concurrency:
+        elapsed, latencies, failures = await run_level(url, concurrency, args.requests)
+        if not latencies:
+            print(f"{concurrency:>4} clients: every request failed")
+            continue
+        print(
+            f"{concurrency:>4} clients: {len(latencies) / elapsed:8.1f} req/s, "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+            f"p95 {percentile(latencies, 0.95) * 1000:7.1f} ms, "
+            f"{failures} failed"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark of the single-pass typology/price parser against the previous
+per-field regex searches (one uncompiled re.search per field).
+
+Usage:
+    python scripts/bench_listing_fields.py [--number N] [--repeat R]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+from typing import Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.scrapers.listing_fields import parse_price, parse_typology  # noqa: E402
+
+CARDS = [
+    ("3 Habs.2 Baños120 m²", "$ 450.000.000"),
+    ("1 Hab.1 Baño48 m²", "$ 320.500.000"),
+    ("5 Habs.4 Baños3500 m²", "$ 1.250.000.000"),
+    ("4 Habs.3 Baños", "$ 780.000.000"),
+    ("", "Precio a convenir"),
+]
+
+
+def legacy_extract_price(price_text: str) -> Optional[float]:
+    if not price_text:
+        return None
+    match = re.search(r"\$\s*([\d.,]+)", price_text)
+    if match:
+        try:
+            return float(match.group(1).replace(".", ""))
+        except (ValueError, TypeError):
+            return None
+    return None
+
+
+def legacy_extract_int(pattern: str, text: str) -> Optional[int]:
+    if not text:
+        return None
+    match = re.search(pattern, text)
+    if match:
+        try:
+            return int(match.group(1))
+        except (ValueError, TypeError):
+            pass
+    return None
+
+
+def legacy_extract_surface(text: str) -> tuple[Optional[float], Optional[str]]:
+    if not text:
+        return None, None
+    match = re.search(r"(\d+)\s*m²", text)
+    if match:
+        try:
+            return float(match.group(1)), "m²"
+        except (ValueError, TypeError):
+            pass
+    return None, None
+
+
+def legacy_card(typology_text: str, price_text: str) -> None:
+    legacy_extract_price(price_text)
+    legacy_extract_int(r"(\d+)\s*Habs?", typology_text)
+    legacy_extract_int(r"(\d+)\s*Baños", typology_text)
+    legacy_extract_surface(typology_text)
+
+
+def single_pass_card(typology_text: str, price_text: str) -> None:
+    parse_price(price_text)
+    parse_typology(typology_text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    extractors = {"per-field": legacy_card, "single-pass": single_pass_card}
+    results = {name: float("inf") for name in extractors}
+
+    # Interleave the runs so both implementations see the same machine noise
+    for _ in range(args.repeat):
+        for name, extract in extractors.items():
+            seconds = timeit.timeit(
+                lambda: [extract(*card) for card in CARDS], number=args.number
+            )
+            results[name] = min(results[name], seconds / (args.number * len(CARDS)))
+
+    for name, seconds in results.items():
+        print(f"{name:>11}: {seconds * 1e6:.2f} µs/card")
+
+    print(f"speedup: {results['per-field'] / results['single-pass']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
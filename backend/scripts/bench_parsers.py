@@ -0,0 +1,61 @@
+"""
+Benchmark the FincaRaiz parser backends against saved result pages.
+
+Usage:
+    python scripts/bench_parsers.py [saved_page.html ...] [--repeat N]
+
+Without arguments the page saved in tests/scrapers/fixtures is used.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.scrapers.fincaraiz import FincaRaizScraper  # noqa: E402
+
+DEFAULT_PAGES = [
+    Path(__file__).parent.parent
+    / "tests"
+    / "scrapers"
+    / "fixtures"
+    / "fincaraiz_results_page.html"
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pages", nargs="*", type=Path, default=DEFAULT_PAGES)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    # The fixture has a card without a listing URL on purpose, whose warning would
+    # otherwise be logged on every iteration
+    logging.getLogger("app.scrapers").setLevel(logging.ERROR)
+
+    pages = [page.read_text(encoding="utf-8") for page in args.pages]
+    scrapers = {
+        backend: FincaRaizScraper(parser=backend) for backend in ("bs4", "lxml")
+    }
+
+    def parse_all(scraper: FincaRaizScraper) -> None:
+        for html in pages:
+            scraper._parse_page_sync(html, "manizales", "caldas")
+
+    results = {}
+    for backend, scraper in scrapers.items():
+        seconds = min(
+            timeit.repeat(lambda: parse_all(scraper), number=args.repeat, repeat=3)
+        )
+        results[backend] = seconds / (args.repeat * len(pages))
+        print(f"{backend:>5}: {results[backend] * 1000:.3f} ms/page")
+
+    print(f"speedup: {results['bs4'] / results['lxml']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark the query shapes of the property listing API on a million-row table,
+without and with the trigram and composite filter indexes.
+
+The rows are generated in a scratch schema ("bench_filters") of the database of
+the application settings, in a copy of the properties table that starts with its
+primary key only. Each query shape is timed on it, the filter indexes of the
+Property model are created, and the shapes are timed again. The schema is dropped
+afterwards. Requires the pg_trgm extension (installed by the migrations).
+
+Usage:
+    python scripts/bench_property_filters.py [--rows 1000000] [--repeat 5] [--explain]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import Connection, text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.schema import CreateIndex  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.db.repositories.property_repository import _filtered_properties_query  # noqa: E402
+from app.models.property import Property  # noqa: E402
+
+SCHEMA = "bench_filters"
+
+FILTER_INDEXES = (
+    "ix_properties_city_trgm",
+    "ix_properties_region_trgm",
+    "ix_properties_property_type_trgm",
+    "ix_properties_created_at_price",
+    "ix_properties_rooms_bathrooms_price",
+)
+
+CITIES = (
+    "Bogotá", "Medellín", "Cali", "Barranquilla", "Cartagena", "Manizales", "Pereira",
+    "Armenia", "Bucaramanga", "Santa Marta", "Ibagué", "Villavicencio", "Pasto",
+    "Neiva", "Popayán", "Tunja", "Montería", "Sincelejo", "Valledupar", "Chinchiná",
+)
+REGIONS = (
+    "Cundinamarca", "Antioquia", "Valle del Cauca", "Atlántico", "Bolívar", "Caldas",
+    "Risaralda", "Quindío", "Santander", "Magdalena", "Tolima", "Meta",
+)
+PROPERTY_TYPES = (
+    "Casa", "Apartamento", "Finca", "Casa campestre", "Lote", "Local", "Oficina", "Bodega",
+)
+
+QUERY_SHAPES: Tuple[Tuple[str, Dict[str, Any]], ...] = (
+    ("newest", {}),
+    ("city", {"city": "manizales"}),
+    ("region + type", {"region": "caldas", "property_type": "finca"}),
+    ("price range", {"min_price": 300000000.0, "max_price": 320000000.0}),
+    ("max price", {"max_price": 400000000.0}),
+    ("rooms + baths + price", {"min_rooms": 5, "min_bathrooms": 3, "max_price": 600000000.0}),
+    ("city, page 10", {"city": "pereira", "skip": 180}),
+)
+
+
+def sql_array(values: Tuple[str, ...]) -> str:
+    return "ARRAY[" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + "]"
+
+
+def load_rows(connection: Connection, rows: int) -> None:
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    connection.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.properties "
+            "(LIKE public.properties INCLUDING DEFAULTS, PRIMARY KEY (id))"
+        )
+    )
+    connection.execute(
+        text(
+            f"""
+            INSERT INTO {SCHEMA}.properties (
+                id, url, title, price, rooms, bathrooms, surface, city, region,
+                property_type, created_at
+            )
+            SELECT
+                n,
+                'https://bench.invalid/' || n,
+                'Propiedad ' || n,
+                50000000 + (n * 7919 % 1000) * 1000000,
+                1 + n % 6,
+                1 + n % 4,
+                40 + n % 300,
+                ({sql_array(CITIES)})[1 + n % {len(CITIES)}],
+                ({sql_array(REGIONS)})[1 + n * 7 % {len(REGIONS)}],
+                ({sql_array(PROPERTY_TYPES)})[1 + n * 13 % {len(PROPERTY_TYPES)}],
+                now() - (n * 104729 % 525600) * interval '1 minute'
+            FROM generate_series(1, :rows) AS n
+            """
+        ),
+        {"rows": rows},
+    )
+    connection.execute(text(f"ANALYZE {SCHEMA}.properties"))
+
+
+def create_filter_indexes(connection: Connection) -> None:
+    for index in Property.__table__.indexes:
+        if index.name in FILTER_INDEXES:
+            # Unqualified, so it lands in the scratch schema, first on the search path
+            connection.execute(CreateIndex(index))
+    connection.execute(text(f"ANALYZE {SCHEMA}.properties"))
+
+
+def compiled(filters: Dict[str, Any]) -> str:
+    return str(
+        _filtered_properties_query(**filters).compile(
+            dialect=postgresql.dialect(paramstyle="named"),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def time_shapes(connection: Connection, repeat: int, explain: bool) -> List[float]:
+    timings = []
+    for name, filters in QUERY_SHAPES:
+        statement = text(compiled(filters))
+        durations = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            connection.execute(statement).fetchall()
+            durations.append(time.perf_counter() - started_at)
+        timings.append(statistics.median(durations))
+        if explain:
+            plan = connection.execute(text(f"EXPLAIN ANALYZE {compiled(filters)}")).scalars()
+            print(f"--- {name}\n" + "\n".join(plan))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--explain", action="store_true", help="Print the query plans")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        try:
+            started_at = time.perf_counter()
+            load_rows(connection, args.rows)
+            connection.commit()
+            print(f"Loaded {args.rows} rows in {time.perf_counter() - started_at:.1f} s")
+
+            # Session-wide, so the unqualified statements target the scratch table
+            connection.execute(text(f"SET search_path TO {SCHEMA}, public"))
+            before = time_shapes(connection, args.repeat, args.explain)
+
+            started_at = time.perf_counter()
+            create_filter_indexes(connection)
+            connection.commit()
+            print(f"Created indexes in {time.perf_counter() - started_at:.1f} s")
+
+            after = time_shapes(connection, args.repeat, args.explain)
+
+            for (name, _), without, with_indexes in zip(QUERY_SHAPES, before, after):
+                print(
+                    f"{name:>22}: {without * 1000:9.1f} ms -> {with_indexes * 1000:8.1f} ms "
+                    f"({without / with_indexes:.1f}x)"
+                )
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            connection.commit()
+
+
+if __name__ == "__main__":
+    main()
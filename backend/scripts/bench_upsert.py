@@ -0,0 +1,128 @@
+"""
+Benchmark the bulk upsert of PropertyRepository.save_properties_batch, and the COPY
+loader of bulk_load_properties, against the previous per-row ORM path (SELECT of
+existing URLs, then one create or update per property, committing every 50 rows).
+
+Each size is saved twice by each path: once into an empty table (inserts), then
+again with half of the prices changed (updates). Runs against the database of the
+application settings; benchmark rows use a dedicated URL prefix and are deleted
+afterwards.
+
+Usage:
+    python scripts/bench_upsert.py [--sizes 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.db import SessionLocal  # noqa: E402
+from app.db.repositories.property_repository import PropertyRepository  # noqa: E402
+from app.models.property import Property  # noqa: E402
+from app.schemas.property import PropertyCreate  # noqa: E402
+
+
+def legacy_property_fields(prop_data: PropertyCreate) -> Dict[str, Any]:
+    fields = prop_data.model_dump()
+    fields["url"] = str(fields["url"])
+    fields["image_urls"] = [str(url) for url in fields.get("image_urls") or []]
+    return fields
+
+
+def legacy_save_properties_batch(repo: PropertyRepository, properties: List[PropertyCreate]) -> None:
+    existing_properties = repo.check_existing_property_urls(
+        [str(prop.url) for prop in properties if prop.url]
+    )
+    for i, prop_data in enumerate(properties):
+        if str(prop_data.url) in existing_properties:
+            existing = existing_properties[str(prop_data.url)]
+            if repo.has_changed(existing, prop_data):
+                existing.details_fetched_at = None
+            for key, value in legacy_property_fields(prop_data).items():
+                setattr(existing, key, value)
+        else:
+            repo.db.add(Property(**legacy_property_fields(prop_data)))
+        if i > 0 and i % 50 == 0:
+            repo.db.commit()
+    repo.db.commit()
+
+
+def bulk_save_properties_batch(repo: PropertyRepository, properties: List[PropertyCreate]) -> None:
+    repo.save_properties_batch(properties)
+
+
+def copy_load_properties(repo: PropertyRepository, properties: List[PropertyCreate]) -> None:
+    repo.bulk_load_properties(properties)
+
+
+def make_properties(prefix: str, count: int, price_bump: float = 0) -> List[PropertyCreate]:
+    return [
+        PropertyCreate(
+            url=f"{prefix}/{index}",
+            title=f"Casa en Manizales - {100 + index % 50} m²",
+            price=450000000.0 + (price_bump if index % 2 else 0),
+            rooms=index % 5 + 1,
+            bathrooms=index % 3 + 1,
+            surface=100.0 + index % 50,
+            city="Manizales",
+            region="Caldas",
+            property_type="Casa",
+            image_urls=[f"{prefix}/{index}.jpg"],
+        )
+        for index in range(count)
+    ]
+
+
+def time_path(save: Callable, prefix: str, count: int) -> List[float]:
+    db = SessionLocal()
+    try:
+        repo = PropertyRepository(db)
+        timings = []
+        for price_bump in (0, 1000000.0):
+            properties = make_properties(prefix, count, price_bump)
+            started_at = time.perf_counter()
+            save(repo, properties)
+            timings.append(time.perf_counter() - started_at)
+        return timings
+    finally:
+        db.query(Property).filter(Property.url.startswith(prefix)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        results = {}
+        for name, save in (
+            ("orm", legacy_save_properties_batch),
+            ("upsert", bulk_save_properties_batch),
+            ("copy", copy_load_properties),
+        ):
+            prefix = f"https://bench.invalid/{uuid.uuid4().hex[:8]}"
+            results[name] = time_path(save, prefix, count)
+            insert_seconds, update_seconds = results[name]
+            print(
+                f"{count:>6} rows {name:>6}: insert {insert_seconds * 1000:8.1f} ms, "
+                f"update {update_seconds * 1000:8.1f} ms"
+            )
+
+        for name in ("upsert", "copy"):
+            print(
+                f"{count:>6} rows {name:>6} speedup: insert {results['orm'][0] / results[name][0]:.1f}x, "
+                f"update {results['orm'][1] / results[name][1]:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import pytest
+from assertpy import assert_that
+
+from app.core.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_render_should_output_counters_in_text_format_when_incremented(registry):
+    # Arrange
+    pages = registry.counter("pages_total", "Pages fetched", ["source", "status"])
+
+    # Act
+    pages.inc(source="fincaraiz", status="200")
+    pages.inc(2, source="fincaraiz", status="200")
+    pages.inc(source="fincaraiz", status="304")
+    output = registry.render()
+
+    # Assert
+    assert_that(output).is_equal_to(
+        "# HELP pages_total Pages fetched\n"
+        "# TYPE pages_total counter\n"
+        'pages_total{source="fincaraiz",status="200"} 3\n'
+        'pages_total{source="fincaraiz",status="304"} 1\n'
+    )
+
+
+def test_render_should_output_cumulative_buckets_when_histogram_observed(registry):
+    # Arrange
+    latency = registry.histogram("fetch_seconds", "Fetch time", buckets=(0.1, 1.0))
+
+    # Act
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(2)
+    output = registry.render()
+
+    # Assert
+    assert_that(output).contains(
+        'fetch_seconds_bucket{le="0.1"} 1\n',
+        'fetch_seconds_bucket{le="1"} 2\n',
+        'fetch_seconds_bucket{le="+Inf"} 3\n',
+        "fetch_seconds_sum 2.55\n",
+        "fetch_seconds_count 3\n",
+    )
+
+
+def test_time_should_observe_block_duration_when_block_raises(registry):
+    # Arrange
+    latency = registry.histogram("parse_seconds", "Parse time", ["source"])
+
+    # Act
+    with pytest.raises(RuntimeError):
+        with latency.time(source="fincaraiz"):
+            raise RuntimeError("parse failed")
+
+    # Assert
+    assert_that(latency.get_count(source="fincaraiz")).is_equal_to(1)
+
+
+def test_render_should_run_collectors_when_rendering(registry):
+    # Arrange
+    depth = registry.gauge("queue_depth", "Waiting jobs")
+    registry.add_collector(lambda: depth.set(7))
+
+    # Act
+    output = registry.render()
+
+    # Assert
+    assert_that(output).contains("queue_depth 7\n")
+
+
+def test_inc_should_raise_when_labels_do_not_match(registry):
+    # Arrange
+    pages = registry.counter("pages_total", "Pages fetched", ["source"])
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        pages.inc(status="200")
+
+
+def test_counter_should_raise_when_registered_twice(registry):
+    # Arrange
+    registry.counter("pages_total", "Pages fetched")
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        registry.counter("pages_total", "Pages fetched again")
@@ -1,28 +1,30 @@
 import pytest
-from unittest.mock import Mock, patch
-from sqlalchemy.orm import Session
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from assertpy import assert_that
 from app.core.usecases.property_usecases import PropertyUseCases
+from app.models.price_history import PriceHistory
 from app.models.property import Property
 
 @pytest.fixture
 def mock_db():
-    return Mock(spec=Session)
+    return Mock(spec=AsyncSession)
 
-def test_get_properties_should_return_filtered_properties_when_filters_are_provided(mock_db: Session):
+@pytest.mark.asyncio
+async def test_get_properties_should_return_filtered_properties_when_filters_are_provided(mock_db: AsyncSession):
     # Arrange
-    mock_property_repo = Mock()
+    mock_property_repo = AsyncMock()
     mock_property_repo.get_properties_with_filters.return_value = [
         Property(id=1, city="Madrid", region="Centro", price=300000),
         Property(id=2, city="Madrid", region="Centro", price=350000)
     ]
     
-    with patch('app.core.usecases.property_usecases.PropertyRepository', return_value=mock_property_repo):
+    with patch('app.core.usecases.property_usecases.AsyncPropertyRepository', return_value=mock_property_repo):
         usecase = PropertyUseCases(mock_db)
         
         # Act
-        result = usecase.get_properties(
+        result = await usecase.get_properties(
             city="Madrid",
             region="Centro",
             min_price=300000,
@@ -31,7 +33,7 @@ def test_get_properties_should_return_filtered_properties_when_filters_are_provi
         
         # Assert
         assert_that(result).is_length(2)
-        mock_property_repo.get_properties_with_filters.assert_called_once_with(
+        mock_property_repo.get_properties_with_filters.assert_awaited_once_with(
             city="Madrid",
             region="Centro",
             property_type=None,
@@ -43,23 +45,24 @@ def test_get_properties_should_return_filtered_properties_when_filters_are_provi
             limit=20
         )
 
-def test_get_properties_should_return_all_properties_when_no_filters_are_provided(mock_db: Session):
+@pytest.mark.asyncio
+async def test_get_properties_should_return_all_properties_when_no_filters_are_provided(mock_db: AsyncSession):
     # Arrange
-    mock_property_repo = Mock()
+    mock_property_repo = AsyncMock()
     mock_property_repo.get_properties_with_filters.return_value = [
         Property(id=1, city="Madrid", region="Centro", price=300000),
         Property(id=2, city="Barcelona", region="Eixample", price=400000)
     ]
     
-    with patch('app.core.usecases.property_usecases.PropertyRepository', return_value=mock_property_repo):
+    with patch('app.core.usecases.property_usecases.AsyncPropertyRepository', return_value=mock_property_repo):
         usecase = PropertyUseCases(mock_db)
         
         # Act
-        result = usecase.get_properties()
+        result = await usecase.get_properties()
         
         # Assert
         assert_that(result).is_length(2)
-        mock_property_repo.get_properties_with_filters.assert_called_once_with(
+        mock_property_repo.get_properties_with_filters.assert_awaited_once_with(
             city=None,
             region=None,
             property_type=None,
@@ -71,9 +74,10 @@ def test_get_properties_should_return_all_properties_when_no_filters_are_provide
             limit=20
         )
 
-def test_get_property_stats_should_return_correct_statistics(mock_db: Session):
+@pytest.mark.asyncio
+async def test_get_property_stats_should_return_correct_statistics(mock_db: AsyncSession):
     # Arrange
-    mock_property_repo = Mock()
+    mock_property_repo = AsyncMock()
     mock_property_repo.get_property_count.return_value = 100
     mock_property_repo.get_property_count_by_city.return_value = {
         "Madrid": 50,
@@ -86,11 +90,11 @@ def test_get_property_stats_should_return_correct_statistics(mock_db: Session):
         "Valencia": 200000
     }
     
-    with patch('app.core.usecases.property_usecases.PropertyRepository', return_value=mock_property_repo):
+    with patch('app.core.usecases.property_usecases.AsyncPropertyRepository', return_value=mock_property_repo):
         usecase = PropertyUseCases(mock_db)
         
         # Act
-        result = usecase.get_property_stats()
+        result = await usecase.get_property_stats()
         
         # Assert
         assert_that(result["total_properties"]).is_equal_to(100)
@@ -104,6 +108,49 @@ def test_get_property_stats_should_return_correct_statistics(mock_db: Session):
             "Barcelona": 400000,
             "Valencia": 200000
         })
-        mock_property_repo.get_property_count.assert_called_once()
-        mock_property_repo.get_property_count_by_city.assert_called_once()
-        mock_property_repo.get_avg_price_by_city.assert_called_once() 
\ No newline at end of file
+        mock_property_repo.get_property_count.assert_awaited_once()
+        mock_property_repo.get_property_count_by_city.assert_awaited_once()
+        mock_property_repo.get_avg_price_by_city.assert_awaited_once() 
+
+@pytest.mark.asyncio
+async def test_get_price_history_should_return_every_requested_property_when_some_have_no_history(mock_db: AsyncSession):
+    # Arrange
+    mock_price_history_repo = AsyncMock()
+    change = PriceHistory(property_id=1, price=300000, previous_price=None)
+    mock_price_history_repo.get_price_history.return_value = {1: [change]}
+
+    with patch('app.core.usecases.property_usecases.AsyncPriceHistoryRepository', return_value=mock_price_history_repo):
+        usecase = PropertyUseCases(mock_db)
+
+        # Act
+        result = await usecase.get_price_history([1, 2, 1])
+
+        # Assert
+        assert_that(result).is_equal_to([
+            {"property_id": 1, "prices": [change]},
+            {"property_id": 2, "prices": []}
+        ])
+        mock_price_history_repo.get_price_history.assert_awaited_once_with([1, 2, 1], since=None)
+
+@pytest.mark.asyncio
+async def test_get_recent_price_drops_should_compute_drop_percent_when_drops_are_found(mock_db: AsyncSession):
+    # Arrange
+    mock_price_history_repo = AsyncMock()
+    property_obj = Property(id=1, city="Manizales", region="Caldas", price=270000)
+    change = PriceHistory(property_id=1, price=270000, previous_price=300000)
+    mock_price_history_repo.get_recent_price_drops.return_value = [(property_obj, change)]
+
+    with patch('app.core.usecases.property_usecases.AsyncPriceHistoryRepository', return_value=mock_price_history_repo):
+        usecase = PropertyUseCases(mock_db)
+
+        # Act
+        result = await usecase.get_recent_price_drops(region="Caldas", days=3)
+
+        # Assert
+        assert_that(result).is_length(1)
+        assert_that(result[0]).contains_entry(
+            {"property": property_obj}, {"previous_price": 300000}, {"drop_percent": 10.0}
+        )
+        call = mock_price_history_repo.get_recent_price_drops.call_args
+        assert_that(call.kwargs).is_equal_to({"region": "Caldas", "city": None, "limit": 50})
+
@@ -4,7 +4,10 @@ from sqlalchemy.orm import Session
 from unittest.mock import create_autospec
 from typing import Callable
 
-from app.core.usecases.scraper_usecases import ScraperUseCases
+from app.core.config import settings
+from app.core.usecases.scraper_usecases import ScraperUseCases, request_dedup_key
+from app.db.repositories.task_repository import TaskRepository
+from app.models.task import Task
 
 
 @pytest.fixture
@@ -21,7 +24,18 @@ def scraper_usecases(mock_db):
 
 @pytest.fixture
 def mock_scrape_properties(monkeypatch):
-    async def mock_async(city, region, property_type, max_pages, db, task_id):
+    async def mock_async(
+        city,
+        region,
+        property_type,
+        max_pages,
+        db,
+        task_id,
+        incremental=False,
+        stop_after_unchanged_pages=2,
+        enrich_details=False,
+        sources=None,
+    ):
         return task_id
 
     mock = create_autospec(mock_async, spec_set=True)
@@ -30,6 +44,31 @@ def mock_scrape_properties(monkeypatch):
     return mock
 
 
+@pytest.fixture
+def mock_scrape_properties_fan_out(monkeypatch):
+    async def mock_async(
+        city,
+        region,
+        property_types,
+        max_pages,
+        db,
+        task_id,
+        incremental=False,
+        stop_after_unchanged_pages=2,
+        enrich_details=False,
+        sources=None,
+        shard_pages=None,
+    ):
+        return task_id
+
+    mock = create_autospec(mock_async, spec_set=True)
+    mock.return_value = "parent_task_id"
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.scrape_properties_fan_out", mock
+    )
+    return mock
+
+
 @pytest.mark.asyncio
 async def test_start_scraper_should_return_task_id_and_message_when_scraping_job_starts(
     scraper_usecases: ScraperUseCases,
@@ -83,3 +122,308 @@ async def test_start_scraper_should_call_scrape_properties_with_correct_paramete
             "db": mock_db,
         }
     ).is_subset_of(call_args)
+
+
+@pytest.mark.asyncio
+async def test_start_scraper_should_pass_incremental_options_when_incremental_mode_is_requested(
+    scraper_usecases: ScraperUseCases,
+    mock_scrape_properties: Callable,
+):
+    # Act
+    await scraper_usecases.start_scraper(
+        city="Manizales",
+        region="Caldas",
+        property_types=["casas"],
+        max_pages=10,
+        incremental=True,
+        stop_after_unchanged_pages=3,
+    )
+
+    # Assert
+    call_args = mock_scrape_properties.call_args[1]
+    assert_that(call_args).contains_entry(
+        {"incremental": True}, {"stop_after_unchanged_pages": 3}
+    )
+
+
+@pytest.mark.asyncio
+async def test_start_scraper_should_fan_out_property_types_when_fan_out_is_requested(
+    scraper_usecases: ScraperUseCases,
+    mock_scrape_properties: Callable,
+    mock_scrape_properties_fan_out: Callable,
+):
+    # Act
+    result = await scraper_usecases.start_scraper(
+        city="Manizales",
+        region="Caldas",
+        property_types=["casas", "fincas"],
+        max_pages=10,
+        fan_out=True,
+    )
+
+    # Assert
+    assert_that(result["task_id"]).is_equal_to("parent_task_id")
+    call_args = mock_scrape_properties_fan_out.call_args[1]
+    assert_that(call_args).contains_entry({"property_types": ["casas", "fincas"]})
+    mock_scrape_properties.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_start_scraper_should_run_single_task_when_fan_out_has_nothing_to_split(
+    scraper_usecases: ScraperUseCases,
+    mock_scrape_properties: Callable,
+    mock_scrape_properties_fan_out: Callable,
+):
+    # Act
+    await scraper_usecases.start_scraper(
+        city="Manizales",
+        region="Caldas",
+        property_types=["casas"],
+        max_pages=5,
+        fan_out=True,
+    )
+
+    # Assert
+    mock_scrape_properties.assert_called_once()
+    mock_scrape_properties_fan_out.assert_not_called()
+
+
+def test_queue_scraper_should_store_pending_task_with_request_options_when_job_is_queued(
+    scraper_usecases: ScraperUseCases, monkeypatch
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.create_or_attach_task.side_effect = lambda task_data: (
+        Task(id=task_data["id"]),
+        False,
+    )
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+
+    # Act
+    task_id, coalesced = scraper_usecases.queue_scraper(
+        city="Manizales",
+        region="Caldas",
+        property_types=["casas", "fincas"],
+        max_pages=10,
+        priority=3,
+        fan_out=True,
+    )
+
+    # Assert
+    assert_that(coalesced).is_false()
+    task_data = task_repo.create_or_attach_task.call_args[0][0]
+    assert_that(task_data).contains_entry(
+        {"id": task_id}, {"status": "pending"}, {"priority": 3}
+    )
+    assert_that(task_data["cmetadata"]["request"]).contains_entry(
+        {"property_types": ["casas", "fincas"]}, {"fan_out": True}
+    )
+
+
+@pytest.mark.asyncio
+async def test_start_scraper_should_store_profile_with_task_when_profiling_is_requested(
+    scraper_usecases: ScraperUseCases,
+    mock_scrape_properties: Callable,
+    monkeypatch,
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+
+    # Act
+    await scraper_usecases.start_scraper(
+        city="Manizales",
+        region="Caldas",
+        property_types=["casas"],
+        max_pages=1,
+        profile=True,
+        task_id="task0010",
+    )
+
+    # Assert
+    mock_scrape_properties.assert_called_once()
+    task_id, profile, metadata = task_repo.save_profile.call_args[0]
+    assert_that(task_id).is_equal_to("task0010")
+    assert_that(profile).is_instance_of(str)
+    assert_that(metadata["profile"]).contains_key("samples", "interval_seconds")
+
+
+def test_queue_scraper_should_attach_to_in_flight_task_when_identical_request_is_queued(
+    scraper_usecases: ScraperUseCases, monkeypatch
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.create_or_attach_task.return_value = (Task(id="task0009"), True)
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+
+    # Act
+    queued = scraper_usecases.queue_scraper(
+        city="Manizales", region="Caldas", property_types=["casas"], max_pages=5
+    )
+
+    # Assert
+    assert_that(queued).is_equal_to(("task0009", True))
+
+
+def test_queue_scraper_should_skip_capacity_check_when_identical_request_is_in_flight(
+    scraper_usecases: ScraperUseCases, monkeypatch
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.get_in_flight_task.return_value = Task(id="task0009")
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+    check_capacity = create_autospec(lambda: None)
+
+    # Act
+    queued = scraper_usecases.queue_scraper(
+        city="Manizales",
+        region="Caldas",
+        property_types=["casas"],
+        max_pages=5,
+        check_capacity=check_capacity,
+    )
+
+    # Assert
+    assert_that(queued).is_equal_to(("task0009", True))
+    check_capacity.assert_not_called()
+    task_repo.create_or_attach_task.assert_not_called()
+
+
+def test_queue_scraper_should_not_create_task_when_capacity_check_rejects_request(
+    scraper_usecases: ScraperUseCases, monkeypatch
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.get_in_flight_task.return_value = None
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+    check_capacity = create_autospec(lambda: None)
+    check_capacity.side_effect = RuntimeError("queue full")
+
+    # Act
+    with pytest.raises(RuntimeError):
+        scraper_usecases.queue_scraper(
+            city="Manizales",
+            region="Caldas",
+            property_types=["casas"],
+            max_pages=5,
+            check_capacity=check_capacity,
+        )
+
+    # Assert
+    task_repo.create_or_attach_task.assert_not_called()
+
+
+def test_queue_scraper_should_record_owning_process_when_worker_pool_runs_tasks(
+    scraper_usecases: ScraperUseCases, monkeypatch
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.create_or_attach_task.side_effect = lambda task_data: (
+        Task(id=task_data["id"]),
+        False,
+    )
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+    monkeypatch.setattr(settings, "SCRAPER_QUEUE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "SCRAPER_INSTANCE_ID", "api-host-1")
+
+    # Act
+    scraper_usecases.queue_scraper(
+        city="Manizales", region="Caldas", property_types=["casas"], max_pages=5
+    )
+    scraper_usecases.resume_scraper("task0012")
+
+    # Assert
+    task_data = task_repo.create_or_attach_task.call_args[0][0]
+    assert_that(task_data).contains_entry({"lease_owner": "api-host-1"})
+    task_repo.requeue_task.assert_called_once_with("task0012", owner="api-host-1")
+
+
+def test_request_dedup_key_should_match_when_requests_differ_only_in_case_and_order():
+    # Act
+    key = request_dedup_key(
+        "Manizales", "Caldas", ["fincas", "casas"], max_pages=5, sources=["b", "a"]
+    )
+    same_key = request_dedup_key(
+        "manizales", "caldas ", ["casas", "fincas"], max_pages=5, sources=["a", "b"]
+    )
+    other_key = request_dedup_key(
+        "manizales", "caldas", ["casas", "fincas"], max_pages=6, sources=["a", "b"]
+    )
+
+    # Assert
+    assert_that(key).is_equal_to(same_key)
+    assert_that(key).is_not_equal_to(other_key)
+
+
+@pytest.mark.asyncio
+async def test_run_queued_task_should_start_scraper_with_stored_options_when_task_exists(
+    scraper_usecases: ScraperUseCases,
+    mock_scrape_properties_fan_out: Callable,
+    monkeypatch,
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.get_task.return_value = Task(
+        id="task0001",
+        city="Manizales",
+        region="Caldas",
+        property_type="casas-y-fincas",
+        max_pages=10,
+        cmetadata={
+            "sources": ["fincaraiz"],
+            "request": {"property_types": ["casas", "fincas"], "fan_out": True},
+        },
+    )
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+
+    # Act
+    await scraper_usecases.run_queued_task("task0001")
+
+    # Assert
+    call_args = mock_scrape_properties_fan_out.call_args[1]
+    assert_that(call_args).contains_entry(
+        {"task_id": "task0001"},
+        {"property_types": ["casas", "fincas"]},
+        {"sources": ["fincaraiz"]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_queued_task_should_skip_task_when_it_was_cancelled_while_queued(
+    scraper_usecases: ScraperUseCases,
+    mock_scrape_properties: Callable,
+    monkeypatch,
+):
+    # Arrange
+    task_repo = create_autospec(TaskRepository, instance=True)
+    task_repo.get_task.return_value = Task(
+        id="task0002",
+        city="Manizales",
+        region="Caldas",
+        property_type="casas",
+        max_pages=10,
+        status="cancelled",
+    )
+    monkeypatch.setattr(
+        "app.core.usecases.scraper_usecases.TaskRepository", lambda db: task_repo
+    )
+
+    # Act
+    await scraper_usecases.run_queued_task("task0002")
+
+    # Assert
+    mock_scrape_properties.assert_not_called()
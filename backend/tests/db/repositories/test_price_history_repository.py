@@ -0,0 +1,59 @@
+from unittest.mock import create_autospec
+
+import pytest
+
+from assertpy import assert_that
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.repositories.price_history_repository import AsyncPriceHistoryRepository
+from app.models.price_history import PriceHistory
+
+
+def test_price_drop_index_should_match_the_recent_drops_filter():
+    # Arrange
+    index = next(
+        index
+        for index in PriceHistory.__table__.indexes
+        if index.name == "ix_price_history_drops_observed_at"
+    )
+
+    # Act
+    predicate = str(
+        index.dialect_options["postgresql"]["where"].compile(dialect=postgresql.dialect())
+    )
+
+    # Assert
+    assert_that(predicate).is_equal_to("price < previous_price")
+    assert_that([column.name for column in index.columns]).is_equal_to(["observed_at"])
+
+
+@pytest.mark.asyncio
+async def test_get_price_history_should_group_changes_by_property_when_several_are_requested():
+    # Arrange
+    db = create_autospec(AsyncSession, instance=True)
+    changes = [
+        PriceHistory(property_id=3, price=500000.0),
+        PriceHistory(property_id=3, price=450000.0, previous_price=500000.0),
+    ]
+    db.scalars.return_value = iter(changes)
+
+    # Act
+    history = await AsyncPriceHistoryRepository(db).get_price_history([3, 4])
+
+    # Assert
+    assert_that(history).is_equal_to({3: changes})
+    db.scalars.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_price_history_should_not_query_when_no_property_is_requested():
+    # Arrange
+    db = create_autospec(AsyncSession, instance=True)
+
+    # Act
+    history = await AsyncPriceHistoryRepository(db).get_price_history([])
+
+    # Assert
+    assert_that(history).is_empty()
+    db.scalars.assert_not_called()
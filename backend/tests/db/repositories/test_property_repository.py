@@ -0,0 +1,308 @@
+from collections import namedtuple
+from unittest.mock import MagicMock, create_autospec
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.repositories.property_repository import (
+    AsyncPropertyRepository,
+    PropertyRepository,
+    UpsertResult,
+    _CopyStream,
+    _staged_lines,
+    content_hash,
+    property_rows,
+)
+from app.models.property import Property
+from app.schemas.property import PropertyCreate
+
+URL = "https://www.fincaraiz.com.co/casa/1001"
+IMAGE_URL = "https://img.fincaraiz.com.co/casa-1.jpg"
+
+
+@pytest.fixture
+def stored_property() -> Property:
+    return Property(
+        url=URL,
+        title="Casa en Manizales - 120.0 m²",
+        price=450000000.0,
+        rooms=3,
+        bathrooms=2,
+        surface=120.0,
+        surface_unit="m²",
+        city="Manizales",
+        region="Caldas",
+        property_type="Casa",
+        image_urls=[IMAGE_URL],
+    )
+
+
+@pytest.fixture
+def scraped_property() -> PropertyCreate:
+    return PropertyCreate(
+        url=URL,
+        title="Casa en Manizales - 120.0 m²",
+        price=450000000.0,
+        rooms=3,
+        bathrooms=2,
+        surface=120.0,
+        surface_unit="m²",
+        city="Manizales",
+        region="Caldas",
+        property_type="Casa",
+        image_urls=[IMAGE_URL],
+    )
+
+
+def test_has_changed_should_return_false_when_scraped_values_match_stored_ones(
+    stored_property: Property, scraped_property: PropertyCreate
+):
+    # Act
+    result = PropertyRepository.has_changed(stored_property, scraped_property)
+
+    # Assert
+    assert_that(result).is_false()
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [("price", 430000000.0), ("rooms", 4), ("image_urls", [])],
+)
+def test_has_changed_should_return_true_when_a_scraped_value_differs(
+    stored_property: Property, scraped_property: PropertyCreate, field, value
+):
+    # Arrange
+    scraped_property = scraped_property.model_copy(update={field: value})
+
+    # Act
+    result = PropertyRepository.has_changed(stored_property, scraped_property)
+
+    # Assert
+    assert_that(result).is_true()
+
+
+def test_property_rows_should_keep_last_property_when_urls_repeat(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    repriced = scraped_property.model_copy(update={"price": 430000000.0})
+
+    # Act
+    rows = property_rows([scraped_property, repriced])
+
+    # Assert
+    assert_that(rows).is_length(1)
+    assert_that(rows[0]).contains_entry(
+        {"url": URL}, {"price": 430000000.0}, {"image_urls": [IMAGE_URL]}
+    )
+
+
+def test_property_rows_should_sort_rows_by_url_when_properties_are_unordered(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    properties = [
+        PropertyCreate(
+            **{**scraped_property.model_dump(), "url": f"https://www.fincaraiz.com.co/inmueble/{code}"}
+        )
+        for code in ("300", "100", "200")
+    ]
+
+    # Act
+    rows = property_rows(properties)
+
+    # Assert
+    assert_that([row["url"] for row in rows]).is_sorted()
+
+
+def test_property_rows_should_truncate_strings_and_skip_base_url_when_building_rows(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    long_title = scraped_property.model_copy(update={"title": "Casa " * 100})
+    base_page = PropertyCreate(url="https://www.fincaraiz.com.co/")
+
+    # Act
+    rows = property_rows(
+        [long_title, base_page], base_url="https://www.fincaraiz.com.co"
+    )
+
+    # Assert
+    assert_that(rows).is_length(1)
+    assert_that(rows[0]["title"]).is_length(255).ends_with("...")
+
+
+def test_upsert_properties_should_count_inserted_and_updated_rows_when_page_is_saved(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    db = create_autospec(Session, instance=True)
+    Row = namedtuple("Row", ["inserted"])
+    db.execute.return_value = [Row(True), Row(False), Row(True)]
+    properties = [
+        PropertyCreate(**{**scraped_property.model_dump(), "url": f"{URL}{index}"})
+        for index in range(3)
+    ]
+
+    # Act
+    result = PropertyRepository(db).upsert_properties(properties)
+
+    # Assert
+    assert_that(result).is_equal_to(UpsertResult(inserted=2, updated=1, unchanged=0))
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert_that(sql).contains(
+        "ON CONFLICT (url) DO UPDATE",
+        "WHERE properties.content_hash IS DISTINCT FROM excluded.content_hash",
+        "RETURNING (xmax = 0) AS inserted",
+    )
+
+
+def test_upsert_properties_should_count_unchanged_rows_when_they_are_not_written(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    db = create_autospec(Session, instance=True)
+    Row = namedtuple("Row", ["inserted"])
+    db.execute.return_value = [Row(False)]
+    properties = [
+        PropertyCreate(**{**scraped_property.model_dump(), "url": f"{URL}{index}"})
+        for index in range(3)
+    ]
+
+    # Act
+    result = PropertyRepository(db).upsert_properties(properties)
+
+    # Assert
+    assert_that(result).is_equal_to(UpsertResult(inserted=0, updated=1, unchanged=2))
+
+
+def test_content_hash_should_change_only_when_a_scraped_value_changes(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    row = property_rows([scraped_property])[0]
+    same = property_rows([scraped_property.model_copy()])[0]
+    repriced = property_rows([scraped_property.model_copy(update={"price": 1.0})])[0]
+
+    # Assert
+    assert_that(row["content_hash"]).is_length(64)
+    assert_that(same["content_hash"]).is_equal_to(row["content_hash"])
+    assert_that(repriced["content_hash"]).is_not_equal_to(row["content_hash"])
+
+
+def test_find_new_or_changed_properties_should_compare_content_hashes_when_stored(
+    stored_property: Property, scraped_property: PropertyCreate
+):
+    # Arrange
+    db = create_autospec(Session, instance=True)
+    repository = PropertyRepository(db)
+    stored_property.content_hash = content_hash(property_rows([scraped_property])[0])
+    # The hash, not the stored columns, tells whether the listing changed
+    stored_property.price = 1.0
+    repository.check_existing_property_urls = lambda urls: {URL: stored_property}
+    new_listing = PropertyCreate(url=f"{URL}2")
+
+    # Act
+    result = repository.find_new_or_changed_properties([scraped_property, new_listing])
+
+    # Assert
+    assert_that(result).is_equal_to([new_listing])
+
+
+def test_upsert_properties_should_roll_back_and_raise_when_statement_fails(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    db = create_autospec(Session, instance=True)
+    db.execute.side_effect = RuntimeError("connection lost")
+
+    # Act / Assert
+    with pytest.raises(RuntimeError):
+        PropertyRepository(db).upsert_properties([scraped_property])
+    db.rollback.assert_called_once()
+    db.commit.assert_not_called()
+
+
+def test_staged_lines_should_write_nulls_unquoted_and_quote_strings_when_building_copy_input():
+    # Arrange
+    prop = PropertyCreate(
+        url=URL, title='Casa "La Estrella"', price=450000000.0, image_urls=[IMAGE_URL]
+    )
+
+    # Act
+    lines = list(_staged_lines([prop], None))
+
+    # Assert
+    assert_that(lines).is_length(1)
+    assert_that(lines[0]).starts_with(
+        f'0,"{URL}","Casa ""La Estrella""",450000000.0,,,,"m²",,,,'
+        f'"[""{IMAGE_URL}""]","'
+    )
+
+
+def test_copy_stream_should_return_requested_sizes_until_lines_run_out():
+    # Arrange
+    stream = _CopyStream(iter(["abc\n", "defg\n"]))
+
+    # Act
+    chunks = [stream.read(3), stream.read(3), stream.read(8192), stream.read(8192)]
+
+    # Assert
+    assert_that(chunks).is_equal_to(["abc", "\nde", "fg\n", ""])
+
+
+def test_bulk_load_properties_should_copy_rows_and_merge_them_in_one_transaction(
+    scraped_property: PropertyCreate,
+):
+    # Arrange
+    db = create_autospec(Session, instance=True)
+    connection = MagicMock()
+    db.connection.return_value = connection
+    db.execute.return_value.one.return_value = (1, 0, 2)
+    cursor = connection.connection.cursor.return_value
+    copied = []
+    cursor.copy_expert.side_effect = lambda sql, stream: copied.append(stream.read())
+    properties = iter([scraped_property, PropertyCreate(url=f"{URL}2")])
+
+    # Act
+    result = PropertyRepository(db).bulk_load_properties(properties)
+
+    # Assert
+    assert_that(result).is_equal_to(UpsertResult(inserted=1, updated=0, unchanged=1))
+    assert_that(cursor.copy_expert.call_args[0][0]).starts_with(
+        "COPY properties_staging (seq, url, title"
+    )
+    assert_that(copied[0].splitlines()).is_length(2)
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert_that(sql).contains(
+        "SELECT DISTINCT ON (properties_staging.url)", "ON CONFLICT (url) DO UPDATE"
+    )
+    db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_properties_with_filters_should_await_filtered_query_when_session_is_async(
+    stored_property: Property,
+):
+    # Arrange
+    db = create_autospec(AsyncSession, instance=True)
+    db.scalars.return_value = iter([stored_property])
+
+    # Act
+    properties = await AsyncPropertyRepository(db).get_properties_with_filters(
+        city="Manizales", min_rooms=3, skip=20
+    )
+
+    # Assert
+    assert_that(properties).is_equal_to([stored_property])
+    sql = str(db.scalars.await_args[0][0].compile(dialect=postgresql.dialect()))
+    assert_that(sql).contains(
+        "properties.city ILIKE %(city_1)s",
+        "properties.rooms >= %(rooms_1)s",
+        "ORDER BY properties.created_at DESC",
+    )
@@ -0,0 +1,57 @@
+from unittest.mock import create_autospec
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.repositories.task_repository import AsyncTaskRepository, TaskRepository
+from app.models.task import Task
+
+
+@pytest.mark.asyncio
+async def test_get_task_should_await_session_lookup_when_session_is_async():
+    # Arrange
+    db = create_autospec(AsyncSession, instance=True)
+    task = Task(id="abc12345", city="manizales", region="caldas", status="running")
+    db.get.return_value = task
+
+    # Act
+    result = await AsyncTaskRepository(db).get_task("abc12345")
+
+    # Assert
+    assert_that(result).is_same_as(task)
+    db.get.assert_awaited_once_with(Task, "abc12345")
+
+
+@pytest.mark.asyncio
+async def test_count_pending_tasks_should_only_count_top_level_tasks_when_session_is_async():
+    # Arrange
+    db = create_autospec(AsyncSession, instance=True)
+    db.scalar.return_value = 4
+
+    # Act
+    count = await AsyncTaskRepository(db).count_pending_tasks()
+
+    # Assert
+    assert_that(count).is_equal_to(4)
+    sql = str(db.scalar.await_args[0][0].compile(dialect=postgresql.dialect()))
+    assert_that(sql).contains("tasks.status = %(status_1)s", "tasks.parent_id IS NULL")
+
+
+def test_fail_owned_tasks_should_only_fail_tasks_of_owner_when_process_restarts():
+    # Arrange
+    db = create_autospec(Session, instance=True)
+    db.execute.return_value.rowcount = 2
+
+    # Act
+    failed = TaskRepository(db).fail_owned_tasks("api-host-1", "Interrupted")
+
+    # Assert
+    assert_that(failed).is_equal_to(2)
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert_that(sql).contains(
+        "tasks.lease_owner = %(lease_owner_1)s OR tasks.parent_id IN (SELECT tasks.id"
+    )
+    db.commit.assert_called_once()
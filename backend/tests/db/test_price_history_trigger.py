@@ -0,0 +1,74 @@
+"""
+Checks of the trigger appending to the price history. They need a PostgreSQL
+database migrated to the latest revision, given by TEST_DATABASE_URL, and are
+skipped otherwise. Rows are added in a transaction that is rolled back.
+"""
+
+import os
+from typing import Iterator, List, Tuple
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.repositories.property_repository import PropertyRepository
+from app.models.price_history import PriceHistory
+from app.models.property import Property
+from app.schemas.property import PropertyCreate
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+URL = "https://trigger.invalid/casa-1"
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        # Commits of the repository release savepoints, the outer transaction is
+        # rolled back
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        yield session
+        session.close()
+        transaction.rollback()
+    engine.dispose()
+
+
+def price_history(db: Session) -> List[Tuple[float, float]]:
+    return [
+        (row.price, row.previous_price)
+        for row in db.scalars(
+            select(PriceHistory)
+            .join(Property, Property.id == PriceHistory.property_id)
+            .where(Property.url == URL)
+            .order_by(PriceHistory.id)
+        )
+    ]
+
+
+def test_record_price_change_should_append_one_row_when_only_price_change_is_upserted(db: Session):
+    # Arrange
+    repo = PropertyRepository(db)
+    repo.upsert_properties([PropertyCreate(url=URL, title="Casa", price=300000000.0)])
+
+    # Act
+    # Same price with another title, so the row is updated but its price is not
+    unchanged_price = repo.upsert_properties(
+        [PropertyCreate(url=URL, title="Casa con jardín", price=300000000.0)]
+    )
+    changed_price = repo.upsert_properties(
+        [PropertyCreate(url=URL, title="Casa con jardín", price=280000000.0)]
+    )
+
+    # Assert
+    assert_that(unchanged_price.updated).is_equal_to(1)
+    assert_that(changed_price.updated).is_equal_to(1)
+    assert_that(price_history(db)).is_equal_to(
+        [(300000000.0, None), (280000000.0, 300000000.0)]
+    )
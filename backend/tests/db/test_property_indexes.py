@@ -0,0 +1,94 @@
+"""
+EXPLAIN checks of the property listing filters. They need a PostgreSQL database
+migrated to the latest revision, given by TEST_DATABASE_URL, and are skipped
+otherwise. Rows are added in a transaction that is rolled back.
+"""
+
+import os
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy import Connection, create_engine, insert, text
+from sqlalchemy.dialects import postgresql
+
+from app.db.repositories.property_repository import _filtered_properties_query
+from app.models.property import Property
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+ROWS = 20000
+# Values given to a few rows only, so filtering on them is selective
+RARE_EVERY = 1000
+RARE_CITY = "Zapatoca"
+RARE_REGION = "Santander"
+RARE_PROPERTY_TYPE = "Glamping"
+RARE_ROOMS = 9
+
+
+def property_rows() -> List[Dict[str, Any]]:
+    rows = []
+    for index in range(ROWS):
+        rare = index % RARE_EVERY == 0
+        rows.append(
+            {
+                "url": f"https://explain.invalid/{index}",
+                "title": f"Casa {index}",
+                "price": 100000000.0 + index % 500 * 1000000,
+                "rooms": RARE_ROOMS if rare else index % 5 + 1,
+                "bathrooms": index % 3 + 1,
+                "city": RARE_CITY if rare else f"Ciudad {index % 40}",
+                "region": RARE_REGION if rare else f"Departamento {index % 20}",
+                "property_type": RARE_PROPERTY_TYPE if rare else "Casa",
+            }
+        )
+    return rows
+
+
+@pytest.fixture(scope="module")
+def connection() -> Iterator[Connection]:
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        connection.execute(insert(Property.__table__), property_rows())
+        connection.execute(text("ANALYZE properties"))
+        # Plans on a small table favour sequential scans; ruling them out shows
+        # which index the planner can use for each filter
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        yield connection
+        transaction.rollback()
+    engine.dispose()
+
+
+def explain(connection: Connection, **filters) -> str:
+    # Rendered with the "named" style so text() is the only one escaping "%"
+    statement = _filtered_properties_query(**filters).compile(
+        dialect=postgresql.dialect(paramstyle="named"),
+        compile_kwargs={"literal_binds": True},
+    )
+    return "\n".join(connection.execute(text(f"EXPLAIN {statement}")).scalars())
+
+
+@pytest.mark.parametrize(
+    "filters, index_name",
+    [
+        ({"city": RARE_CITY.lower()}, "ix_properties_city_trgm"),
+        ({"region": RARE_REGION[1:6]}, "ix_properties_region_trgm"),
+        ({"property_type": RARE_PROPERTY_TYPE.lower()}, "ix_properties_property_type_trgm"),
+        ({}, "ix_properties_created_at_price"),
+        ({"max_price": 300000000.0}, "ix_properties_created_at_price"),
+        ({"min_rooms": RARE_ROOMS}, "ix_properties_rooms_bathrooms_price"),
+    ],
+)
+def test_filtered_properties_query_should_use_index_when_filtering(
+    connection: Connection, filters: Dict[str, Any], index_name: str
+):
+    # Act
+    plan = explain(connection, **filters)
+
+    # Assert
+    assert_that(plan).contains(index_name)
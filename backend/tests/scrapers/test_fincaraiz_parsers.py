@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from app.scrapers.fincaraiz import FincaRaizScraper
+from app.scrapers.fincaraiz_parsers import (
+    extract_cards_bs4,
+    extract_cards_lxml,
+    extract_detail_fields,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+TRICKY_CARDS = """
+<html><body>
+  <div class="listingCard">
+    <!-- $ 1.000 promo -->
+    <a class="other" href="/not-this-one">x</a>
+    <a class="lc-data extra" href="/casa/2001"><span class="lc-title">  Casa <b>grande</b> en Chinchiná </span></a>
+    <div class="lc-typologyTag">
+      <span>2 Habs.</span><script>var p = "9 Habs.";</script><span> 1 Baños </span>
+    </div>
+    <p>Desde $ 210.000.000 hasta $ 250.000.000</p>
+  </div>
+  <div class="card listingCard">
+    <a class="lc-data">sin href</a>
+    <div class="lc-typologyTag"></div>
+  </div>
+  <div class="listingCard">
+    <a class="lc-data" href="">vacío</a>
+    <img class="card-image-gallery--img">
+    <img class="card-image-gallery--img" src="">
+    <img class="card-image-gallery--img lazy" src="/media/3.jpg">
+  </div>
+</body></html>
+"""
+
+
+@pytest.fixture
+def results_page_html() -> str:
+    return (FIXTURES_DIR / "fincaraiz_results_page.html").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("html_name", ["fixture", "tricky"])
+def test_extract_cards_lxml_should_match_bs4_when_parsing_the_same_page(
+    results_page_html: str, html_name: str
+):
+    # Arrange
+    html = results_page_html if html_name == "fixture" else TRICKY_CARDS
+
+    # Act
+    lxml_cards = extract_cards_lxml(html)
+    bs4_cards = extract_cards_bs4(html)
+
+    # Assert
+    assert_that(lxml_cards).is_not_empty()
+    assert_that(lxml_cards).is_equal_to(bs4_cards)
+
+
+def test_parse_page_should_return_identical_listings_when_using_either_backend(
+    results_page_html: str,
+):
+    # Arrange
+    bs4_scraper = FincaRaizScraper(parser="bs4")
+    lxml_scraper = FincaRaizScraper(parser="lxml")
+
+    # Act
+    bs4_listings = bs4_scraper._parse_page_sync(results_page_html, "manizales", "caldas")
+    lxml_listings = lxml_scraper._parse_page_sync(results_page_html, "manizales", "caldas")
+
+    # Assert
+    assert_that(bs4_listings).is_length(5)
+    assert_that([listing.model_dump() for listing in lxml_listings]).is_equal_to(
+        [listing.model_dump() for listing in bs4_listings]
+    )
+
+
+def test_extract_cards_lxml_should_return_no_cards_when_html_is_empty():
+    # Act
+    cards = extract_cards_lxml("")
+
+    # Assert
+    assert_that(cards).is_empty()
+
+
+def test_init_should_raise_value_error_when_parser_backend_is_unknown():
+    # Act / Assert
+    with pytest.raises(ValueError):
+        FincaRaizScraper(parser="regex")
+
+
+DETAIL_PAGE = """
+<html><head>
+  <meta property="og:description" content="Meta description">
+  <script type="application/ld+json">{"@context": "https://schema.org", "@type": "Organization", "name": "FincaRaiz"}</script>
+  <script type="application/ld+json">
+    {"@graph": [{
+      "@type": "SingleFamilyResidence",
+      "description": "  Casa   amplia\\n con jardín  ",
+      "address": {"streetAddress": "Calle 65 # 23-10", "addressLocality": "Manizales"},
+      "geo": {"latitude": "5.0614", "longitude": -75.4875},
+      "additionalProperty": [{"name": "Estrato", "value": "4"}, {"name": "Parqueaderos", "value": 2}],
+      "amenityFeature": [{"name": "Piscina", "value": true}, {"name": "Ascensor", "value": false}]
+    }]}
+  </script>
+</head><body></body></html>
+"""
+
+
+def test_extract_detail_fields_should_read_description_and_attributes_when_page_has_json_ld():
+    # Act
+    details = extract_detail_fields(DETAIL_PAGE)
+
+    # Assert
+    assert_that(details.description).is_equal_to("Casa amplia con jardín")
+    assert_that(details.attributes).is_equal_to(
+        {
+            "address": "Calle 65 # 23-10, Manizales",
+            "latitude": 5.0614,
+            "longitude": -75.4875,
+            "features": {"Estrato": "4", "Parqueaderos": 2},
+            "amenities": ["Piscina"],
+        }
+    )
+
+
+def test_extract_detail_fields_should_use_meta_description_when_page_has_no_json_ld():
+    # Arrange
+    html = '<html><head><meta name="description" content=" Apartamento  con vista "></head></html>'
+
+    # Act
+    details = extract_detail_fields(html)
+
+    # Assert
+    assert_that(details.description).is_equal_to("Apartamento con vista")
+    assert_that(details.attributes).is_empty()
@@ -0,0 +1,208 @@
+import asyncio
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+from assertpy import assert_that
+
+from app.scrapers.base import FetchedPage
+from app.scrapers.fincaraiz import FincaRaizScraper
+from app.scrapers.http_cache import ResponseCache
+from app.scrapers.rate_limiter import TokenBucket
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def results_page_html() -> str:
+    return (FIXTURES_DIR / "fincaraiz_results_page.html").read_text(encoding="utf-8")
+
+
+def _make_scraper(
+    pages: Dict[int, FetchedPage],
+    concurrency: int,
+    fetch_log: List[int],
+    response_cache: Optional[ResponseCache] = None,
+) -> FincaRaizScraper:
+    scraper = FincaRaizScraper(
+        concurrency=concurrency,
+        rate_limiter=TokenBucket(rate=1000, capacity=1000),
+        response_cache=response_cache,
+    )
+
+    async def fake_fetch_page(page: int, page_url: str) -> FetchedPage:
+        fetch_log.append(page)
+        # Later pages answer first to make sure results are reordered
+        await asyncio.sleep(random.uniform(0, 0.01) / page)
+        return pages.get(page, FetchedPage(200, "<html><body></body></html>"))
+
+    scraper._fetch_page = fake_fetch_page  # type: ignore[method-assign]
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_get_property_listings_should_yield_pages_in_order_when_fetching_concurrently(
+    results_page_html: str,
+):
+    # Arrange
+    pages = {
+        page: FetchedPage(200, results_page_html.replace("/1001", f"/{page}001"))
+        for page in range(1, 7)
+    }
+    scraper = _make_scraper(pages, concurrency=4, fetch_log=[])
+
+    # Act
+    yielded = [
+        page_listings[0].url
+        async for page_listings in scraper.get_property_listings(
+            "manizales", "caldas", "casas", max_pages=6
+        )
+    ]
+
+    # Assert
+    assert_that([str(url) for url in yielded]).is_equal_to(
+        [
+            f"https://www.fincaraiz.com.co/casa-en-venta/manizales/palermo/{page}001"
+            for page in range(1, 7)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_property_listings_should_stop_fetching_when_a_page_has_no_listings(
+    results_page_html: str,
+):
+    # Arrange
+    fetch_log: List[int] = []
+    pages = {1: FetchedPage(200, results_page_html), 2: FetchedPage(200, results_page_html)}
+    scraper = _make_scraper(pages, concurrency=2, fetch_log=fetch_log)
+
+    # Act
+    yielded = [
+        page_listings
+        async for page_listings in scraper.get_property_listings(
+            "manizales", "caldas", "casas", max_pages=20
+        )
+    ]
+
+    # Assert
+    assert_that(yielded).is_length(2)
+    assert_that(max(fetch_log)).is_less_than_or_equal_to(4)
+
+
+@pytest.mark.asyncio
+async def test_get_property_listings_should_skip_page_when_fetch_returns_no_html(
+    results_page_html: str,
+):
+    # Arrange
+    pages = {1: FetchedPage(500), 2: FetchedPage(200, results_page_html)}
+    scraper = _make_scraper(pages, concurrency=1, fetch_log=[])
+
+    # Act
+    yielded = [
+        page_listings
+        async for page_listings in scraper.get_property_listings(
+            "manizales", "caldas", "casas", max_pages=2
+        )
+    ]
+
+    # Assert
+    assert_that(yielded).is_length(1)
+    assert_that(yielded[0]).is_length(5)
+
+
+@pytest.mark.asyncio
+async def test_get_property_listings_should_yield_empty_page_when_server_answers_not_modified(
+    results_page_html: str,
+):
+    # Arrange
+    pages = {
+        1: FetchedPage(304),
+        2: FetchedPage(200, results_page_html),
+        3: FetchedPage(304),
+    }
+    scraper = _make_scraper(pages, concurrency=2, fetch_log=[])
+
+    # Act
+    yielded = [
+        page_listings
+        async for page_listings in scraper.get_property_listings(
+            "manizales", "caldas", "casas", max_pages=3
+        )
+    ]
+
+    # Assert
+    assert_that([len(page_listings) for page_listings in yielded]).is_equal_to([0, 5, 0])
+    assert_that(scraper.current_page).is_equal_to(3)
+
+
+@pytest.mark.asyncio
+async def test_get_property_listings_should_cache_page_validators_when_page_is_processed(
+    results_page_html: str, tmp_path: Path
+):
+    # Arrange
+    cache = ResponseCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    pages = {1: FetchedPage(200, results_page_html, etag='"v1"')}
+    scraper = _make_scraper(pages, concurrency=1, fetch_log=[], response_cache=cache)
+    page_url = "https://www.fincaraiz.com.co/venta/casas/manizales/caldas"
+
+    # Act
+    async for _ in scraper.get_property_listings(
+        "manizales", "caldas", "casas", max_pages=1
+    ):
+        # Nothing is cached until the consumer is done with the page
+        assert_that(cache.get(page_url)).is_none()
+
+    # Assert
+    assert_that(cache.conditional_headers(page_url)).is_equal_to(
+        {"If-None-Match": '"v1"'}
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fetched, expected_description, expected_attributes",
+    [
+        (
+            FetchedPage(200, '<meta name="description" content="Casa campestre">'),
+            "Casa campestre",
+            {},
+        ),
+        (FetchedPage(404), None, {"unavailable": True}),
+    ],
+)
+async def test_get_property_details_should_parse_page_or_flag_removed_listing(
+    fetched: FetchedPage, expected_description, expected_attributes
+):
+    # Arrange
+    scraper = FincaRaizScraper(rate_limiter=TokenBucket(rate=1000, capacity=1000))
+
+    async def fake_fetch(label: str, url: str, headers=None) -> FetchedPage:
+        return fetched
+
+    scraper._fetch = fake_fetch  # type: ignore[method-assign]
+
+    # Act
+    details = await scraper.get_property_details("https://www.fincaraiz.com.co/casa/1")
+
+    # Assert
+    assert_that(details.description).is_equal_to(expected_description)
+    assert_that(details.attributes).is_equal_to(expected_attributes)
+
+
+@pytest.mark.asyncio
+async def test_get_property_details_should_return_none_when_page_cannot_be_fetched():
+    # Arrange
+    scraper = FincaRaizScraper(rate_limiter=TokenBucket(rate=1000, capacity=1000))
+
+    async def fake_fetch(label: str, url: str, headers=None) -> FetchedPage:
+        return FetchedPage(503)
+
+    scraper._fetch = fake_fetch  # type: ignore[method-assign]
+
+    # Act
+    details = await scraper.get_property_details("https://www.fincaraiz.com.co/casa/1")
+
+    # Assert
+    assert_that(details).is_none()
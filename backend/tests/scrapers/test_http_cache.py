@@ -0,0 +1,76 @@
+import os
+import time
+
+from assertpy import assert_that
+
+from app.scrapers.http_cache import ResponseCache
+
+
+def test_put_should_not_store_page_when_response_has_no_validators(tmp_path):
+    # Arrange
+    cache = ResponseCache(str(tmp_path), max_bytes=1024 * 1024)
+
+    # Act
+    cache.put("https://example.com/a")
+
+    # Assert
+    assert_that(cache.get("https://example.com/a")).is_none()
+    assert_that(cache.conditional_headers("https://example.com/a")).is_empty()
+
+
+def test_conditional_headers_should_include_both_validators_when_page_is_cached(
+    tmp_path,
+):
+    # Arrange
+    cache = ResponseCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put(
+        "https://example.com/a",
+        etag='W/"abc"',
+        last_modified="Wed, 21 Oct 2015 07:28:00 GMT",
+    )
+
+    # Act
+    headers = cache.conditional_headers("https://example.com/a")
+
+    # Assert
+    assert_that(headers).is_equal_to(
+        {
+            "If-None-Match": 'W/"abc"',
+            "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+        }
+    )
+
+
+def test_put_should_evict_least_recently_used_pages_when_cache_is_full(tmp_path):
+    # Arrange
+    cache = ResponseCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put("https://example.com/old", etag='"1"')
+    # Room for two entries and a half
+    cache.max_bytes = int(cache._total_bytes * 2.5)
+    cache.put("https://example.com/used", etag='"2"')
+    old_time = time.time() - 60
+    os.utime(cache._path("https://example.com/old"), (old_time, old_time))
+    os.utime(cache._path("https://example.com/used"), (old_time, old_time))
+    cache.get("https://example.com/used")
+
+    # Act
+    cache.put("https://example.com/new", etag='"3"')
+
+    # Assert
+    assert_that(cache.get("https://example.com/old")).is_none()
+    assert_that(cache.get("https://example.com/used")).is_not_none()
+    assert_that(cache.get("https://example.com/new")).is_not_none()
+    assert_that(cache._total_bytes).is_less_than_or_equal_to(cache.max_bytes)
+
+
+def test_init_should_account_existing_entries_when_cache_directory_is_reused(tmp_path):
+    # Arrange
+    first = ResponseCache(str(tmp_path), max_bytes=1024 * 1024)
+    first.put("https://example.com/a", etag='"1"')
+
+    # Act
+    second = ResponseCache(str(tmp_path), max_bytes=1024 * 1024)
+
+    # Assert
+    assert_that(second._total_bytes).is_equal_to(first._total_bytes)
+    assert_that(second.get("https://example.com/a").etag).is_equal_to('"1"')
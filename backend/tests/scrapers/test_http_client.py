@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from assertpy import assert_that
+
+from app.scrapers import http_client
+from app.scrapers.fincaraiz import FincaRaizScraper
+
+
+@pytest_asyncio.fixture
+async def shared_session():
+    await http_client.start_http_client()
+    yield http_client.get_shared_session()
+    await http_client.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_aenter_should_borrow_shared_session_when_it_was_started(shared_session):
+    # Arrange
+    scraper = FincaRaizScraper()
+
+    # Act
+    async with scraper:
+        borrowed = scraper.session
+
+    # Assert
+    assert_that(borrowed).is_same_as(shared_session)
+    assert_that(shared_session.closed).is_false()
+
+
+@pytest.mark.asyncio
+async def test_aenter_should_open_and_close_own_session_when_no_shared_session_exists():
+    # Arrange
+    scraper = FincaRaizScraper()
+
+    # Act
+    async with scraper:
+        own_session = scraper.session
+
+    # Assert
+    assert_that(own_session).is_not_none()
+    assert_that(own_session.closed).is_true()
+
+
+@pytest.mark.asyncio
+async def test_get_shared_session_should_return_none_when_called_from_another_event_loop(
+    shared_session,
+):
+    # Arrange
+    async def get_from_new_loop():
+        return http_client.get_shared_session()
+
+    # Act
+    session = await asyncio.to_thread(asyncio.run, get_from_new_loop())
+
+    # Assert
+    assert_that(session).is_none()
+
+
+@pytest.mark.asyncio
+async def test_create_client_session_should_configure_connector_when_called():
+    # Act
+    session = http_client.create_client_session()
+
+    # Assert
+    try:
+        assert_that(session.connector.limit).is_equal_to(
+            http_client.settings.SCRAPER_HTTP_MAX_CONNECTIONS
+        )
+        assert_that(session.connector.limit_per_host).is_equal_to(
+            http_client.settings.SCRAPER_HTTP_MAX_CONNECTIONS_PER_HOST
+        )
+    finally:
+        await session.close()
@@ -0,0 +1,65 @@
+import pytest
+from assertpy import assert_that
+
+from app.scrapers.listing_fields import (
+    TypologyValues,
+    parse_number,
+    parse_price,
+    parse_typology,
+)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("3 Habs.2 Baños120 m²", TypologyValues(3, 2, 120.0, "m²")),
+        ("1 Hab.1 Baño48 m²", TypologyValues(1, 1, 48.0, "m²")),
+        ("2 Habitaciones1 Baño85.5 m²", TypologyValues(2, 1, 85.5, "m²")),
+        ("4 Habs.3 Baños1.250,75 m2", TypologyValues(4, 3, 1250.75, "m²")),
+        ("3,5 ha", TypologyValues(None, None, 3.5, "ha")),
+        ("12 Hectáreas", TypologyValues(None, None, 12.0, "ha")),
+        ("4 Habs.3 Baños", TypologyValues(4, 3, None, None)),
+        ("120 m²3 Habs.2 Baños", TypologyValues(3, 2, 120.0, "m²")),
+        ("Lote2 Baños", TypologyValues(None, 2, None, None)),
+        ("", TypologyValues()),
+        (None, TypologyValues()),
+    ],
+)
+def test_parse_typology_should_extract_all_fields_when_text_has_known_formats(
+    text, expected
+):
+    # Act
+    result = parse_typology(text)
+
+    # Assert
+    assert_that(result).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("$ 450.000.000", 450000000.0),
+        ("$350,000,000", 350000000.0),
+        ("$ 1.250.000,50", 1250000.5),
+        ("$ 210.000.000 - $ 250.000.000", 210000000.0),
+        ("Desde $ 210.000.000 hasta $ 250.000.000", 210000000.0),
+        ("Precio a convenir", None),
+        (None, None),
+    ],
+)
+def test_parse_price_should_return_price_or_lower_bound_when_text_has_a_price(
+    text, expected
+):
+    # Act
+    result = parse_price(text)
+
+    # Assert
+    assert_that(result).is_equal_to(expected)
+
+
+def test_parse_number_should_return_none_when_thousand_groups_are_malformed():
+    # Act
+    result = parse_number("1.20.300")
+
+    # Assert
+    assert_that(result).is_none()
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from assertpy import assert_that
+
+from app.scrapers import parse_pool
+from app.scrapers.fincaraiz import parse_listing_dicts
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def results_page_html() -> str:
+    return (FIXTURES_DIR / "fincaraiz_results_page.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture
+def parse_executor_kind(monkeypatch):
+    def configure(kind: str) -> None:
+        parse_pool.shutdown_parse_executor()
+        monkeypatch.setattr(parse_pool.settings, "SCRAPER_PARSE_EXECUTOR", kind)
+        monkeypatch.setattr(parse_pool.settings, "SCRAPER_PARSE_WORKERS", 1)
+
+    yield configure
+    parse_pool.shutdown_parse_executor()
+
+
+@pytest.mark.parametrize(
+    "kind, executor_type",
+    [("thread", ThreadPoolExecutor), ("process", ProcessPoolExecutor)],
+)
+def test_get_parse_executor_should_create_configured_executor_when_first_used(
+    parse_executor_kind, kind, executor_type
+):
+    # Arrange
+    parse_executor_kind(kind)
+
+    # Act
+    executor = parse_pool.get_parse_executor()
+
+    # Assert
+    assert_that(executor).is_instance_of(executor_type)
+    assert_that(parse_pool.get_parse_executor()).is_same_as(executor)
+
+
+def test_get_parse_executor_should_return_none_when_parsing_inline(parse_executor_kind):
+    # Arrange
+    parse_executor_kind("inline")
+
+    # Act
+    executor = parse_pool.get_parse_executor()
+
+    # Assert
+    assert_that(executor).is_none()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["inline", "thread", "process"])
+async def test_run_parse_job_should_return_plain_listing_dicts_when_parsing_a_page(
+    parse_executor_kind, results_page_html: str, kind: str
+):
+    # Arrange
+    parse_executor_kind(kind)
+
+    # Act
+    listing_dicts = await parse_pool.run_parse_job(
+        parse_listing_dicts, results_page_html, "manizales", "caldas", "lxml"
+    )
+
+    # Assert
+    assert_that(listing_dicts).is_length(5)
+    assert_that(listing_dicts[0]).is_instance_of(dict)
+    assert_that(listing_dicts[0]["url"]).is_equal_to(
+        "https://www.fincaraiz.com.co/casa-en-venta/manizales/palermo/1001"
+    )
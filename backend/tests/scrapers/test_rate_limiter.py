@@ -0,0 +1,52 @@
+import pytest
+from assertpy import assert_that
+from unittest.mock import patch
+
+from app.scrapers.rate_limiter import TokenBucket, get_host_limiter
+
+
+def test_reserve_should_not_wait_when_bucket_has_tokens():
+    # Arrange
+    bucket = TokenBucket(rate=1.0, capacity=3)
+
+    # Act
+    delays = [bucket._reserve(1) for _ in range(3)]
+
+    # Assert
+    assert_that(delays).is_equal_to([0.0, 0.0, 0.0])
+
+
+def test_reserve_should_space_requests_by_rate_when_bucket_is_empty():
+    # Arrange
+    bucket = TokenBucket(rate=2.0, capacity=1)
+
+    with patch("app.scrapers.rate_limiter.time.monotonic", return_value=100.0):
+        bucket._updated_at = 100.0
+
+        # Act
+        delays = [bucket._reserve(1) for _ in range(4)]
+
+    # Assert
+    assert_that(delays).is_equal_to([0.0, 0.5, 1.0, 1.5])
+
+
+def test_set_rate_should_reject_non_positive_rates():
+    # Arrange
+    bucket = TokenBucket(rate=1.0)
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        bucket.set_rate(0)
+
+
+def test_get_host_limiter_should_return_same_limiter_when_host_is_the_same():
+    # Arrange
+    host = "limiter-test.example.com"
+
+    # Act
+    first = get_host_limiter(host, rate=1.0)
+    second = get_host_limiter(host, rate=5.0)
+
+    # Assert
+    assert_that(second).is_same_as(first)
+    assert_that(second.rate).is_equal_to(1.0)
@@ -0,0 +1,70 @@
+from typing import AsyncGenerator, List
+
+import pytest
+from assertpy import assert_that
+
+from app.schemas.property import PropertyCreate
+from app.scrapers import registry
+from app.scrapers.base import BaseScraper
+from app.scrapers.fincaraiz import FincaRaizScraper
+
+
+class ExampleScraper(BaseScraper):
+    NAME = "example"
+    BASE_URL = "https://www.example.com.co"
+
+    async def get_property_listings(
+        self,
+        city: str,
+        region: str,
+        property_type: str,
+        max_pages: int = 5,
+        start_page: int = 1,
+    ) -> AsyncGenerator[List[PropertyCreate], None]:
+        yield []
+
+
+@pytest.fixture
+def scrapers(monkeypatch):
+    registered = {"fincaraiz": FincaRaizScraper}
+    monkeypatch.setattr(registry, "_SCRAPERS", registered)
+    return registered
+
+
+def test_register_scraper_should_make_scraper_available_by_name_when_decorating_a_class(
+    scrapers,
+):
+    # Act
+    registry.register_scraper(ExampleScraper)
+
+    # Assert
+    assert_that(registry.available_scrapers()).is_equal_to(["example", "fincaraiz"])
+    assert_that(registry.create_scraper("example")).is_instance_of(ExampleScraper)
+
+
+def test_register_scraper_should_raise_value_error_when_name_is_taken(scrapers):
+    # Arrange
+    class Impostor(ExampleScraper):
+        NAME = "fincaraiz"
+
+    # Act / Assert
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register_scraper(Impostor)
+
+
+def test_get_scraper_class_should_raise_value_error_when_name_is_unknown(scrapers):
+    # Act / Assert
+    with pytest.raises(ValueError, match="Unknown scraper 'nope'"):
+        registry.get_scraper_class("nope")
+
+
+def test_create_scraper_should_give_each_source_the_limiter_of_its_own_host(scrapers):
+    # Arrange
+    registry.register_scraper(ExampleScraper)
+
+    # Act
+    example = registry.create_scraper("example")
+    fincaraiz = registry.create_scraper("fincaraiz")
+
+    # Assert
+    assert_that(example.rate_limiter).is_not_same_as(fincaraiz.rate_limiter)
@@ -0,0 +1,211 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List
+
+import pytest
+from assertpy import assert_that
+
+from app.scrapers.fincaraiz import FincaRaizScraper
+from app.scrapers.rate_limiter import TokenBucket
+from app.scrapers.retry import HostCircuitBreaker, RetryPolicy
+
+
+@pytest.fixture
+def breaker() -> HostCircuitBreaker:
+    return HostCircuitBreaker(
+        TokenBucket(rate=1.0),
+        window=4,
+        error_rate_threshold=0.5,
+        latency_threshold=2.0,
+        cooldown=30,
+    )
+
+
+def test_backoff_should_stay_within_exponential_bound_when_no_retry_after_is_given():
+    # Arrange
+    policy = RetryPolicy(max_retries=5, base_delay=1, max_delay=10)
+
+    # Act
+    delays = [policy.backoff(retry) for retry in range(6) for _ in range(50)]
+
+    # Assert
+    assert_that(max(delays[:50])).is_less_than_or_equal_to(1)
+    assert_that(max(delays)).is_less_than_or_equal_to(10)
+
+
+def test_backoff_should_honor_retry_after_when_server_sends_it():
+    # Arrange
+    policy = RetryPolicy(max_retries=3, base_delay=1, max_delay=60)
+
+    # Act / Assert
+    assert_that(policy.backoff(0, retry_after=7)).is_equal_to(7)
+    assert_that(policy.backoff(0, retry_after=600)).is_equal_to(60)
+
+
+@pytest.mark.parametrize(
+    "value, expected", [("120", 120), (" 5 ", 5), ("soon", None), (None, None)]
+)
+def test_parse_retry_after_should_parse_seconds_when_header_is_numeric(value, expected):
+    # Act
+    result = RetryPolicy.parse_retry_after(value)
+
+    # Assert
+    assert_that(result).is_equal_to(expected)
+
+
+def test_parse_retry_after_should_return_remaining_seconds_when_header_is_a_date():
+    # Arrange
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    # Act
+    result = RetryPolicy.parse_retry_after(format_datetime(retry_at, usegmt=True))
+
+    # Assert
+    assert_that(result).is_between(25, 31)
+
+
+def test_record_should_open_circuit_and_halve_rate_when_error_rate_is_high(breaker):
+    # Act
+    for success in (False, False, True, False):
+        breaker.record(success, latency=0.1)
+
+    # Assert
+    assert_that(breaker.is_open).is_true()
+    assert_that(breaker.limiter.rate).is_equal_to(0.5)
+
+
+def test_record_should_lower_rate_when_latency_is_high(breaker):
+    # Act
+    for _ in range(4):
+        breaker.record(True, latency=3.0)
+
+    # Assert
+    assert_that(breaker.is_open).is_false()
+    assert_that(breaker.limiter.rate).is_equal_to(0.75)
+
+
+def test_record_should_restore_rate_gradually_when_host_is_healthy(breaker):
+    # Arrange
+    breaker.limiter.set_rate(0.5)
+
+    # Act
+    for _ in range(4 * 10):
+        breaker.record(True, latency=0.1)
+
+    # Assert
+    assert_that(breaker.limiter.rate).is_equal_to(1.0)
+
+
+class FakeResponse:
+    def __init__(self, status: int, headers=None, text: str = ""):
+        self.status = status
+        self.headers = headers or {}
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    async def read(self) -> bytes:
+        return self._text.encode()
+
+    def get_encoding(self) -> str:
+        return "utf-8"
+
+
+class FakeSession:
+    def __init__(self, outcomes: List):
+        self.outcomes = outcomes
+        self.calls = 0
+
+    def get(self, url, headers=None):
+        outcome = self.outcomes[self.calls]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _make_scraper(outcomes: List, max_retries: int = 3) -> FincaRaizScraper:
+    limiter = TokenBucket(rate=1000, capacity=1000)
+    scraper = FincaRaizScraper(
+        rate_limiter=limiter,
+        retry_policy=RetryPolicy(max_retries=max_retries, base_delay=0, max_delay=0),
+        circuit_breaker=HostCircuitBreaker(
+            limiter, window=100, error_rate_threshold=1, latency_threshold=60, cooldown=0
+        ),
+    )
+    scraper.response_cache = None
+    scraper.session = FakeSession(outcomes)
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_should_retry_when_request_times_out_or_is_throttled():
+    # Arrange
+    scraper = _make_scraper(
+        [
+            asyncio.TimeoutError(),
+            FakeResponse(429, {"Retry-After": "0"}),
+            FakeResponse(200, {"ETag": '"v1"'}, "<html></html>"),
+        ]
+    )
+
+    # Act
+    fetched = await scraper._fetch_page(3, "https://www.fincaraiz.com.co/page-3")
+
+    # Assert
+    assert_that(fetched.status).is_equal_to(200)
+    assert_that(fetched.etag).is_equal_to('"v1"')
+    assert_that(scraper.stats).contains_entry(
+        {"requests": 3},
+        {"retries": 2},
+        {"throttled": 1},
+        {"failed_pages": 0},
+        {"bytes_downloaded": 13},
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_should_count_wire_size_when_response_has_content_length():
+    # Arrange
+    # A compressed body is decoded by aiohttp, so only the header has its real size
+    scraper = _make_scraper(
+        [FakeResponse(200, {"Content-Length": "5"}, "<html></html>")]
+    )
+
+    # Act
+    fetched = await scraper._fetch_page(1, "https://www.fincaraiz.com.co/page-1")
+
+    # Assert
+    assert_that(fetched.html).is_equal_to("<html></html>")
+    assert_that(scraper.stats).contains_entry({"bytes_downloaded": 5})
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_should_give_up_when_retries_are_exhausted():
+    # Arrange
+    scraper = _make_scraper([FakeResponse(503)] * 3, max_retries=2)
+
+    # Act
+    fetched = await scraper._fetch_page(1, "https://www.fincaraiz.com.co/page-1")
+
+    # Assert
+    assert_that(fetched.status).is_equal_to(503)
+    assert_that(scraper.stats).contains_entry({"retries": 2}, {"failed_pages": 1})
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_should_not_retry_when_status_is_not_retryable():
+    # Arrange
+    scraper = _make_scraper([FakeResponse(404)])
+
+    # Act
+    fetched = await scraper._fetch_page(1, "https://www.fincaraiz.com.co/page-1")
+
+    # Assert
+    assert_that(fetched.status).is_equal_to(404)
+    assert_that(scraper.session.calls).is_equal_to(1)
@@ -0,0 +1,122 @@
+import asyncio
+from typing import Dict, List, Optional
+from unittest.mock import create_autospec
+
+import pytest
+from assertpy import assert_that
+
+from app.db.repositories import PropertyRepository
+from app.scrapers.listing_fields import DetailFields
+from app.services.enrichment_service import DetailEnricher
+
+URL = "https://www.fincaraiz.com.co/casa/{}"
+
+
+class FakeDetailScraper:
+    def __init__(self, failing_urls: Optional[List[str]] = None):
+        self.failing_urls = failing_urls or []
+        self.requested: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_property_details(self, url: str) -> Optional[DetailFields]:
+        self.requested.append(url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+
+        if url in self.failing_urls:
+            return None
+        return DetailFields(f"Description of {url}", {"features": {"Estrato": "4"}})
+
+
+@pytest.fixture
+def property_repo():
+    mock = create_autospec(PropertyRepository, instance=True)
+    mock.update_properties_details.side_effect = lambda details: len(details)
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_join_should_fetch_each_url_once_when_urls_are_submitted_twice(
+    property_repo,
+):
+    # Arrange
+    scraper = FakeDetailScraper()
+    urls = [URL.format(index) for index in range(5)]
+
+    # Act
+    async with DetailEnricher(scraper, property_repo, concurrency=2) as enricher:
+        enricher.submit(urls)
+        enricher.submit(urls[:3])
+        await enricher.join()
+
+    # Assert
+    assert_that(sorted(scraper.requested)).is_equal_to(sorted(urls))
+    assert_that(scraper.max_in_flight).is_less_than_or_equal_to(2)
+    assert_that(enricher.stats).contains_entry(
+        {"queued": 5}, {"duplicates": 3}, {"enriched": 5}
+    )
+
+
+@pytest.mark.asyncio
+async def test_join_should_store_details_in_batches_when_batch_size_is_reached(
+    property_repo,
+):
+    # Arrange
+    scraper = FakeDetailScraper()
+
+    # Act
+    async with DetailEnricher(
+        scraper, property_repo, concurrency=3, batch_size=2
+    ) as enricher:
+        enricher.submit(URL.format(index) for index in range(5))
+        await enricher.join()
+
+    # Assert
+    batch_sizes = [
+        len(call.args[0]) for call in property_repo.update_properties_details.call_args_list
+    ]
+    assert_that(batch_sizes).is_equal_to([2, 2, 1])
+
+
+@pytest.mark.asyncio
+async def test_join_should_leave_url_pending_when_detail_page_cannot_be_fetched(
+    property_repo,
+):
+    # Arrange
+    failing_url = URL.format(1)
+    scraper = FakeDetailScraper(failing_urls=[failing_url])
+    stored: Dict[str, DetailFields] = {}
+    property_repo.update_properties_details.side_effect = (
+        lambda details: stored.update(details) or len(details)
+    )
+
+    # Act
+    async with DetailEnricher(scraper, property_repo) as enricher:
+        enricher.submit([URL.format(0), failing_url])
+        await enricher.join()
+
+    # Assert
+    assert_that(stored).contains_key(URL.format(0)).does_not_contain_key(failing_url)
+    assert_that(enricher.stats).contains_entry({"failed": 1}, {"enriched": 1})
+
+
+@pytest.mark.asyncio
+async def test_aexit_should_store_fetched_details_when_run_is_interrupted(
+    property_repo,
+):
+    # Arrange
+    scraper = FakeDetailScraper()
+
+    # Act
+    with pytest.raises(RuntimeError):
+        async with DetailEnricher(scraper, property_repo, batch_size=100) as enricher:
+            enricher.submit([URL.format(0)])
+            while not scraper.requested or scraper.in_flight:
+                await asyncio.sleep(0.001)
+            raise RuntimeError("scrape failed")
+
+    # Assert
+    property_repo.update_properties_details.assert_called_once()
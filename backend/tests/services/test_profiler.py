@@ -0,0 +1,62 @@
+import threading
+import time
+
+from assertpy import assert_that
+
+from app.services.profiler import SamplingProfiler
+
+
+def _busy_wait(stop: threading.Event) -> None:
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def test_sample_should_record_stacks_of_other_threads_when_called():
+    # Arrange
+    profiler = SamplingProfiler(interval_seconds=1, max_stacks=100)
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_wait, args=(stop,), name="busy-worker")
+    worker.start()
+
+    # Act
+    try:
+        profiler.sample()
+        profiler.sample()
+    finally:
+        stop.set()
+        worker.join()
+
+    # Assert
+    lines = profiler.collapsed().splitlines()
+    worker_lines = [line for line in lines if line.startswith("busy-worker;")]
+    assert_that(profiler.samples).is_equal_to(2)
+    assert_that(worker_lines).is_not_empty()
+    assert_that(worker_lines[0]).contains("_busy_wait (test_profiler.py:")
+    assert_that(sum(int(line.rsplit(" ", 1)[1]) for line in worker_lines)).is_equal_to(2)
+
+
+def test_collapsed_should_keep_most_sampled_stacks_when_limit_is_reached():
+    # Arrange
+    profiler = SamplingProfiler(interval_seconds=1, max_stacks=1)
+    profiler._stacks.update({"main;a": 1, "main;b": 5})
+
+    # Act
+    collapsed = profiler.collapsed()
+
+    # Assert
+    assert_that(collapsed).is_equal_to("main;b 5\n")
+
+
+def test_profiler_should_sample_in_background_while_running():
+    # Arrange
+    profiler = SamplingProfiler(interval_seconds=0.001, max_stacks=100)
+
+    # Act
+    with profiler:
+        time.sleep(0.05)
+    samples = profiler.samples
+    time.sleep(0.01)
+
+    # Assert
+    assert_that(samples).is_positive()
+    assert_that(profiler.samples).is_equal_to(samples)
@@ -0,0 +1,111 @@
+from unittest.mock import create_autospec
+
+import pytest
+from assertpy import assert_that
+
+from app.db.repositories.task_repository import TaskRepository
+from app.services import progress_reporter as progress_reporter_module
+from app.services.progress_reporter import TaskProgressReporter
+from app.services.task_events import TaskEventBroker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def task_repo():
+    mock = create_autospec(TaskRepository, instance=True)
+    mock.write_progress.return_value = "running"
+    return mock
+
+
+@pytest.fixture
+def task_events(monkeypatch):
+    mock = create_autospec(TaskEventBroker, instance=True)
+    monkeypatch.setattr(progress_reporter_module, "get_task_events", lambda: mock)
+    return mock
+
+
+def test_record_should_ask_for_flush_when_time_interval_passes(task_repo, task_events):
+    # Arrange
+    clock = FakeClock()
+    reporter = TaskProgressReporter(
+        task_repo, "task0001", flush_seconds=5, flush_pages=100, clock=clock
+    )
+
+    # Act
+    due = [reporter.record(3, {"checkpoint": {"next_page": 2}})]
+    due.append(reporter.record(6, {"checkpoint": {"next_page": 3}}))
+    clock.now = 5
+    due.append(reporter.record(9, {"checkpoint": {"next_page": 4}}))
+    reporter.flush()
+
+    # Assert
+    assert_that(due).is_equal_to([False, False, True])
+    task_repo.write_progress.assert_called_once_with(
+        "task0001", 9, {"checkpoint": {"next_page": 4}}
+    )
+
+
+def test_record_should_publish_progress_of_every_page_when_flush_is_not_due(
+    task_repo, task_events
+):
+    # Arrange
+    reporter = TaskProgressReporter(task_repo, "task0002", flush_seconds=60, flush_pages=10)
+
+    # Act
+    reporter.record(3)
+    reporter.record(6)
+
+    # Assert
+    task_repo.write_progress.assert_not_called()
+    assert_that(task_events.publish_progress.call_count).is_equal_to(2)
+    task_events.publish_progress.assert_called_with("task0002", "running", 6)
+
+
+def test_flush_should_flag_cancel_request_when_write_finds_task_cancelling(
+    task_repo, task_events
+):
+    # Arrange
+    task_repo.write_progress.return_value = "cancelling"
+    reporter = TaskProgressReporter(task_repo, "task0003", flush_seconds=60, flush_pages=2)
+
+    # Act
+    reporter.record(3)
+    cancel_before_flush = reporter.cancel_requested
+    if reporter.record(6):
+        reporter.flush()
+    reporter.record(9)
+
+    # Assert
+    assert_that(cancel_before_flush).is_false()
+    assert_that(reporter.cancel_requested).is_true()
+    task_events.publish_progress.assert_called_with("task0003", "cancelling", 9)
+
+
+def test_write_status_should_write_status_with_buffered_progress_in_one_update(
+    task_repo, task_events
+):
+    # Arrange
+    reporter = TaskProgressReporter(task_repo, "task0004", flush_seconds=60, flush_pages=10)
+    reporter.record(3, {"checkpoint": {"next_page": 2}})
+
+    # Act
+    reporter.write_status("completed")
+    reporter.publish("completed")
+
+    # Assert
+    task_repo.write_progress.assert_not_called()
+    task_repo.update_task_status.assert_called_once_with(
+        "task0004",
+        "completed",
+        properties_found=3,
+        error=None,
+        metadata={"checkpoint": {"next_page": 2}},
+    )
+    task_events.publish_progress.assert_called_with("task0004", "completed", 3)
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from typing import List
+from unittest.mock import create_autospec
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy.orm import Session
+
+from app.db.repositories.schedule_repository import ScheduleRepository, next_run_time
+from app.models.scrape_schedule import ScrapeSchedule
+from app.services import scheduler
+from app.services.scheduler import ScrapeScheduler
+
+
+@pytest.fixture
+def schedule_repo(monkeypatch):
+    mock = create_autospec(ScheduleRepository, instance=True)
+    monkeypatch.setattr(scheduler, "ScheduleRepository", lambda db: mock)
+    return mock
+
+
+def _scheduler(run_schedule) -> ScrapeScheduler:
+    return ScrapeScheduler(
+        lambda: create_autospec(Session, instance=True),
+        run_schedule,
+        poll_seconds=0.01,
+        jitter_seconds=30,
+    )
+
+
+def test_run_due_should_run_every_claimed_schedule_when_schedules_are_due(
+    schedule_repo,
+):
+    # Arrange
+    schedule_repo.claim_due_schedules.return_value = [
+        ScrapeSchedule(id=1, name="manizales-casas"),
+        ScrapeSchedule(id=2, name="pereira-fincas"),
+    ]
+    ran: List[str] = []
+
+    # Act
+    count = _scheduler(lambda schedule, db: ran.append(schedule.name)).run_due()
+
+    # Assert
+    assert_that(count).is_equal_to(2)
+    assert_that(ran).is_equal_to(["manizales-casas", "pereira-fincas"])
+    schedule_repo.claim_due_schedules.assert_called_once_with(30)
+
+
+def test_run_due_should_keep_running_schedules_when_one_fails(schedule_repo):
+    # Arrange
+    schedule_repo.claim_due_schedules.return_value = [
+        ScrapeSchedule(id=1, name="broken"),
+        ScrapeSchedule(id=2, name="pereira-fincas"),
+    ]
+    ran: List[str] = []
+
+    def run_schedule(schedule, db):
+        if schedule.name == "broken":
+            raise RuntimeError("The scrape worker pool is not running")
+        ran.append(schedule.name)
+
+    # Act
+    _scheduler(run_schedule).run_due()
+
+    # Assert
+    assert_that(ran).is_equal_to(["pereira-fincas"])
+
+
+def test_next_run_time_should_add_interval_and_bounded_jitter():
+    # Arrange
+    now = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+    # Act
+    delays = [
+        (next_run_time(now, 60, 30) - now).total_seconds() for _ in range(50)
+    ]
+
+    # Assert
+    assert_that(min(delays)).is_greater_than_or_equal_to(3600)
+    assert_that(max(delays)).is_less_than_or_equal_to(3630)
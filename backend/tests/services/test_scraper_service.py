@@ -0,0 +1,577 @@
+import asyncio
+import threading
+from typing import List
+from unittest.mock import create_autospec
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy.orm import Session
+
+from app.db.repositories import PropertyRepository, TaskRepository
+from app.db.repositories.property_repository import UpsertResult
+from app.models.task import Task
+from app.schemas.property import PropertyCreate
+from app.services import scraper_service
+
+
+def _listings(page: int) -> List[PropertyCreate]:
+    return [
+        PropertyCreate(url=f"https://www.fincaraiz.com.co/casa/{page}{index}")
+        for index in range(3)
+    ]
+
+
+class FakeScraper:
+    BASE_URL = "https://www.fincaraiz.com.co"
+    SUPPORTS_DETAILS = True
+
+    def __init__(self, pages: List[List[PropertyCreate]]):
+        self.pages = pages
+        self.pages_requested = 0
+        self.current_page = None
+        self.stats = {"requests": 0, "retries": 0}
+        self.timings = {"fetch": 0.0, "sleep": 0.0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    async def get_property_listings(
+        self, city, region, property_type, max_pages, start_page=1
+    ):
+        for index in range(start_page - 1, start_page - 1 + max_pages):
+            if index >= len(self.pages):
+                return
+            self.pages_requested += 1
+            self.current_page = index + 1
+            yield self.pages[index]
+
+
+def _final_update(task_repo):
+    """Status and fields of the last status update of a task"""
+    call = task_repo.update_task_status.call_args
+    return call.args[1], call.kwargs
+
+
+@pytest.fixture
+def task_repo(monkeypatch):
+    mock = create_autospec(TaskRepository, instance=True)
+    mock.write_progress.return_value = "running"
+    monkeypatch.setattr(scraper_service, "TaskRepository", lambda db: mock)
+    return mock
+
+
+@pytest.fixture
+def property_repo(monkeypatch):
+    mock = create_autospec(PropertyRepository, instance=True)
+    mock.save_properties_batch.return_value = UpsertResult(3, 0, 0)
+    monkeypatch.setattr(scraper_service, "PropertyRepository", lambda db: mock)
+    return mock
+
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    scraper = FakeScraper([_listings(page) for page in range(1, 11)])
+    monkeypatch.setattr(scraper_service, "create_scraper", lambda name: scraper)
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_stop_early_when_consecutive_pages_are_unchanged_in_incremental_mode(
+    task_repo, property_repo, fake_scraper
+):
+    # Arrange
+    new_listings = _listings(1)[:1]
+    property_repo.find_new_or_changed_properties.side_effect = [new_listings, [], [], []]
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0001",
+        "manizales",
+        "caldas",
+        "casas",
+        10,
+        create_autospec(Session),
+        incremental=True,
+        stop_after_unchanged_pages=2,
+    )
+
+    # Assert
+    assert_that(fake_scraper.pages_requested).is_equal_to(3)
+    property_repo.save_properties_batch.assert_called_once_with(new_listings)
+    status, fields = _final_update(task_repo)
+    assert_that(status).is_equal_to("completed")
+    assert_that(fields["properties_found"]).is_equal_to(9)
+    assert_that(fields["metadata"]["incremental"]).is_equal_to(
+        {"stopped_early": True, "pages_scraped": 3, "unchanged_pages": 2}
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_stop_early_and_checkpoint_when_pages_are_not_modified_in_incremental_mode(
+    task_repo, property_repo, monkeypatch
+):
+    # Arrange
+    scraper = FakeScraper([_listings(1), [], [], _listings(4)])
+    monkeypatch.setattr(scraper_service, "create_scraper", lambda name: scraper)
+    property_repo.find_new_or_changed_properties.return_value = _listings(1)
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0011",
+        "manizales",
+        "caldas",
+        "casas",
+        10,
+        create_autospec(Session),
+        incremental=True,
+        stop_after_unchanged_pages=2,
+    )
+
+    # Assert
+    assert_that(scraper.pages_requested).is_equal_to(3)
+    property_repo.find_new_or_changed_properties.assert_called_once_with(_listings(1))
+    _, fields = _final_update(task_repo)
+    assert_that(fields["metadata"]["incremental"]).contains_entry({"stopped_early": True})
+    assert_that(fields["metadata"]["checkpoint"]["sources"]["fincaraiz"]).contains_entry(
+        {"next_page": 4}, {"unchanged_pages": 2}
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_save_every_page_when_incremental_mode_is_off(
+    task_repo, property_repo, fake_scraper
+):
+    # Act
+    await scraper_service._run_scraper(
+        "task0002", "manizales", "caldas", "casas", 4, create_autospec(Session)
+    )
+
+    # Assert
+    assert_that(fake_scraper.pages_requested).is_equal_to(4)
+    assert_that(property_repo.save_properties_batch.call_count).is_equal_to(4)
+    property_repo.find_new_or_changed_properties.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_save_pages_outside_the_event_loop_thread_when_scraping(
+    task_repo, property_repo, fake_scraper
+):
+    # Arrange
+    loop_thread = threading.get_ident()
+    save_threads = []
+    property_repo.save_properties_batch.side_effect = lambda listings: (
+        save_threads.append(threading.get_ident()) or UpsertResult(len(listings), 0, 0)
+    )
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0008", "manizales", "caldas", "casas", 2, create_autospec(Session)
+    )
+
+    # Assert
+    assert_that(save_threads).is_length(2).does_not_contain(loop_thread)
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_store_fetch_counters_in_task_metadata_when_scrape_ends(
+    task_repo, property_repo, fake_scraper
+):
+    # Arrange
+    fake_scraper.stats = {"requests": 5, "retries": 2}
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0003", "manizales", "caldas", "casas", 1, create_autospec(Session)
+    )
+
+    # Assert
+    _, fields = _final_update(task_repo)
+    assert_that(fields["metadata"]["fetch"]).is_equal_to({"requests": 5, "retries": 2})
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_store_phase_breakdown_in_task_metadata_when_scrape_ends(
+    task_repo, property_repo, fake_scraper
+):
+    # Arrange
+    fake_scraper.stats = {"requests": 2, "bytes_downloaded": 4096, "cards": 40}
+    fake_scraper.timings = {"fetch": 1.5, "sleep": 0.25}
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0004", "manizales", "caldas", "casas", 2, create_autospec(Session)
+    )
+
+    # Assert
+    _, fields = _final_update(task_repo)
+    phases = fields["metadata"]["phases"]
+    assert_that(phases).contains_entry(
+        {"fetch_seconds": 1.5},
+        {"sleep_seconds": 0.25},
+        {"bytes_downloaded": 4096},
+        {"cards": 40},
+    )
+    assert_that(phases).contains_key(
+        "db_write_seconds", "elapsed_seconds", "cards_per_second"
+    )
+    assert_that(phases["cards_per_second"]).is_positive()
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_enrich_new_or_changed_and_pending_listings_when_enrichment_is_requested(
+    task_repo, property_repo, fake_scraper, monkeypatch
+):
+    # Arrange
+    submitted: List[str] = []
+
+    class FakeEnricher:
+        stats = {"enriched": 2, "failed": 0}
+
+        def __init__(self, scraper, repo, db_lock=None):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            return None
+
+        def submit(self, urls):
+            submitted.extend(str(url) for url in urls)
+
+        async def join(self):
+            return None
+
+    monkeypatch.setattr(scraper_service, "DetailEnricher", FakeEnricher)
+    changed = _listings(1)[:1]
+    property_repo.find_new_or_changed_properties.return_value = changed
+    property_repo.get_urls_pending_details.return_value = ["https://www.fincaraiz.com.co/casa/9"]
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0004",
+        "manizales",
+        "caldas",
+        "casas",
+        1,
+        create_autospec(Session),
+        enrich_details=True,
+    )
+
+    # Assert
+    property_repo.save_properties_batch.assert_called_once_with(_listings(1))
+    assert_that(submitted).is_equal_to(
+        [str(changed[0].url), "https://www.fincaraiz.com.co/casa/9"]
+    )
+    _, fields = _final_update(task_repo)
+    assert_that(fields["metadata"]).contains_entry(
+        {"fetch": fake_scraper.stats}, {"details": {"enriched": 2, "failed": 0}}
+    )
+
+
+class FailingScraper(FakeScraper):
+    async def get_property_listings(
+        self, city, region, property_type, max_pages, start_page=1
+    ):
+        raise RuntimeError("portal is down")
+        yield []
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_scrape_sources_concurrently_into_the_same_repository_when_several_are_requested(
+    task_repo, property_repo, monkeypatch
+):
+    # Arrange
+    started: List[str] = []
+    both_started = asyncio.Event()
+
+    class ConcurrentScraper(FakeScraper):
+        def __init__(self, name: str, pages: List[List[PropertyCreate]]):
+            super().__init__(pages)
+            self.name = name
+
+        async def get_property_listings(
+        self, city, region, property_type, max_pages, start_page=1
+    ):
+            started.append(self.name)
+            if len(started) == 2:
+                both_started.set()
+            # Each source waits for the other one, which only works when they run together
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            for page in self.pages[:max_pages]:
+                yield page
+
+    scrapers = {
+        "fincaraiz": ConcurrentScraper("fincaraiz", [_listings(1), _listings(2)]),
+        "other": ConcurrentScraper("other", [_listings(3)]),
+    }
+    monkeypatch.setattr(scraper_service, "create_scraper", lambda name: scrapers[name])
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0005",
+        "manizales",
+        "caldas",
+        "casas",
+        5,
+        create_autospec(Session),
+        sources=["fincaraiz", "other"],
+    )
+
+    # Assert
+    assert_that(property_repo.save_properties_batch.call_count).is_equal_to(3)
+    status, fields = _final_update(task_repo)
+    assert_that(status).is_equal_to("completed")
+    assert_that(fields["properties_found"]).is_equal_to(9)
+    metadata = fields["metadata"]
+    assert_that(metadata["source_results"]["fincaraiz"]).contains_entry(
+        {"pages_scraped": 2}, {"properties_found": 6}
+    )
+    assert_that(metadata["source_results"]["other"]).contains_entry({"pages_scraped": 1})
+    # The requested sources stored with the task are left as they are
+    assert_that(metadata).does_not_contain_key("sources")
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_complete_with_source_error_when_only_some_sources_fail(
+    task_repo, property_repo, monkeypatch
+):
+    # Arrange
+    scrapers = {
+        "fincaraiz": FakeScraper([_listings(1)]),
+        "other": FailingScraper([]),
+    }
+    monkeypatch.setattr(scraper_service, "create_scraper", lambda name: scrapers[name])
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0006",
+        "manizales",
+        "caldas",
+        "casas",
+        5,
+        create_autospec(Session),
+        sources=["fincaraiz", "other"],
+    )
+
+    # Assert
+    status, fields = _final_update(task_repo)
+    assert_that(status).is_equal_to("completed")
+    assert_that(fields["properties_found"]).is_equal_to(3)
+    metadata = fields["metadata"]
+    assert_that(metadata["source_results"]["other"]["error"]).is_equal_to("portal is down")
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_fail_task_when_every_source_fails(
+    task_repo, property_repo, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(
+        scraper_service, "create_scraper", lambda name: FailingScraper([])
+    )
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0007", "manizales", "caldas", "casas", 5, create_autospec(Session)
+    )
+
+    # Assert
+    status, fields = _final_update(task_repo)
+    assert_that(status).is_equal_to("failed")
+    assert_that(fields["error"]).is_equal_to("portal is down")
+
+
+def test_plan_sub_tasks_should_split_types_into_page_ranges_when_shard_pages_is_given():
+    # Act
+    sub_tasks = scraper_service.plan_sub_tasks(["casas", "fincas"], 5, shard_pages=2)
+
+    # Assert
+    assert_that(sub_tasks).is_equal_to(
+        [
+            ("casas", 1, 2),
+            ("casas", 3, 2),
+            ("casas", 5, 1),
+            ("fincas", 1, 2),
+            ("fincas", 3, 2),
+            ("fincas", 5, 1),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_scrape_properties_fan_out_should_run_sub_tasks_concurrently_and_aggregate_parent_when_types_are_split(
+    task_repo, monkeypatch
+):
+    # Arrange
+    running = 0
+    max_running = 0
+    runs = []
+
+    async def fake_run_scraper(task_id, city, region, property_type, max_pages, db, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        runs.append((property_type, kwargs["start_page"], max_pages))
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    monkeypatch.setattr(scraper_service, "_run_scraper", fake_run_scraper)
+    monkeypatch.setattr(scraper_service.settings, "SCRAPER_MAX_CONCURRENT_SUBTASKS", 2)
+    monkeypatch.setattr(scraper_service, "_sub_task_semaphore", None)
+    task_repo.get_task.return_value = None
+    task_repo.get_child_tasks.return_value = [
+        Task(id="child001", status="completed", properties_found=10),
+        Task(id="child002", status="failed"),
+        Task(id="child003", status="completed", properties_found=5),
+    ]
+
+    # Act
+    parent_id = await scraper_service.scrape_properties_fan_out(
+        "manizales",
+        "caldas",
+        ["casas", "fincas", "lotes"],
+        4,
+        create_autospec(Session),
+        "parent01",
+    )
+
+    # Assert
+    assert_that(parent_id).is_equal_to("parent01")
+    assert_that(sorted(runs)).is_equal_to(
+        [("casas", 1, 4), ("fincas", 1, 4), ("lotes", 1, 4)]
+    )
+    assert_that(max_running).is_equal_to(2)
+    child_tasks = [
+        call.args[0] for call in task_repo.create_task.call_args_list[1:]
+    ]
+    assert_that([task["parent_id"] for task in child_tasks]).is_equal_to(["parent01"] * 3)
+    task_repo.update_task_status.assert_called_with(
+        "parent01",
+        "completed",
+        properties_found=15,
+        error="1 of 3 sub-tasks failed: child002",
+    )
+
+
+@pytest.mark.asyncio
+async def test_scrape_properties_fan_out_should_share_sub_task_limit_when_requests_run_concurrently(
+    task_repo, monkeypatch
+):
+    # Arrange
+    running = 0
+    max_running = 0
+
+    async def fake_run_scraper(task_id, city, region, property_type, max_pages, db, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    monkeypatch.setattr(scraper_service, "_run_scraper", fake_run_scraper)
+    monkeypatch.setattr(scraper_service.settings, "SCRAPER_MAX_CONCURRENT_SUBTASKS", 3)
+    monkeypatch.setattr(scraper_service, "_sub_task_semaphore", None)
+    task_repo.get_task.return_value = None
+    task_repo.get_child_tasks.return_value = []
+
+    # Act
+    await asyncio.gather(
+        *(
+            scraper_service.scrape_properties_fan_out(
+                "manizales",
+                "caldas",
+                ["casas", "fincas", "lotes"],
+                4,
+                create_autospec(Session),
+                parent_id,
+            )
+            for parent_id in ("parent01", "parent02", "parent03")
+        )
+    )
+
+    # Assert
+    assert_that(max_running).is_equal_to(3)
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_stop_and_cancel_task_when_cancel_is_requested_between_pages(
+    task_repo, property_repo, fake_scraper, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(scraper_service.settings, "SCRAPER_PROGRESS_FLUSH_PAGES", 1)
+    task_repo.write_progress.side_effect = ["running", "cancelling"]
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0007", "manizales", "caldas", "casas", 10, create_autospec(Session)
+    )
+
+    # Assert
+    assert_that(fake_scraper.pages_requested).is_equal_to(2)
+    status, fields = _final_update(task_repo)
+    assert_that(status).is_equal_to("cancelled")
+    assert_that(fields["properties_found"]).is_equal_to(6)
+    checkpoint = fields["metadata"]["checkpoint"]
+    assert_that(checkpoint["sources"]["fincaraiz"]).contains_entry(
+        {"next_page": 3}, {"pages_scraped": 2}, {"done": False}
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_continue_from_next_page_when_checkpoint_is_given(
+    task_repo, property_repo, fake_scraper
+):
+    # Arrange
+    checkpoint = {
+        "properties_found": 9,
+        "sources": {
+            "fincaraiz": {
+                "next_page": 4,
+                "pages_scraped": 3,
+                "properties_found": 9,
+                "unchanged_pages": 0,
+                "done": False,
+            }
+        },
+    }
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0008",
+        "manizales",
+        "caldas",
+        "casas",
+        5,
+        create_autospec(Session),
+        checkpoint=checkpoint,
+    )
+
+    # Assert
+    assert_that(fake_scraper.pages_requested).is_equal_to(2)
+    property_repo.save_properties_batch.assert_any_call(_listings(4))
+    status, fields = _final_update(task_repo)
+    assert_that(status).is_equal_to("completed")
+    assert_that(fields["properties_found"]).is_equal_to(15)
+
+
+@pytest.mark.asyncio
+async def test_run_scraper_should_write_progress_every_few_pages_when_scraping_many_pages(
+    task_repo, property_repo, fake_scraper, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(scraper_service.settings, "SCRAPER_PROGRESS_FLUSH_PAGES", 4)
+    monkeypatch.setattr(scraper_service.settings, "SCRAPER_PROGRESS_FLUSH_SECONDS", 60)
+
+    # Act
+    await scraper_service._run_scraper(
+        "task0009", "manizales", "caldas", "casas", 10, create_autospec(Session)
+    )
+
+    # Assert
+    assert_that(task_repo.write_progress.call_count).is_equal_to(2)
+    task_repo.get_task.assert_not_called()
+    assert_that(task_repo.update_task_status.call_count).is_equal_to(2)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+from assertpy import assert_that
+
+from app.services import task_events
+from app.services.task_events import TaskEventBroker, task_event_stream
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = TaskEventBroker(entries_per_task=3, max_tasks=2, recent_entries=4)
+    monkeypatch.setattr(task_events, "_task_events", broker)
+    return broker
+
+
+def test_add_log_should_keep_other_tasks_logs_when_one_task_logs_a_lot(broker):
+    # Arrange
+    broker.add_log("quiet001", "info", "started")
+
+    # Act
+    for index in range(10):
+        broker.add_log("busy0001", "info", f"page {index}")
+
+    # Assert
+    assert_that([log["message"] for log in broker.get_logs("quiet001")]).is_equal_to(
+        ["started"]
+    )
+    assert_that([log["message"] for log in broker.get_logs("busy0001")]).is_equal_to(
+        ["page 7", "page 8", "page 9"]
+    )
+    assert_that(broker.get_logs(limit=10)).is_length(4)
+
+
+def test_add_log_should_drop_least_recently_active_task_when_max_tasks_is_reached(broker):
+    # Act
+    broker.add_log("task0001", "info", "one")
+    broker.add_log("task0002", "info", "two")
+    broker.add_log("task0001", "info", "one again")
+    broker.add_log("task0003", "info", "three")
+
+    # Assert
+    assert_that(broker.get_logs("task0002")).is_empty()
+    assert_that(broker.get_logs("task0001")).is_length(2)
+
+
+@pytest.mark.asyncio
+async def test_subscribe_should_receive_only_followed_task_events_when_following_a_task(broker):
+    # Arrange
+    queue = broker.subscribe("task0001")
+    everything = broker.subscribe()
+
+    # Act
+    broker.add_log("task0002", "info", "other task")
+    broker.publish_progress("task0001", "running", 12)
+
+    # Assert
+    assert_that(queue.qsize()).is_equal_to(1)
+    assert_that(queue.get_nowait()).contains_entry(
+        {"type": "progress"}, {"properties_found": 12}
+    )
+    assert_that(everything.qsize()).is_equal_to(2)
+
+
+@pytest.mark.asyncio
+async def test_task_event_stream_should_send_initial_and_live_events_until_client_disconnects(broker):
+    # Arrange
+    disconnected = False
+
+    async def is_disconnected():
+        return disconnected
+
+    stream = task_event_stream(
+        "task0001",
+        is_disconnected,
+        [{"type": "progress", "task_id": "task0001", "status": "running", "properties_found": 3}],
+        keepalive_seconds=1,
+    )
+
+    # Act
+    initial = await stream.__anext__()
+    broker.add_log("task0001", "info", "page 2 saved")
+    live = await asyncio.wait_for(stream.__anext__(), timeout=1)
+    disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(stream.__anext__(), timeout=1)
+
+    # Assert
+    assert_that(initial).starts_with("event: progress\n")
+    assert_that(live).starts_with("event: log\n")
+    assert_that(json.loads(live.split("data: ")[1])["message"]).is_equal_to("page 2 saved")
+    assert_that(broker.subscriber_count).is_equal_to(0)
+
+
+@pytest.mark.asyncio
+async def test_task_event_stream_should_send_changed_polled_progress_of_every_task_when_idle(broker):
+    # Arrange
+    polls = [
+        [
+            {"type": "progress", "task_id": "task0001", "status": "running", "properties_found": 3},
+            {"type": "progress", "task_id": "task0002", "status": "pending", "properties_found": 0},
+        ],
+        [
+            {"type": "progress", "task_id": "task0001", "status": "completed", "properties_found": 5},
+            {"type": "progress", "task_id": "task0002", "status": "pending", "properties_found": 0},
+        ],
+        [
+            {"type": "progress", "task_id": "task0002", "status": "pending", "properties_found": 0},
+        ],
+    ]
+
+    async def is_disconnected():
+        return False
+
+    async def poll_progress():
+        return polls.pop(0)
+
+    stream = task_event_stream(None, is_disconnected, [], poll_progress, keepalive_seconds=0.01)
+
+    # Act
+    sent = [await asyncio.wait_for(stream.__anext__(), timeout=1) for _ in range(4)]
+    await stream.aclose()
+
+    # Assert
+    progress = [json.loads(event.split("data: ")[1]) for event in sent[:3]]
+    assert_that([(event["task_id"], event["status"]) for event in progress]).is_equal_to(
+        [("task0001", "running"), ("task0002", "pending"), ("task0001", "completed")]
+    )
+    assert_that(sent[3]).is_equal_to(": keep-alive\n\n")
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from typing import List
+from unittest.mock import create_autospec
+
+import pytest
+from assertpy import assert_that
+from sqlalchemy.orm import Session
+
+from app.db.repositories.task_repository import TaskRepository
+from app.models.task import Task
+from app.services import task_queue
+from app.services.task_queue import TaskQueueWorker
+
+
+@pytest.fixture
+def task_repo(monkeypatch):
+    mock = create_autospec(TaskRepository, instance=True)
+    mock.renew_lease.return_value = True
+    monkeypatch.setattr(task_queue, "TaskRepository", lambda db: mock)
+    return mock
+
+
+def _worker(run_task, heartbeat_seconds: float = 60) -> TaskQueueWorker:
+    return TaskQueueWorker(
+        lambda: create_autospec(Session, instance=True),
+        run_task,
+        worker_id="node-1",
+        lease_seconds=30,
+        heartbeat_seconds=heartbeat_seconds,
+        poll_seconds=0.01,
+        max_attempts=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_next_should_return_false_when_queue_is_empty(task_repo):
+    # Arrange
+    task_repo.claim_next_task.return_value = None
+    ran: List[str] = []
+
+    async def run_task(task_id, db):
+        ran.append(task_id)
+
+    # Act
+    claimed = await _worker(run_task).run_next()
+
+    # Assert
+    assert_that(claimed).is_false()
+    assert_that(ran).is_empty()
+    task_repo.reclaim_expired_tasks.assert_called_once_with(3)
+
+
+@pytest.mark.asyncio
+async def test_run_next_should_run_claimed_task_and_release_lease_when_task_ends(
+    task_repo,
+):
+    # Arrange
+    task_repo.claim_next_task.return_value = Task(id="task0001", attempts=1)
+    ran: List[str] = []
+
+    async def run_task(task_id, db):
+        ran.append(task_id)
+
+    # Act
+    claimed = await _worker(run_task).run_next()
+
+    # Assert
+    assert_that(claimed).is_true()
+    assert_that(ran).is_equal_to(["task0001"])
+    task_repo.claim_next_task.assert_called_once_with("node-1", 30)
+    task_repo.release_lease.assert_called_once_with("task0001", "node-1")
+
+
+@pytest.mark.asyncio
+async def test_run_next_should_query_queue_outside_the_event_loop_thread_when_claiming(
+    task_repo,
+):
+    # Arrange
+    threads: List[int] = []
+    task_repo.claim_next_task.side_effect = lambda owner, lease_seconds: (
+        threads.append(threading.get_ident()) or Task(id="task0004", attempts=1)
+    )
+    task_repo.release_lease.side_effect = lambda task_id, owner: threads.append(
+        threading.get_ident()
+    )
+
+    async def run_task(task_id, db):
+        pass
+
+    # Act
+    await _worker(run_task).run_next()
+
+    # Assert
+    assert_that(threads).is_length(2)
+    assert_that(threads).does_not_contain(threading.get_ident())
+
+
+@pytest.mark.asyncio
+async def test_run_next_should_renew_lease_while_task_runs(task_repo):
+    # Arrange
+    task_repo.claim_next_task.return_value = Task(id="task0002", attempts=1)
+
+    async def run_task(task_id, db):
+        await asyncio.sleep(0.2)
+
+    # Act
+    await _worker(run_task, heartbeat_seconds=0.01).run_next()
+
+    # Assert
+    assert_that(task_repo.renew_lease.call_count).is_greater_than_or_equal_to(2)
+    task_repo.renew_lease.assert_called_with("task0002", "node-1", 30)
+
+
+@pytest.mark.asyncio
+async def test_run_next_should_cancel_task_when_lease_is_lost(task_repo):
+    # Arrange
+    task_repo.claim_next_task.return_value = Task(id="task0003", attempts=2)
+    task_repo.renew_lease.return_value = False
+    finished: List[bool] = []
+
+    async def run_task(task_id, db):
+        await asyncio.sleep(1)
+        finished.append(True)
+
+    # Act
+    claimed = await asyncio.wait_for(
+        _worker(run_task, heartbeat_seconds=0.01).run_next(), timeout=0.5
+    )
+
+    # Assert
+    assert_that(claimed).is_true()
+    assert_that(finished).is_empty()
+
+
+@pytest.mark.asyncio
+async def test_run_should_stop_polling_when_stop_event_is_set(task_repo):
+    # Arrange
+    task_repo.claim_next_task.return_value = None
+    stop_event = asyncio.Event()
+
+    async def run_task(task_id, db):
+        return None
+
+    # Act
+    runner = asyncio.ensure_future(_worker(run_task).run(stop_event))
+    await asyncio.sleep(0.03)
+    stop_event.set()
+    await asyncio.wait_for(runner, timeout=0.5)
+
+    # Assert
+    assert_that(task_repo.claim_next_task.call_count).is_greater_than_or_equal_to(1)
@@ -0,0 +1,103 @@
+import asyncio
+from typing import List
+
+import pytest
+import pytest_asyncio
+from assertpy import assert_that
+
+from app.services.worker_pool import QueueFullError, ScrapeWorkerPool
+
+
+@pytest_asyncio.fixture
+async def pool():
+    worker_pool = ScrapeWorkerPool(workers=1, max_queue_size=3)
+    await worker_pool.start()
+    yield worker_pool
+    await worker_pool.stop()
+
+
+def _job(name: str, log: List[str], gate: asyncio.Event = None):
+    async def job():
+        if gate is not None:
+            await gate.wait()
+        log.append(name)
+
+    return job
+
+
+@pytest.mark.asyncio
+async def test_submit_should_run_higher_priority_jobs_first_when_jobs_are_queued(pool):
+    # Arrange
+    log: List[str] = []
+    gate = asyncio.Event()
+    pool.submit(_job("blocker", log, gate))
+    await asyncio.sleep(0)
+
+    # Act
+    pool.submit(_job("low", log), priority=0)
+    pool.submit(_job("high", log), priority=5)
+    pool.submit(_job("low-2", log), priority=0)
+    gate.set()
+    await pool._queue.join()
+
+    # Assert
+    assert_that(log).is_equal_to(["blocker", "high", "low", "low-2"])
+
+
+@pytest.mark.asyncio
+async def test_submit_should_raise_queue_full_error_when_queue_is_full(pool):
+    # Arrange
+    gate = asyncio.Event()
+    pool.submit(_job("running", [], gate))
+    await asyncio.sleep(0)
+    for index in range(3):
+        pool.submit(_job(f"queued-{index}", []))
+
+    # Act / Assert
+    with pytest.raises(QueueFullError):
+        pool.submit(_job("rejected", []))
+    assert_that(pool.queue_depth).is_equal_to(3)
+    gate.set()
+
+
+@pytest.mark.asyncio
+async def test_worker_should_keep_running_jobs_when_a_job_fails(pool):
+    # Arrange
+    log: List[str] = []
+
+    async def failing_job():
+        raise RuntimeError("boom")
+
+    # Act
+    pool.submit(failing_job)
+    pool.submit(_job("after", log))
+    await pool._queue.join()
+
+    # Assert
+    assert_that(log).is_equal_to(["after"])
+    assert_that(pool.active_jobs).is_equal_to(0)
+
+
+@pytest.mark.asyncio
+async def test_start_should_run_at_most_the_configured_number_of_jobs_at_once():
+    # Arrange
+    pool = ScrapeWorkerPool(workers=2, max_queue_size=10)
+    await pool.start()
+    running = 0
+    max_running = 0
+
+    async def job():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    # Act
+    for _ in range(6):
+        pool.submit(job)
+    await pool._queue.join()
+    await pool.stop()
+
+    # Assert
+    assert_that(max_running).is_equal_to(2)
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from assertpy import assert_that
+
+from app import worker
+from app.core.metrics import ACTIVE_TASKS
+
+
+@pytest.mark.asyncio
+async def test_start_metrics_server_should_not_listen_when_port_is_zero():
+    # Act
+    server = await worker.start_metrics_server(0)
+
+    # Assert
+    assert_that(server).is_none()
+
+
+@pytest.mark.asyncio
+async def test_serve_metrics_should_answer_with_registry_when_requested():
+    # Arrange
+    server = await asyncio.start_server(worker.serve_metrics, host="127.0.0.1", port=0)
+    port = server.sockets[0].getsockname()[1]
+
+    # Act
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+
+    # Assert
+    assert_that(response).starts_with("HTTP/1.1 200 OK\r\n")
+    assert_that(response).contains(f"# TYPE {ACTIVE_TASKS.name} gauge")
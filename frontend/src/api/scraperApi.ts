@@ -1,4 +1,4 @@
-import apiClient from './client';
+import apiClient, { API_BASE_URL } from './client';
 
 // Define types for scraper data
 export interface ScraperParams {
@@ -37,6 +37,28 @@ export interface TaskListResponse {
   total: number;
 }
 
+export interface ScraperLogEvent {
+  task_id: string;
+  level: string;
+  message: string;
+  timestamp: string;
+}
+
+export interface ScraperProgressEvent {
+  task_id: string;
+  status: string;
+  properties_found?: number;
+}
+
+export interface ScraperEventHandlers {
+  onLog?: (event: ScraperLogEvent) => void;
+  onProgress?: (event: ScraperProgressEvent) => void;
+}
+
+// Format a log event the same way as the /scrape/logs endpoint
+export const formatLogEvent = (event: ScraperLogEvent): string =>
+  `[${event.timestamp}] ${event.level.toUpperCase()}: ${event.message}`;
+
 // API functions
 export const startScraper = async (params: ScraperParams): Promise<ScraperResponse> => {
   const response = await apiClient.post('/api/v1/scrape', {
@@ -62,11 +84,33 @@ export const getScraperLogs = async (taskId?: string, limit: number = 20): Promi
   return response.data;
 };
 
+// Follow the logs and progress of a task (or of every task) pushed by the server.
+// Returns a function that closes the stream.
+export const subscribeToScraperEvents = (
+  handlers: ScraperEventHandlers,
+  taskId?: string
+): (() => void) => {
+  const url = taskId
+    ? `${API_BASE_URL}/api/v1/scrape/events?task_id=${taskId}`
+    : `${API_BASE_URL}/api/v1/scrape/events`;
+  const source = new EventSource(url);
+
+  source.addEventListener('log', (event) => {
+    handlers.onLog?.(JSON.parse((event as MessageEvent).data));
+  });
+  source.addEventListener('progress', (event) => {
+    handlers.onProgress?.(JSON.parse((event as MessageEvent).data));
+  });
+
+  return () => source.close();
+};
+
 // Export all functions as a default object for convenience
 const scraperApi = {
   startScraper,
   getScraperStatus,
-  getScraperLogs
+  getScraperLogs,
+  subscribeToScraperEvents
 };
 
 export default scraperApi; 
\ No newline at end of file
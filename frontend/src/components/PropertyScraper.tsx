@@ -1,7 +1,7 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import './PropertyScraper.css';
 import { Button, Input } from './ui';
-import scraperApi, { ScraperParams, TaskStatus } from '../api/scraperApi';
+import scraperApi, { ScraperParams, TaskStatus, formatLogEvent } from '../api/scraperApi';
 
 const propertyTypeOptions = [
   { value: 'casas', label: 'Casas' },
@@ -11,6 +11,9 @@ const propertyTypeOptions = [
   { value: 'cabanas', label: 'Cabañas' }
 ];
 
+// Log lines kept on screen
+const MAX_LOG_LINES = 100;
+
 const PropertyScraper = () => {
   const [formData, setFormData] = useState<ScraperParams>({
     city: '',
@@ -33,34 +36,40 @@ const PropertyScraper = () => {
     fetchRecentLogs();
   }, []);
 
-  // Refresh logs every 5 seconds if on logs tab
+  const recentTasksRef = useRef<TaskStatus[]>([]);
+  const reloadedForTasks = useRef(new Set<string>());
   useEffect(() => {
-    let interval: number | undefined;
-    
-    if (activeTab === 'logs') {
-      interval = window.setInterval(() => {
-        fetchRecentLogs();
-      }, 5000);
-    }
-    
-    return () => {
-      if (interval) window.clearInterval(interval);
-    };
-  }, [activeTab]);
+    recentTasksRef.current = recentTasks;
+  }, [recentTasks]);
 
-  // Refresh tasks every 5 seconds if on tasks tab
+  // Follow logs and task progress pushed by the server while on the logs or tasks tab
   useEffect(() => {
-    let interval: number | undefined;
-    
-    if (activeTab === 'tasks') {
-      interval = window.setInterval(() => {
-        fetchRecentTasks();
-      }, 5000);
-    }
-    
-    return () => {
-      if (interval) window.clearInterval(interval);
-    };
+    if (activeTab === 'form') return;
+
+    // The stream starts with the recent logs
+    setLogs([]);
+    return scraperApi.subscribeToScraperEvents({
+      onLog: (event) => {
+        setLogs((current) => [...current, formatLogEvent(event)].slice(-MAX_LOG_LINES));
+      },
+      onProgress: (event) => {
+        if (!recentTasksRef.current.some((task) => task.id === event.task_id)) {
+          // A task started elsewhere: reload the list once to show it
+          if (!reloadedForTasks.current.has(event.task_id)) {
+            reloadedForTasks.current.add(event.task_id);
+            fetchRecentTasks();
+          }
+          return;
+        }
+        setRecentTasks((current) =>
+          current.map((task) =>
+            task.id === event.task_id
+              ? { ...task, status: event.status, properties_found: event.properties_found ?? task.properties_found }
+              : task
+          )
+        );
+      },
+    });
   }, [activeTab]);
 
   const fetchRecentLogs = async () => {
@@ -150,7 +159,7 @@ const PropertyScraper = () => {
         </button>
         <button 
           className={`tab-button ${activeTab === 'logs' ? 'active' : ''}`}
-          onClick={() => { setActiveTab('logs'); fetchRecentLogs(); }}
+          onClick={() => setActiveTab('logs')}
         >
           Logs
         </button>